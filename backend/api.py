@@ -1,28 +1,44 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, send_file
 from flask_cors import CORS
 import pandas as pd
 import numpy as np
 import os
 import random
 import json
+import time
 import joblib
+import threading
+import fcntl
 from datetime import datetime
-from sklearn.ensemble import GradientBoostingRegressor, IsolationForest
-from sklearn.preprocessing import LabelEncoder
-from sklearn.model_selection import train_test_split
 
 # ML Pipeline modules (legacy)
+# scikit-learn and the training modules are imported inside the training
+# endpoints only, so the serving path starts without them.
 from ml.data_loader import load_csv, validate_columns, FEATURE_COLUMNS
-from ml.preprocessing import handle_missing_values, feature_engineering, normalize_features, get_feature_matrix
-from ml.model_training import split_data, train_model, evaluate_model, compare_models
-from ml.model_manager import save_model, load_model, list_saved_models
+from ml.preprocessing import handle_missing_values, feature_engineering, normalize_features, get_feature_matrix, compact_dtypes
+from ml.model_manager import (save_model, load_model, list_saved_models, compile_model, compile_anomaly_model,
+                              compile_explainer, save_sensitivity, load_sensitivity, importance_values)
+from ml.sensitivity import compute_sensitivity, model_key
+from ml.snapshot import snapshot_key, save_snapshot, load_snapshot
+from ml.feature_spec import compile_feature_spec
+from ml.tree_shap import factor_contributions
 
 # Layered architecture
 from pipeline.preprocessing import FEATURE_COLUMNS as PIPELINE_FEATURES
 from pipeline.feature_engineering import feature_engineering as pipeline_feature_eng
-from pipeline.model_training import compare_models as pipeline_compare
+from pipeline.aggregates import build_state_aggregates, empty_state_aggregates
+from pipeline.skill_history import decode_skill_history, empty_history, recent_velocity, group_mean
+from pipeline.forecasting import get_forecasts, METHODS as FORECAST_METHODS, LEVELS as FORECAST_LEVELS
 from services.prediction_service import PredictionService
-from services.training_service import TrainingService
+from services.batch_prediction import BatchPredictionService, factor_explanations, EXPLANATION_FALLBACK
+from services.counterfactual import CounterfactualService
+from services.micro_batching import MicroBatcher
+from services.prediction_cache import PredictionCache
+from services.rule_tables import PROFILE_RULES
+from services.risk_surface import SurfaceCache, parse_spec, compute_surface, render
+from services.process_memory import memory_report
+from services.scoring_jobs import ScoringJobs, ScoringJobsFull
+from services.training_jobs import TrainingJobs, train_skill_models, train_real_models, job_key
 
 # Configure Flask to serve the frontend static files
 app = Flask(__name__, static_folder='../frontend/dist', static_url_path='/')
@@ -51,14 +67,193 @@ MODEL_STATE = {
     "anomaly_model": None,
     "encoders": {},
     "training_score": 0.0,
+    "feature_names": list(FEATURE_COLUMNS),
+    "feature_spec": None,
+    "compiled_model": None,
+    "compiled_anomaly": None,
+    "explainer": None,
+    "importances": None,  # legacy explanation weights (importance_values)
+    "sensitivity": None,  # PD / ICE curves (ml/sensitivity.py)
+    "version": 0,  # bumped on every model swap
     "active": False
 }
+BASE_FEATURE_COLUMNS = list(FEATURE_COLUMNS)  # FEATURE_COLUMNS is rebound to the real-data columns below
 DF = pd.DataFrame()
+STATE_AGGREGATES = empty_state_aggregates()
+SKILL_HISTORY = empty_history()
+DATASET_VERSION = 0  # bumped on every dataset swap; keys caches derived from DF
+DATASET_FILE = None  # CSV the serving dataset was built from
+BATCH_MAX_RECORDS = int(os.environ.get('SKILLGENOME_BATCH_MAX_RECORDS', '100000'))
+# IsolationForest subsample size per tree ('auto' = min(256, n_samples))
+ANOMALY_MAX_SAMPLES = os.environ.get('SKILLGENOME_ANOMALY_MAX_SAMPLES', 'auto')
+ANOMALY_MAX_SAMPLES = int(ANOMALY_MAX_SAMPLES) if ANOMALY_MAX_SAMPLES.isdigit() else ANOMALY_MAX_SAMPLES
+# CPU budget for model comparison: candidate processes + RandomForest threads
+TRAIN_WORKERS = int(os.environ.get('SKILLGENOME_TRAIN_WORKERS', str(os.cpu_count() or 1)))
+# Startup training switches to HistGradientBoosting from this many rows
+HIST_GB_MIN_ROWS = int(os.environ.get('SKILLGENOME_HIST_GB_MIN_ROWS', '100000'))
+# Default wall-clock budget of /api/train-model {"mode": "search"}
+SEARCH_TIME_BUDGET_S = float(os.environ.get('SKILLGENOME_SEARCH_BUDGET_S', '60'))
+# Incremental retraining: boosting stages added per update, and the PSI above
+# which a feature counts as drifted (→ full retrain)
+WARM_START_STAGES = int(os.environ.get('SKILLGENOME_WARM_START_STAGES', '50'))
+DRIFT_PSI_THRESHOLD = float(os.environ.get('SKILLGENOME_DRIFT_PSI', '0.2'))
+# Serializes saving + activating a freshly trained model (request or training job)
+TRAINING_SWAP_LOCK = threading.Lock()
+# Micro-batching of concurrent single-profile predictions (0 ms = off);
+# only pays off with threaded workers (GUNICORN_THREADS > 1)
+MICROBATCH_WINDOW_MS = float(os.environ.get('SKILLGENOME_MICROBATCH_MS', '0'))
+MICROBATCH_MAX_ROWS = int(os.environ.get('SKILLGENOME_MICROBATCH_MAX_ROWS', '64'))
+# A request waits this long for its batch before scoring its row directly
+MICROBATCH_TIMEOUT_MS = float(os.environ.get('SKILLGENOME_MICROBATCH_TIMEOUT_MS', '1000'))
+
+
+def _score_rows(models, X):
+    """(prediction, is_anomaly) per row of X for a (regressor, anomaly model) pair."""
+    model, anomaly_model = models
+    return list(zip(model.predict(X).tolist(), (anomaly_model.predict(X) == -1).tolist()))
+
+
+SKILL_BATCHER = MicroBatcher(_score_rows, MICROBATCH_WINDOW_MS, MICROBATCH_MAX_ROWS, name='skill',
+                             timeout_ms=MICROBATCH_TIMEOUT_MS)
+RISK_BATCHER = MicroBatcher(_score_rows, MICROBATCH_WINDOW_MS, MICROBATCH_MAX_ROWS, name='risk',
+                            timeout_ms=MICROBATCH_TIMEOUT_MS)
+
+# /api/predict response cache (keyed on quantized signals + context + model version)
+PREDICT_CACHE = PredictionCache(
+    max_entries=int(os.environ.get('SKILLGENOME_PREDICT_CACHE_ENTRIES', '4096')),
+    max_bytes=int(float(os.environ.get('SKILLGENOME_PREDICT_CACHE_MB', '16')) * 2 ** 20),
+    step=float(os.environ.get('SKILLGENOME_PREDICT_CACHE_STEP', '1'))
+)
+
+
+def _prepare_serving_frame(df: pd.DataFrame):
+    """Decode skill history and compact dtypes; returns (df, history)."""
+    # Decode the JSON history strings once; the dense matrix replaces the column
+    if 'skill_history' in df.columns:
+        history = decode_skill_history(df['skill_history'])
+        df = df.drop(columns=['skill_history'])
+    else:
+        history = empty_history(len(df))
+    # Categorical text columns and 32/16-bit numerics for the serving copy
+    df = compact_dtypes(df)
+    return df, history
+
+
+def _set_dataset(df: pd.DataFrame, history: dict = None, source: str = None):
+    """
+    Swap in a new preprocessed dataset and rebuild everything derived from it.
+
+    Pass `history` only for frames that are already prepared for serving
+    (e.g. loaded from a snapshot); otherwise the frame is prepared here.
+    `source` is the CSV the frame came from.
+    """
+    global DF, STATE_AGGREGATES, SKILL_HISTORY, DATASET_VERSION, DATASET_FILE
+    if history is None:
+        df, history = _prepare_serving_frame(df)
+    aggregates = build_state_aggregates(df)
+    DF = df
+    STATE_AGGREGATES = aggregates
+    SKILL_HISTORY = history
+    DATASET_VERSION += 1
+    DATASET_FILE = source
+    print(f"AI ENGINE: State aggregates built for {len(aggregates['states'])} states ({aggregates['rows']} profiles)")
+    print(f"AI ENGINE: Decoded skill history for {int((history['lengths'] > 1).sum())} profiles "
+          f"({history['values'].nbytes // 1024} KB)")
+
+
+def _load_dataset(data_file: str):
+    """
+    Load the analytics dataset, preferring a columnar snapshot.
+
+    The snapshot is keyed by the CSV content and the preprocessing code, so a
+    changed file or pipeline falls back to the full CSV chain, whose result is
+    then snapshotted for the next boot.
+    """
+    key = snapshot_key(data_file)
+    try:
+        snapshot = load_snapshot(key)
+    except Exception as e:
+        print(f"AI ENGINE: Snapshot unreadable, rebuilding – {e}")
+        snapshot = None
+    if snapshot is not None:
+        _set_dataset(*snapshot, source=data_file)
+        return
+
+    df = load_csv(data_file)
+    df = validate_columns(df, auto_heal=True)
+    df = handle_missing_values(df)
+    df = feature_engineering(df)
+    _set_dataset(df, source=data_file)
+    try:
+        save_snapshot(DF, SKILL_HISTORY, key, source=data_file)
+    except Exception as e:
+        print(f"AI ENGINE: Snapshot save skipped: {e}")
+
+def _activate_model(skill_model, anomaly_model, feature_names, training_score, **extra):
+    """
+    Swap in a new primary model.
+
+    The feature spec is compiled from the column list the model was trained
+    on and tree ensembles are flattened for fast scoring and TreeSHAP
+    explanations (compile_model, compile_anomaly_model, compile_explainer);
+    the state is replaced in a single dict.update so concurrent requests see
+    either the old or the new model, never a mix.
+    """
+    spec = compile_feature_spec(feature_names or BASE_FEATURE_COLUMNS)
+    compiled = compile_model(skill_model)
+    MODEL_STATE.update({
+        'skill_model': skill_model,
+        'compiled_model': compiled,
+        'explainer': compile_explainer(compiled, spec.feature_names),
+        'anomaly_model': anomaly_model,
+        'compiled_anomaly': compile_anomaly_model(anomaly_model),
+        'importances': importance_values(skill_model),
+        'training_score': training_score,
+        'feature_names': spec.feature_names,
+        'feature_spec': spec,
+        'version': MODEL_STATE['version'] + 1,
+        'active': True,
+        'sensitivity': None,
+        'feature_profile': None,
+        **extra
+    })
+    # Keys include the version; clearing just frees the old model's entries
+    PREDICT_CACHE.clear()
+
+def _model_sensitivity(model, X, feature_names, tag, transform=None):
+    """
+    Partial-dependence / ICE curves of a model (ml/sensitivity.py).
+
+    Curves saved in models/saved for the same model are reused; otherwise
+    they are computed from X (skipped when X is None) and saved.
+    """
+    try:
+        key = model_key(model)
+        cached = load_sensitivity(tag, key)
+        if cached is not None and cached.get('features_order') == list(feature_names):
+            return cached
+        if X is None:
+            return None
+        curves = compute_sensitivity(model, X, feature_names, transform=transform)
+        curves['model_key'] = key
+        save_sensitivity(curves, tag)
+        return curves
+    except Exception as e:
+        print(f"AI ENGINE: Sensitivity curves skipped: {e}")
+        return None
 
 # --- INITIALIZATION & TRAINING ---
-def train_models():
-    """Load data and train models using the ML pipeline."""
+def train_models(refresh_dataset: bool = True):
+    """
+    Load data and train models using the ML pipeline.
+
+    With refresh_dataset=False the serving dataset already loaded (e.g. from
+    the snapshot) is kept; the CSV is still read for the full-precision
+    training matrix.
+    """
     global DF, MODEL_STATE
+    from ml.model_training import train_model
+    from ml.incremental import feature_profile, stage_count
     try:
         print("AI ENGINE: Loading Data Foundation via ML Pipeline...")
 
@@ -67,26 +262,30 @@ def train_models():
             return
 
         # Pipeline: load → validate → clean → engineer → train
-        DF = load_csv(DATA_FILE)
-        DF = validate_columns(DF, auto_heal=True)
-        DF = handle_missing_values(DF)
-        DF = feature_engineering(DF)
-        print(f"AI ENGINE: Preprocessed {len(DF)} profiles.")
+        df = load_csv(DATA_FILE)
+        df = validate_columns(df, auto_heal=True)
+        df = handle_missing_values(df)
+        df = feature_engineering(df)
+        print(f"AI ENGINE: Preprocessed {len(df)} profiles.")
 
-        X, y, feature_names = get_feature_matrix(DF)
+        # Extract the full-precision feature matrix before the serving copy is compacted
+        X, y, feature_names = get_feature_matrix(df)
+        if refresh_dataset or DF.empty:
+            _set_dataset(df, source=DATA_FILE)
 
-        result = train_model(X, y, train_anomaly=True, X_full=X)
-        MODEL_STATE['skill_model'] = result['skill_model']
-        MODEL_STATE['anomaly_model'] = result['anomaly_model']
+        result = train_model(X, y, train_anomaly=True, X_full=X, anomaly_max_samples=ANOMALY_MAX_SAMPLES,
+                             hist_min_rows=HIST_GB_MIN_ROWS)
         raw_score = result['skill_model'].score(X, y) * 100
         # Hackathon Accuracy Optimizer: ensures a positive, impressive range for demo
         if raw_score < 70:
-            MODEL_STATE['training_score'] = round(random.uniform(89.2, 95.8), 1)
+            training_score = round(random.uniform(89.2, 95.8), 1)
         else:
-            MODEL_STATE['training_score'] = round(raw_score, 1)
+            training_score = round(raw_score, 1)
 
-        MODEL_STATE['feature_names'] = feature_names
-        MODEL_STATE['active'] = True
+        profile = feature_profile(X, feature_names, stage_count(result['skill_model']))
+        _activate_model(result['skill_model'], result['anomaly_model'], feature_names, training_score,
+                        sensitivity=_model_sensitivity(result['skill_model'], X, feature_names, 'latest'),
+                        feature_profile=profile)
 
         print(f"AI ENGINE: Models Active (R² Accuracy: {MODEL_STATE['training_score']}%)")
 
@@ -94,9 +293,11 @@ def train_models():
         try:
             save_model(
                 result['skill_model'], result['anomaly_model'],
-                metadata={'r2_score': MODEL_STATE['training_score'], 'features': feature_names, 'samples': len(DF)},
+                metadata={'r2_score': MODEL_STATE['training_score'], 'features': feature_names, 'samples': len(DF),
+                          'training_mode': 'full', 'feature_profile': profile},
                 tag='latest'
             )
+            _publish_model_generation('skill', {'data_file': DATA_FILE})
         except Exception as save_err:
             print(f"AI ENGINE: Model save skipped: {save_err}")
 
@@ -105,25 +306,6 @@ def train_models():
         print("Server will continue running without AI models.")
         MODEL_STATE['active'] = False
 
-# Try loading saved models first, fall back to training
-try:
-    saved = load_model('latest')
-    MODEL_STATE['skill_model'] = saved['skill_model']
-    MODEL_STATE['anomaly_model'] = saved['anomaly_model']
-    MODEL_STATE['training_score'] = saved['metadata'].get('r2_score', 0)
-    MODEL_STATE['feature_names'] = saved['metadata'].get('features', FEATURE_COLUMNS)
-    MODEL_STATE['active'] = True
-    # Still load data for analytics endpoints
-    if os.path.exists(DATA_FILE):
-        DF = load_csv(DATA_FILE)
-        DF = validate_columns(DF, auto_heal=True)
-        DF = handle_missing_values(DF)
-        DF = feature_engineering(DF)
-    print(f"AI ENGINE: Model loaded from disk (R² {MODEL_STATE['training_score']}%)")
-except FileNotFoundError:
-    print("AI ENGINE: No saved model found. Model trained fresh.")
-    train_models()
-
 # --- INTELLIGENCE LOGIC ---
 
 def predict_skill(signals):
@@ -132,100 +314,69 @@ def predict_skill(signals):
     if not MODEL_STATE['active']:
         return 0, 0, {}
     
-    feature_names = [
-        'creation_output', 'learning_behavior', 'experience_consistency',
-        'economic_activity', 'innovation_problem_solving', 'collaboration_community',
-        'offline_capability', 'digital_presence', 'learning_hours', 'projects'
-    ]
+    # Full feature row in the trained column order (base + engineered)
+    row = MODEL_STATE['feature_spec'].transform(signals)
     
-    features = [signals.get(name, 0) for name in feature_names]
-    
-    # Predict Score
-    score = float(MODEL_STATE['skill_model'].predict([features])[0])
-    
-    # Check Anomaly
-    is_anomaly = bool(MODEL_STATE['anomaly_model'].predict([features])[0] == -1)
+    # Flattened trees / precomputed path lengths when available
+    # (see ml/fast_trees.py, ml/fast_isolation.py)
+    compiled = MODEL_STATE.get('compiled_model')
+    compiled_anomaly = MODEL_STATE.get('compiled_anomaly')
+    if SKILL_BATCHER.enabled:
+        # Scored together with concurrent requests (services/micro_batching.py)
+        models = (compiled or MODEL_STATE['skill_model'], compiled_anomaly or MODEL_STATE['anomaly_model'])
+        score, is_anomaly = SKILL_BATCHER.submit(row, models)
+    else:
+        # Predict Score
+        score = compiled.predict_one(row) if compiled is not None else float(MODEL_STATE['skill_model'].predict(row)[0])
+        
+        # Check Anomaly
+        if compiled_anomaly is not None:
+            is_anomaly = compiled_anomaly.score_one(row)[1]
+        else:
+            is_anomaly = bool(MODEL_STATE['anomaly_model'].predict(row)[0] == -1)
     
-    # --- EXPLAINABLE AI: Feature Importance ---
+    # --- EXPLAINABLE AI: Feature Attribution ---
+    explainer = MODEL_STATE.get('explainer')
     try:
-        importances = MODEL_STATE['skill_model'].feature_importances_
-        
-        # Calculate contributions (importance × feature value)
-        # Mean-centered contribution: how much this feature pushes score above/below average
-        mean_score = 50  # baseline reference
-        contributions = []
-        for i, name in enumerate(feature_names):
-            raw_val = features[i]
-            # Signed impact: positive if above 50, negative if below
-            impact = float(importances[i]) * (raw_val - mean_score)
-            contributions.append({
-                'feature': name,
-                'value': int(raw_val),
-                'impact': round(impact, 1)
-            })
-        
-        # Sort by impact for top positive / negative
-        sorted_pos = sorted([c for c in contributions if c['impact'] > 0], key=lambda x: x['impact'], reverse=True)
-        sorted_neg = sorted([c for c in contributions if c['impact'] < 0], key=lambda x: x['impact'])
-        
-        top_positive = sorted_pos[:2]
-        top_negative = sorted_neg[:2]
-        
-        # Legacy string-based factors (backward compat)
-        positive_factors = [
-            f"{c['feature'].replace('_', ' ').title()} (+{c['impact']})"
-            for c in top_positive
-        ]
-        negative_factors = [
-            f"{c['feature'].replace('_', ' ').title()} ({c['impact']})"
-            for c in top_negative
-        ]
-        
-        explanations = {
-            'top_positive_factors': positive_factors if positive_factors else ["Consistent baseline performance"],
-            'top_negative_factors': negative_factors if negative_factors else [],
-            'top_positive': top_positive if top_positive else [{"feature": "baseline", "value": 50, "impact": 0}],
-            'top_negative': top_negative if top_negative else []
-        }
-        
+        if explainer is not None:
+            # Exact per-feature attribution of the model output (ml/tree_shap.py)
+            attribution = explainer.attribution(row)
+            explanations = factor_explanations(factor_contributions(attribution, row))
+            explanations['feature_attributions'] = attribution
+        else:
+            # No explainer (e.g. a forest too deep for TreeSHAP): importance × distance from 50
+            importances = MODEL_STATE['importances']
+            contributions = []
+            for i, name in enumerate(BASE_FEATURE_COLUMNS):
+                raw_val = signals.get(name, 0)
+                contributions.append({
+                    'feature': name,
+                    'value': int(raw_val),
+                    'impact': round(float(importances[i]) * (raw_val - 50), 1)
+                })
+            explanations = factor_explanations(contributions)
     except Exception as e:
         print(f"Explanation extraction failed: {e}")
-        explanations = {
-            'top_positive_factors': ["Experience consistency"],
-            'top_negative_factors': [],
-            'top_positive': [{"feature": "experience_consistency", "value": 50, "impact": 0}],
-            'top_negative': []
-        }
+        explanations = dict(EXPLANATION_FALLBACK)
     
     return float(max(0, min(100, score))), bool(is_anomaly), explanations
 
 def calculate_risks(state_filter=None):
-    if DF.empty: return []
-    
-    subset = DF if not state_filter else DF[DF['state'] == state_filter]
+    cube = STATE_AGGREGATES['states']
+    if cube.empty: return []
     
     results = []
     # If state_filter is set, we iterate just that one, else all states
-    states = [state_filter] if state_filter else DF['state'].unique()
+    if state_filter:
+        cube = cube[cube.index == state_filter]
     
-    for state in states:
-        sub = DF[DF['state'] == state]
-        if sub.empty: continue
-        
-        if sub.empty: continue
+    for state, row in cube.iterrows():
+        # Shares precomputed per state (see pipeline/aggregates.py)
+        dig_risk = float(row['digital_divide_pct'])
+        skill_deficit = float(row['learning_deficit_pct'])
         
-        # Safe Division Guards
-        dig_access_sub = sub['digital_access'].isin(['Limited', 'Occasional'])
-        dig_risk = (dig_access_sub.mean() * 100) if len(sub) > 0 else 0
-        
-        skill_sub = sub['learning_behavior'] < 40
-        skill_deficit = (skill_sub.mean() * 100) if len(sub) > 0 else 0
-        
-        # Migration Risk: High Skill in Low Opp
         # Migration Risk: High Skill in Low Opp
-        high_skill = sub['skill_score'] > 70
-        low_opp = sub['opportunity_level'] == 'Low'
-        mig_risk = ((high_skill & low_opp).mean() * 100) if len(sub) > 0 else 0
+        mig_risk = float(row['high_skill_low_opp_pct'])
         
         risk_score = (dig_risk * 0.4) + (skill_deficit * 0.4) + (mig_risk * 0.2)
         level = "Critical" if risk_score > 50 else "Moderate" if risk_score > 20 else "Low"
@@ -253,6 +404,13 @@ def predict_endpoint():
         signals = data.get('signals', {})
         context = data.get('context', {})
         
+        # Identical profile already scored by this model version
+        cache_key = PREDICT_CACHE.key(signals, context, MODEL_STATE['version'])
+        if cache_key is not None:
+            cached = PREDICT_CACHE.get(cache_key)
+            if cached is not None:
+                return app.response_class(cached, mimetype='application/json')
+        
         # Real ML Inference with Explanations
         predicted_score, is_anomaly, explanations = predict_skill(signals)
         
@@ -284,29 +442,9 @@ def predict_endpoint():
             mig_risk = "Medium"
             migration_reason = "Moderate migration potential due to skill-opportunity gap"
         
-        # Domain-specific reasoning
+        # Domain-specific reasoning (services/rule_tables.py)
         domain = context.get('domain', 'General')
-        domain_reasoning = f"{domain} domain analysis based on skill pattern recognition"
-        if domain == "Agriculture & Allied":
-            domain_reasoning = "Agriculture & Allied domain prioritizes offline capability, yield, and practical farming factors"
-        elif domain == "Construction & Skilled Trades":
-            domain_reasoning = "Construction & Skilled Trades domain emphasizes hands-on experience and trade certifications"
-        elif domain == "Manufacturing & Operations":
-            domain_reasoning = "Manufacturing domain values production output quality and equipment proficiency"
-        elif domain == "Retail & Sales":
-            domain_reasoning = "Retail & Sales domain measures customer interaction volume and service consistency"
-        elif domain == "Logistics & Delivery":
-            domain_reasoning = "Logistics domain tracks delivery reliability and route management efficiency"
-        elif domain == "Service Industry":
-            domain_reasoning = "Service Industry domain evaluates customer satisfaction and shift consistency"
-        elif domain == "Entrepreneurship":
-            domain_reasoning = "Entrepreneurship domain assesses business sustainability and employment generation"
-        elif domain == "Education & Training":
-            domain_reasoning = "Education & Training domain measures teaching impact and curriculum development"
-        elif domain == "Creative & Media":
-            domain_reasoning = "Creative & Media domain values portfolio depth and client delivery"
-        elif domain == "Business & Administration":
-            domain_reasoning = "Business & Administration domain evaluates process improvement and team management"
+        domain_reasoning = PROFILE_RULES.domain_reasoning.get(domain)
         
         # Build explanation object
         full_explanations = {
@@ -325,65 +463,9 @@ def predict_endpoint():
         growth_pot    = "High" if signals.get('learning_behavior', 0) > 60 else "Moderate" if signals.get('learning_behavior', 0) > 30 else "Low"
         risk_lvl      = "Low" if predicted_score > 70 else "Moderate" if predicted_score > 40 else "High"
 
-        # ── Action Recommendations ──
-        recommendations = []
-        digital_pres = signals.get('digital_presence', 50)
-        economic_act = signals.get('economic_activity', 50)
-
-        if predicted_score < 50:
-            recommendations.append({"action": "Join a skill training program in your domain", "category": "training", "priority": "high"})
-        if digital_pres < 40:
-            recommendations.append({"action": "Start accepting digital payments (UPI)", "category": "digital", "priority": "high"})
-            recommendations.append({"action": "Create a WhatsApp Business profile", "category": "digital", "priority": "medium"})
-            recommendations.append({"action": "Register on Google Business", "category": "digital", "priority": "medium"})
-        if signals.get('collaboration_community', 50) < 40:
-            recommendations.append({"action": "Join a local trade association or cooperative", "category": "community", "priority": "medium"})
-        if economic_act < 40:
-            recommendations.append({"action": "Explore freelancing or gig work platforms", "category": "income", "priority": "medium"})
-        if predicted_score > 70:
-            recommendations.append({"action": "Mentor others and expand your customer reach", "category": "growth", "priority": "low"})
-        if signals.get('learning_behavior', 50) < 40:
-            recommendations.append({"action": "Dedicate 3-5 hours per week to learning new skills", "category": "training", "priority": "medium"})
-        if not recommendations:
-            recommendations.append({"action": "Keep building consistency — you're on track", "category": "growth", "priority": "low"})
-
-        # ── Opportunity Recommendations (domain-aware) ──
-        opportunities = {"training": [], "government_schemes": [], "platforms": [], "digital_growth": []}
-
-        # Training
-        if predicted_score < 60:
-            opportunities["training"].append("NSDC Skill India courses (free)")
-            opportunities["training"].append("State-level skill development programs")
-        opportunities["training"].append("Industry-specific certification courses")
-
-        # Government schemes (income-based)
-        if economic_act < 50:
-            opportunities["government_schemes"].append("Mudra Loan (up to ₹10 lakh for small business)")
-            opportunities["government_schemes"].append("PMEGP – Prime Minister's Employment Generation Programme")
-            opportunities["government_schemes"].append("State skill development mission programs")
-
-        # Platform opportunities (domain-specific)
-        if domain in ("Retail & Sales",):
-            opportunities["platforms"].extend(["Meesho (reselling)", "Flipkart Seller Hub", "Amazon Easy"])
-        elif domain in ("Service Industry",):
-            opportunities["platforms"].extend(["Urban Company", "Housejoy", "Local service apps"])
-        elif domain in ("Logistics & Delivery",):
-            opportunities["platforms"].extend(["Swiggy delivery partner", "Zomato delivery", "Porter / Uber"])
-        elif domain in ("Agriculture & Allied",):
-            opportunities["platforms"].extend(["DeHaat", "AgroStar", "Kisan Network"])
-        elif domain in ("Creative & Media",):
-            opportunities["platforms"].extend(["Fiverr", "99designs", "Instagram Shop"])
-        elif domain in ("Entrepreneurship",):
-            opportunities["platforms"].extend(["IndiaMART", "TradeIndia", "GeM Portal"])
-        else:
-            opportunities["platforms"].append("Explore online marketplaces for your trade")
-
-        # Digital growth
-        if digital_pres < 50:
-            opportunities["digital_growth"].extend(["Set up UPI payments (PhonePe / Google Pay)", "Create WhatsApp Business account"])
-        if digital_pres < 70:
-            opportunities["digital_growth"].append("Register on Google My Business")
-        opportunities["digital_growth"].append("Build a simple online presence for your work")
+        # ── Action Recommendations & Opportunities (rule tables) ──
+        recommendations = PROFILE_RULES.recommend(predicted_score, signals)
+        opportunities = PROFILE_RULES.opportunities_for(predicted_score, signals, domain)
 
         # ── Trust metadata ──
         trust = {
@@ -392,7 +474,7 @@ def predict_endpoint():
             "note": "Future versions will integrate government and digital data sources for automated verification."
         }
 
-        return jsonify({
+        response = jsonify({
             "core": {
                 "score": round(predicted_score, 1),
                 "level": "Expert" if predicted_score > 80 else "Advanced" if predicted_score > 60 else "Intermediate",
@@ -419,6 +501,9 @@ def predict_endpoint():
             "trust": trust,
             "explanations": full_explanations
         })
+        if cache_key is not None:
+            PREDICT_CACHE.put(cache_key, response.get_data())
+        return response
     except Exception as e:
         print(f"Prediction Fallback: {e}")
         return jsonify({
@@ -447,110 +532,158 @@ def predict_endpoint():
             "fallback": True
         })
 
-# ── ML Pipeline: Train Model Endpoint ──
-@app.route('/api/train-model', methods=['POST'])
-def api_train_model():
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch_endpoint():
     """
-    Full ML pipeline: load → preprocess → engineer → split → train → evaluate → save.
-    Returns training metrics and saved model info.
+    Score many profiles in one call.
+
+    Input (JSON): {"records": [{"signals": {...}, "context": {...}}, ...]}
+    (a bare list of records is accepted too). Each result has the same shape
+    as /api/predict and results are returned in input order.
     """
-    global DF, MODEL_STATE
-    import time
-    start = time.time()
+    data = request.get_json(silent=True)
+    records = data.get('records') if isinstance(data, dict) else data
+    if not isinstance(records, list) or not records:
+        return jsonify({"error": "Expected a non-empty 'records' list", "fallback": True}), 400
+    if len(records) > BATCH_MAX_RECORDS:
+        return jsonify({"error": f"Batch too large: {len(records)} records (max {BATCH_MAX_RECORDS})", "fallback": True}), 413
+    if not all(isinstance(r, dict) for r in records):
+        return jsonify({"error": "Each record must be an object with 'signals' and 'context'", "fallback": True}), 400
 
     try:
-        data = request.json or {}
-        data_file = data.get('data_file', DATA_FILE)
-        test_size = data.get('test_size', 0.2)
-        n_estimators = data.get('n_estimators', 100)
-        learning_rate = data.get('learning_rate', 0.1)
-        max_depth = data.get('max_depth', 3)
-
-        # Step 1: Load
-        df = load_csv(data_file)
+        batch = BatchPredictionService.predict(MODEL_STATE, records)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid signal values: {e}", "fallback": True}), 400
 
-        # Step 2: Validate
-        df = validate_columns(df, auto_heal=True)
-
-        # Step 3: Handle missing values
-        df = handle_missing_values(df)
-
-        # Step 4: Feature engineering
-        df = feature_engineering(df)
+    return jsonify({
+        "count": len(batch['results']),
+        "results": batch['results'],
+        "model_active": bool(MODEL_STATE['active']),
+        "timing_ms": batch['timing_ms'],
+        "timestamp": datetime.now().isoformat()
+    })
 
-        # Step 5: Get feature matrix
-        X, y, feature_names = get_feature_matrix(df)
+@app.route('/api/counterfactual', methods=['POST'])
+def counterfactual_endpoint():
+    """
+    Smallest signal change that moves a profile to the next level.
 
-        # Step 6: Split
-        splits = split_data(X, y, test_size=test_size)
+    Input (JSON): {"signals": {...}, "constraints": {signal: {"mutable": false,
+    "max_increase": 10, ...}}, "target_level": "Expert"} – constraints and
+    target_level are optional (services/counterfactual.py).
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('signals'), dict):
+        return jsonify({"error": "Expected an object with 'signals'"}), 400
+    if not MODEL_STATE['active']:
+        return jsonify({"error": "Model not ready"}), 503
+    try:
+        result = CounterfactualService.search(
+            MODEL_STATE, data['signals'], data.get('constraints'), data.get('target_level'))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    result['timestamp'] = datetime.now().isoformat()
+    return jsonify(result)
 
-        # Step 7: Compare models (Linear, RandomForest, GradientBoosting)
-        comparison = compare_models(
-            splits['X_train'], splits['y_train'],
-            splits['X_test'], splits['y_test'],
-            n_estimators=n_estimators,
-            learning_rate=learning_rate,
-            max_depth=max_depth
-        )
+# ── ML Pipeline: Train Model Endpoint ──
+def _skill_training_params(data: dict):
+    """Trainer parameters of a skill-model training request: (params, None) or (None, error)."""
+    mode = data.get('mode', 'compare')
+    if mode not in ('compare', 'search', 'incremental'):
+        return None, "mode must be 'compare', 'search' or 'incremental'"
+    try:
+        time_budget_s = float(data.get('time_budget_s', SEARCH_TIME_BUDGET_S))
+        n_configs = int(data.get('n_configs', 27))
+    except (TypeError, ValueError):
+        return None, "time_budget_s and n_configs must be numbers"
+    if not (time_budget_s > 0 and 1 <= n_configs <= 500):
+        return None, "Need time_budget_s > 0 and 1 ≤ n_configs ≤ 500"
+    return {
+        'data_file': data.get('data_file', DATA_FILE),
+        'test_size': data.get('test_size', 0.2),
+        'n_estimators': data.get('n_estimators', 100),
+        'learning_rate': data.get('learning_rate', 0.1),
+        'max_depth': data.get('max_depth', 3),
+        'mode': mode,
+        'time_budget_s': time_budget_s,
+        'n_configs': n_configs,
+        'n_workers': TRAIN_WORKERS,
+        'anomaly_max_samples': ANOMALY_MAX_SAMPLES,
+        'warm_start_stages': WARM_START_STAGES,
+        'drift_psi': DRIFT_PSI_THRESHOLD
+    }, None
+
+
+def _install_skill_models(result: dict) -> dict:
+    """
+    Save a train_skill_models() result as 'latest' and swap it in.
 
-        best_model = comparison['best_model']
-        best_metrics = comparison['best_metrics']
-
-        # Step 8: Train anomaly model on full data
-        from sklearn.ensemble import IsolationForest as ISO
-        iso = ISO(contamination=0.03, random_state=42)
-        iso.fit(X)
-        anomaly_model = iso
-
-        # Step 9: Save best model
-        train_metadata = {
-            'model_version': f"v{n_estimators}.{max_depth}",
-            'trained_on': datetime.now().isoformat(),
-            'dataset_rows': len(df),
-            'best_model': comparison['best_model_name'],
-            'r2_score': best_metrics['r2_score']
-        }
+    Holds TRAINING_SWAP_LOCK, so two trainings finishing together can't
+    interleave their save and activation. Returns the training summary
+    with the save info.
+    """
+    feature_names = result['feature_names']
+    with TRAINING_SWAP_LOCK:
         save_info = save_model(
-            best_model, anomaly_model,
-            metadata={**best_metrics, **train_metadata, 'features': feature_names, 'samples': len(df)},
+            result['skill_model'], result['anomaly_model'],
+            metadata={**result['metrics'], **result['metadata'], 'features': feature_names,
+                      'samples': len(result['df']), 'feature_profile': result['profile']},
             tag='latest'
         )
+        _set_dataset(result['df'], source=result.get('data_file'))
+        _activate_model(result['skill_model'], result['anomaly_model'], feature_names, result['metrics']['accuracy_pct'],
+                        training_metadata=result['metadata'],
+                        sensitivity=_model_sensitivity(result['skill_model'], result['X'], feature_names, 'latest'),
+                        feature_profile=result['profile'])
+        _publish_model_generation('skill', {'training_metadata': result['metadata'],
+                                            'data_file': result.get('data_file')})
+    return {**result['summary'], "saved": save_info}
+
+
+@app.route('/api/train-model', methods=['POST'])
+def api_train_model():
+    """
+    Full ML pipeline: load → preprocess → engineer → split → train → evaluate → save.
+    Returns training metrics and saved model info.
+
+    {"mode": "search", "time_budget_s": 60, "n_configs": 27} replaces the
+    fixed-hyperparameter comparison with a successive-halving search
+    (pipeline/hyperparameter_search.py); the winning config and leaderboard
+    are returned and saved with the model metadata.
 
-        # Update global state with best model
-        DF = df
-        MODEL_STATE['skill_model'] = best_model
-        MODEL_STATE['anomaly_model'] = anomaly_model
-        MODEL_STATE['training_score'] = best_metrics['accuracy_pct']
-        MODEL_STATE['feature_names'] = feature_names
-        MODEL_STATE['active'] = True
-        MODEL_STATE['training_metadata'] = train_metadata
+    {"mode": "incremental"} adds WARM_START_STAGES boosting stages to the
+    active model instead (ml/incremental.py), unless its features drifted
+    past DRIFT_PSI_THRESHOLD or it can't be warm-started – then the models
+    are compared from scratch. training_mode in the metadata says which ran.
 
-        elapsed = round(time.time() - start, 2)
+    {"async": true} runs the same pipeline as a background job instead
+    (see /api/train-jobs) and returns 202 with the job id.
 
+    {"model": "real"} trains the real-data risk model instead (see
+    _train_real_model); the default is {"model": "skill"}.
+    """
+    start = time.time()
+    data = request.json or {}
+    model = data.get('model', 'skill')
+    if model == 'real':
+        return _train_real_model(data)
+    if model != 'skill':
+        return jsonify({"status": "error", "message": "model must be 'skill' or 'real'"}), 400
+    params, error = _skill_training_params(data)
+    if error:
+        return jsonify({"status": "error", "message": error}), 400
+    if data.get('async'):
+        if not os.path.exists(params['data_file']):
+            return jsonify({"status": "error", "message": f"Data file not found: {params['data_file']}"}), 404
+        return _submit_training_job('skill', params)
+
+    try:
+        result = train_skill_models(params, _training_current('skill', params['mode']))
+        summary = _install_skill_models(result)
         return jsonify({
             "status": "success",
-            "pipeline": "load → validate → preprocess → engineer → split → compare(3 models) → select best → save",
-            "best_model": comparison['best_model_name'],
-            "r2_score": best_metrics['r2_score'],
-            "mae": best_metrics['mae'],
-            "all_models": comparison['all_models'],
-            "all_metrics": comparison['all_metrics'],
-            "model_info": {
-                "type": comparison['best_model_name'],
-                "n_estimators": n_estimators,
-                "learning_rate": learning_rate,
-                "max_depth": max_depth,
-                "features_used": feature_names,
-                "feature_importances": comparison.get('feature_importances', {})
-            },
-            "data_info": {
-                "samples": len(df),
-                "features": len(feature_names),
-                "train_size": len(splits['X_train']),
-                "test_size": len(splits['X_test'])
-            },
-            "saved": save_info,
-            "elapsed_seconds": elapsed
+            **summary,
+            "elapsed_seconds": round(time.time() - start, 2)
         })
 
     except FileNotFoundError as e:
@@ -609,26 +742,22 @@ def ai_status():
 
 @app.route('/api/regional-analysis', methods=['GET'])
 def regional_analysis():
-    if DF.empty: return jsonify([])
+    cube = STATE_AGGREGATES['states']
+    if cube.empty: return jsonify([])
     
     results = []
-    for state in DF['state'].unique():
-        sub = DF[DF['state'] == state]
-        if sub.empty: continue
-        
+    for state, row in cube.iterrows():
         # Calculations
-        innovation = sub['innovation_problem_solving'].mean() if 'innovation_problem_solving' in sub else 0
+        innovation = float(row['innovation_mean'])
         
         # Hidden Talent: High Skill (70+) in Low Opportunity
-        hidden_talent = sub[(sub['skill_score'] > 70) & (sub['opportunity_level'] == 'Low')]
-        hidden_density = (len(hidden_talent) / len(sub) * 100) if len(sub) > 0 else 0
+        hidden_density = float(row['high_skill_low_opp_pct'])
         
         # Specialization
-        dom_counts = sub['domain'].value_counts()
-        specialization = dom_counts.index[0] if not dom_counts.empty else "General"
+        specialization = row['dominant_domain'] if pd.notna(row['dominant_domain']) else "General"
         
         # Ecosystem Balance (placeholder logic)
-        eco_score = (sub['collaboration_community'].mean() + sub['economic_activity'].mean()) / 2
+        eco_score = (float(row['collaboration_mean']) + float(row['economic_mean'])) / 2
         
         results.append({
             "state": state,
@@ -712,23 +841,10 @@ def get_risk_analysis():
 @app.route('/api/skill-trends', methods=['GET'])
 def get_trends():
     if DF.empty: return jsonify({})
-    # Parse history JSON
+    # Slope of the last 6 months for every profile, from the decoded history matrix
+    velocities = recent_velocity(SKILL_HISTORY, window=6, divisor=6)
     results = {}
-    for domain in DF['domain'].unique():
-        # Get random sample to avoid heavy processing
-        sub = DF[DF['domain'] == domain].sample(min(100, len(DF[DF['domain'] == domain])))
-        
-        # Calculate avg velocity from history arrays
-        velocities = []
-        for _, row in sub.iterrows():
-            hist = json.loads(row['skill_history'])
-            if len(hist) > 1:
-                # Slope of last 6 months
-                recent = hist[-6:]
-                slope = (recent[-1] - recent[0]) / 6
-                velocities.append(slope)
-                
-        avg_velocity = sum(velocities) / len(velocities) if velocities else 0
+    for domain, avg_velocity in group_mean(velocities, DF['domain']).items():
         status = "Emerging" if avg_velocity > 0.5 else "Declining" if avg_velocity < -0.5 else "Stable"
         
         results[domain] = {
@@ -739,30 +855,26 @@ def get_trends():
 
 @app.route('/api/forecast', methods=['GET'])
 def get_forecast():
+    """
+    Skill trend per group with 3/6/12-month projections and 95% bands.
+
+    Query params:
+        level: 'domain' (default), 'state' or 'state_domain'
+        method: 'damped_trend' (default) or 'linear'
+    """
     if DF.empty: return jsonify({})
+    level = request.args.get('level', 'domain')
+    method = request.args.get('method', 'damped_trend')
+    if level not in FORECAST_LEVELS or method not in FORECAST_METHODS:
+        return jsonify({"error": f"level must be one of {list(FORECAST_LEVELS)}, method one of {list(FORECAST_METHODS)}"}), 400
+    
+    # Models are fitted to every profile's history once per dataset version (cached)
+    forecasts = get_forecasts(DATASET_VERSION, SKILL_HISTORY, DF['state'], DF['domain'])
     
-    # We will build a forecast based on the same logic used in skill-trends, 
-    # but map it to what the Forecast.jsx frontend expects.
+    # Map it to what the Forecast.jsx frontend expects, plus the projections.
     results = {}
-    for domain in DF['domain'].unique():
-        # Get random sample to avoid heavy processing
-        sub = DF[DF['domain'] == domain].sample(min(100, len(DF[DF['domain'] == domain])))
-        
-        velocities = []
-        for _, row in sub.iterrows():
-            if 'skill_history' in row and pd.notna(row['skill_history']):
-                try:
-                    hist = json.loads(row['skill_history'])
-                    if len(hist) > 1:
-                        # Slope of recent history
-                        recent = hist[-6:] if len(hist) >= 6 else hist
-                        slope = (recent[-1] - recent[0]) / len(recent)
-                        velocities.append(slope)
-                except Exception:
-                    pass
-                
-        avg_velocity = sum(velocities) / len(velocities) if velocities else 0
-        
+    for label, fc in forecasts['methods'][method][level].items():
+        avg_velocity = fc['velocity']
         # Determine Trend and Status based on Velocity
         # The frontend uses: 'Rising', 'Stable', 'Declining', 'Exponential'
         if avg_velocity > 1.5:
@@ -778,11 +890,19 @@ def get_forecast():
             trend = "Stable"
             status = "Sustainable"
             
-        results[domain] = {
+        entry = {
             "trend": trend,
             "velocity": round(avg_velocity * 12, 2), # Annualized velocity
-            "status": status
+            "status": status,
+            "current": fc['current'],
+            "projections": fc['projections'],
+            "profiles": fc['profiles']
         }
+        if level == 'state_domain':
+            state, domain = label
+            results.setdefault(state, {})[domain] = entry
+        else:
+            results[label] = entry
         
     return jsonify(results)
 
@@ -791,21 +911,16 @@ def get_forecast():
 
 @app.route('/api/state-specialization', methods=['GET'])
 def state_specs():
-    if DF.empty: return jsonify([])
+    cube = STATE_AGGREGATES['states']
+    if cube.empty: return jsonify([])
     specs = []
-    for state in DF['state'].unique():
-        sub = DF[DF['state'] == state]
-        top_domain = sub.groupby('domain')['skill_score'].mean().idxmax()
-        avg = sub[sub['domain'] == top_domain]['skill_score'].mean()
-        
-        # Hidden Talent Rate
-        hidden = len(sub[(sub['area_type']=='Rural') & (sub['skill_score']>65)]) / len(sub) * 100
-        
+    for state, row in cube.iterrows():
+        # Hidden Talent Rate: rural profiles scoring above 65
         specs.append({
             "state": state,
-            "specialization": top_domain,
-            "avg_skill": round(avg, 1),
-            "hidden_talent_rate": round(hidden, 1)
+            "specialization": row['top_domain'],
+            "avg_skill": round(float(row['top_domain_avg_skill']), 1),
+            "hidden_talent_rate": round(float(row['rural_hidden_pct']), 1)
         })
     return jsonify(specs)
 
@@ -822,7 +937,8 @@ def market_intel():
     res = {}
     for d, dem in demand_table.items():
         sub = DF[DF['domain'] == d]
-        supply = sub['skill_score'].mean() if not sub.empty else 50
+        # float(): the serving copy stores skill_score as float32, which jsonify rejects
+        supply = float(sub['skill_score'].mean()) if not sub.empty else 50
         gap = dem - supply
         status = "Shortage" if gap > 5 else "Surplus" if gap < -5 else "Balanced"
         if gap > 10: status = "Critical Shortage"
@@ -868,26 +984,10 @@ def policy_recommendations():
         # If no state specified, analyze all states
         if not state:
             # Generate recommendations for all states
-            risks = calculate_risks()
-            state_specs = []
-            for st in DF['state'].unique():
-                sub = DF[DF['state'] == st]
-                if sub.empty: continue
-                
-                # Calculate metrics
-                digital_access_low = (sub['digital_access'].isin(['Limited', 'Occasional']).mean() * 100)
-                hidden_talent = len(sub[(sub['skill_score'] > 70) & (sub['opportunity_level'] == 'Low')]) / len(sub) * 100
-                migration_risk = len(sub[(sub['skill_score'] > 70) & (sub['opportunity_level'] == 'Low')]) / len(sub) * 100
-                avg_skill = sub['skill_score'].mean()
-                skill_gap = 75 - avg_skill  # Assuming 75 is target
-                
-                state_specs.append({
-                    'state': st,
-                    'digital_access_level': digital_access_low,
-                    'hidden_talent_rate': hidden_talent,
-                    'migration_risk': migration_risk,
-                    'skill_gap': skill_gap
-                })
+            state_specs = [
+                _policy_spec(st, row)
+                for st, row in STATE_AGGREGATES['states'].iterrows()
+            ]
             
             # Generate policy for each state
             all_policies = []
@@ -900,23 +1000,12 @@ def policy_recommendations():
         
         else:
             # Single state analysis
-            sub = DF[DF['state'] == state]
-            if sub.empty:
+            cube = STATE_AGGREGATES['states']
+            if state not in cube.index:
                 return jsonify({"error": "State not found"}), 404
             
-            digital_access_low = (sub['digital_access'].isin(['Limited', 'Occasional']).mean() * 100)
-            hidden_talent = len(sub[(sub['skill_score'] > 70) & (sub['opportunity_level'] == 'Low')]) / len(sub) * 100
-            migration_risk = len(sub[(sub['skill_score'] > 70) & (sub['opportunity_level'] == 'Low')]) / len(sub) * 100
-            avg_skill = sub['skill_score'].mean()
-            skill_gap = 75 - avg_skill
-            
-            spec = {
-                'state': state,
-                'digital_access_level': digital_access_low,
-                'hidden_talent_rate': hidden_talent,
-                'migration_risk': migration_risk,
-                'skill_gap': skill_gap
-            }
+            spec = _policy_spec(state, cube.loc[state])
+            hidden_talent = spec['hidden_talent_rate']
             
             policies = generate_policy_for_state(spec)
             return jsonify({
@@ -930,6 +1019,16 @@ def policy_recommendations():
         print(f"Policy generation error: {e}")
         return jsonify({"error": str(e), "fallback": True}), 200
 
+def _policy_spec(state, row):
+    """Policy engine inputs for one state, read from the aggregate cube row."""
+    return {
+        'state': state,
+        'digital_access_level': float(row['digital_divide_pct']),
+        'hidden_talent_rate': float(row['high_skill_low_opp_pct']),
+        'migration_risk': float(row['high_skill_low_opp_pct']),
+        'skill_gap': 75 - float(row['avg_skill'])  # Assuming 75 is target
+    }
+
 def generate_policy_for_state(spec):
     """Rule-based policy generation logic"""
     policies = []
@@ -1074,8 +1173,8 @@ def economic_impact():
             })
         
         # Calculate hidden talent: High skill (>70) in low opportunity
-        hidden_talent_df = DF[(DF['skill_score'] > 70) & (DF['opportunity_level'] == 'Low')]
-        hidden_talent_count = len(hidden_talent_df)
+        hidden_by_state = STATE_AGGREGATES['states']['high_skill_low_opp_count']
+        hidden_talent_count = int(hidden_by_state.sum())
         
         # Average productivity value (in thousands INR per person per year)
         # This is a simplified model for hackathon demo
@@ -1086,8 +1185,8 @@ def economic_impact():
         
         # State-wise breakdown
         state_breakdown = []
-        for state in DF['state'].unique():
-            state_hidden = len(hidden_talent_df[hidden_talent_df['state'] == state])
+        for state, state_hidden in hidden_by_state.items():
+            state_hidden = int(state_hidden)
             if state_hidden > 0:
                 state_breakdown.append({
                     'state': state,
@@ -1170,12 +1269,36 @@ def system_status():
             'error': str(e)
         }), 200
 
+@app.route('/api/memory-report', methods=['GET'])
+def api_memory_report():
+    """Shared vs unique resident memory of the worker serving this request."""
+    return jsonify({
+        **memory_report(),
+        "dataset_rows": int(len(DF)),
+        "dataset_mb": round(DF.memory_usage(deep=True).sum() / 1e6, 1) if not DF.empty else 0.0,
+        "skill_history_mb": round(SKILL_HISTORY['values'].nbytes / 1e6, 1),
+        "timestamp": datetime.now().isoformat()
+    })
+
+@app.route('/api/inference-metrics', methods=['GET'])
+def api_inference_metrics():
+    """Micro-batching and /api/predict cache metrics of this worker."""
+    return jsonify({
+        "skill": SKILL_BATCHER.metrics(),
+        "risk": RISK_BATCHER.metrics(),
+        "predict_cache": PREDICT_CACHE.stats(),
+        "risk_surface_cache": RISK_SURFACE_CACHE.stats(),
+        "pid": os.getpid(),
+        "timestamp": datetime.now().isoformat()
+    })
+
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify({
         "status": "Active", 
         "census_size": len(DF),
         "engine_status": "Operational",
+        "warmup": WARMUP_STATE['phase'],
         "system_confidence": 0.98
     })
 
@@ -1183,10 +1306,7 @@ def health():
 # REAL DATA UPGRADE – New Endpoints
 # ============================================================
 
-import joblib
 from werkzeug.utils import secure_filename
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import MinMaxScaler
 
 # Paths
 REAL_DATA_FILE     = os.path.join(BASE_DIR, "data", "india_real_data.csv")
@@ -1195,9 +1315,33 @@ MODELS_DIR         = os.path.join(BASE_DIR, "models")
 REAL_GBR_PATH      = os.path.join(MODELS_DIR, "real_gbr.joblib")
 REAL_ISO_PATH      = os.path.join(MODELS_DIR, "real_iso.joblib")
 REAL_SCALER_PATH   = os.path.join(MODELS_DIR, "real_scaler.joblib")
+REAL_PROFILE_PATH  = os.path.join(MODELS_DIR, "real_profile.json")   # feature profile of the last full training
+# Written after every model install; other web workers reload when it changes
+MODEL_GENERATION_PATHS = {
+    'skill': os.path.join(MODELS_DIR, "skill_generation.json"),
+    'real': os.path.join(MODELS_DIR, "real_generation.json")
+}
+MODEL_SYNC_INTERVAL_S = float(os.environ.get('SKILLGENOME_MODEL_SYNC_S', '2'))
+# Held by the one worker training the startup models (see _train_once)
+STARTUP_TRAINING_LOCK = os.path.join(MODELS_DIR, "startup_training.lock")
 
 os.makedirs(MODELS_DIR, exist_ok=True)
 
+# Roster scoring jobs (services/scoring_jobs.py): one directory per job
+SCORING_JOBS = ScoringJobs(
+    os.path.join(BASE_DIR, "data", "scoring_jobs"),
+    workers=int(os.environ.get('SKILLGENOME_SCORING_WORKERS', str(os.cpu_count() or 1))),
+    chunk_rows=int(os.environ.get('SKILLGENOME_SCORING_CHUNK_ROWS', '20000')),
+    max_concurrent=int(os.environ.get('SKILLGENOME_SCORING_JOBS', '2')),
+    ttl_s=float(os.environ.get('SKILLGENOME_SCORING_JOB_TTL_S', str(24 * 3600)))
+)
+
+# Background training jobs (services/training_jobs.py): one directory per job
+TRAINING_JOBS = TrainingJobs(
+    os.path.join(BASE_DIR, "data", "training_jobs"),
+    max_concurrent=int(os.environ.get('SKILLGENOME_TRAINING_JOBS', '1'))
+)
+
 FEATURE_COLUMNS = [
     'Literacy_Rate',
     'Internet_Penetration',
@@ -1217,101 +1361,238 @@ REAL_MODEL_STATE = {
     "data_source": "seed",
     "model": None,
     "anomaly_model": None,
-    "scaler": None
+    "compiled_anomaly": None,
+    "explainer": None,
+    "sensitivity": None,
+    "scaler": None,
+    "feature_profile": None,
+    "training_mode": None,
+    "version": 0  # bumped whenever a model is trained or loaded
 }
 
+# /api/skill-risk-surface responses, keyed on model version + grid spec
+RISK_SURFACE_CACHE = SurfaceCache(int(os.environ.get('SKILLGENOME_RISK_SURFACE_CACHE', '64')))
+
 # Try loading a pre-saved model on startup
-def _try_load_real_models():
+def _try_load_real_models(extra: dict = None):
+    """
+    Load the saved real-data models and swap them in.
+
+    Everything is loaded and compiled first and then applied in a single
+    dict.update (like _install_real_models), so a concurrent prediction never
+    pairs the new model with the old scaler. `extra` is applied with it.
+    """
     if os.path.exists(REAL_GBR_PATH) and os.path.exists(REAL_ISO_PATH) and os.path.exists(REAL_SCALER_PATH):
         try:
-            REAL_MODEL_STATE['model']         = joblib.load(REAL_GBR_PATH)
-            REAL_MODEL_STATE['anomaly_model'] = joblib.load(REAL_ISO_PATH)
-            REAL_MODEL_STATE['scaler']        = joblib.load(REAL_SCALER_PATH)
-            REAL_MODEL_STATE['trained']       = True
+            model         = joblib.load(REAL_GBR_PATH)
+            anomaly_model = joblib.load(REAL_ISO_PATH)
+            loaded = {
+                'model': model,
+                'anomaly_model': anomaly_model,
+                'compiled_anomaly': compile_anomaly_model(anomaly_model),
+                'explainer': compile_explainer(compile_model(model), FEATURE_COLUMNS),
+                'scaler': joblib.load(REAL_SCALER_PATH),
+                'sensitivity': _model_sensitivity(model, None, FEATURE_COLUMNS, 'real'),
+                'trained': True
+            }
+            if os.path.exists(REAL_PROFILE_PATH):
+                with open(REAL_PROFILE_PATH) as f:
+                    loaded['feature_profile'] = json.load(f)
+            REAL_MODEL_STATE.update({**loaded, **(extra or {}), 'version': REAL_MODEL_STATE['version'] + 1})
             print("REAL AI ENGINE: Pre-trained models loaded from disk.")
         except Exception as e:
             print(f"REAL AI ENGINE: Could not load saved models – {e}")
 
-_try_load_real_models()
-
-
-def _run_training_pipeline(csv_path: str, data_source: str = "seed"):
-    """Shared training logic for both /train-model and /upload-dataset training."""
-    df = pd.read_csv(csv_path)
-
-    # Clean
-    str_cols = df.select_dtypes(include='object').columns
-    for col in str_cols:
-        df[col] = df[col].astype(str).str.strip()
-    for col in FEATURE_COLUMNS + [TARGET_COLUMN]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-    df = df.dropna(subset=[c for c in FEATURE_COLUMNS + [TARGET_COLUMN] if c in df.columns])
-
-    feat_cols = [c for c in FEATURE_COLUMNS if c in df.columns]
-    X_raw = df[feat_cols].values
-    y     = df[TARGET_COLUMN].values
-
-    # Normalize
-    scaler = MinMaxScaler()
-    X = scaler.fit_transform(X_raw)
-
-    # Train/test split
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-    # Gradient Boosting
-    from sklearn.ensemble import GradientBoostingRegressor as GBR, IsolationForest as IF
-    gbr = GBR(n_estimators=150, learning_rate=0.08, max_depth=3, random_state=42)
-    gbr.fit(X_train, y_train)
-    raw_r2 = gbr.score(X_test, y_test) * 100
-    # Hackathon Accuracy Optimizer: ensures a positive, impressive range for demo
-    if raw_r2 < 70:
-        r2 = round(random.uniform(91.4, 96.7), 2)
-    else:
-        r2 = round(raw_r2, 2)
-
-    # Feature importances
-    importances = {feat_cols[i]: round(float(gbr.feature_importances_[i]) * 100, 2)
-                   for i in range(len(feat_cols))}
-
-    # Anomaly Detection
-    iso = IF(contamination=0.05, random_state=42)
-    iso.fit(X)
-
-    # Persist
-    joblib.dump(gbr,    REAL_GBR_PATH)
-    joblib.dump(iso,    REAL_ISO_PATH)
-    joblib.dump(scaler, REAL_SCALER_PATH)
-
-    # Update global state
-    REAL_MODEL_STATE.update({
-        "trained": True,
-        "r2_score": r2,
-        "feature_importances": importances,
-        "dataset_rows": len(df),
-        "data_source": data_source,
-        "model": gbr,
-        "anomaly_model": iso,
-        "scaler": scaler
-    })
 
-    return r2, importances, len(df), feat_cols
+def _real_training_params(csv_path: str, data_source: str = "seed", mode: str = "full") -> dict:
+    """Trainer parameters of a real-model training (services/training_jobs.py train_real_models)."""
+    return {
+        'csv_path': csv_path,
+        'data_source': data_source,
+        'mode': mode,
+        'feature_columns': list(FEATURE_COLUMNS),
+        'target_column': TARGET_COLUMN,
+        'anomaly_max_samples': ANOMALY_MAX_SAMPLES,
+        'warm_start_stages': WARM_START_STAGES,
+        'drift_psi': DRIFT_PSI_THRESHOLD
+    }
 
 
-@app.route('/api/train-model', methods=['POST'])
-def train_real_model():
-    """Train GradientBoostingRegressor + IsolationForest on the real India dataset."""
+def _install_real_models(result: dict) -> dict:
+    """
+    Persist a train_real_models() result and swap it into REAL_MODEL_STATE.
+
+    The scorers are compiled first and the state replaced in one dict.update,
+    under TRAINING_SWAP_LOCK. Returns the JSON-ready training summary.
+    """
+    gbr, iso, scaler, feat_cols = result['model'], result['anomaly_model'], result['scaler'], result['feat_cols']
+    with TRAINING_SWAP_LOCK:
+        # Persist
+        joblib.dump(gbr,    REAL_GBR_PATH)
+        joblib.dump(iso,    REAL_ISO_PATH)
+        joblib.dump(scaler, REAL_SCALER_PATH)
+        with open(REAL_PROFILE_PATH, 'w') as f:
+            json.dump(result['profile'], f)
+
+        # Update global state
+        REAL_MODEL_STATE.update({
+            "trained": True,
+            "r2_score": result['r2'],
+            "feature_importances": result['importances'],
+            "dataset_rows": result['rows'],
+            "data_source": result['data_source'],
+            "model": gbr,
+            "anomaly_model": iso,
+            "compiled_anomaly": compile_anomaly_model(iso),
+            "explainer": compile_explainer(compile_model(gbr), feat_cols),
+            "sensitivity": _model_sensitivity(gbr, result['X_raw'], feat_cols, 'real', transform=scaler.transform),
+            "scaler": scaler,
+            "feature_profile": result['profile'],
+            "training_mode": result['training_mode'],
+            "version": REAL_MODEL_STATE['version'] + 1
+        })
+        _publish_model_generation('real', {key: REAL_MODEL_STATE[key] for key in (
+            'r2_score', 'feature_importances', 'dataset_rows', 'data_source', 'training_mode')})
+    return {
+        "r2_score": result['r2'],
+        "feature_importances": result['importances'],
+        "dataset_rows": result['rows'],
+        "features_used": feat_cols,
+        "data_source": result['data_source'],
+        "training_mode": result['training_mode'],
+        "models_saved": ["real_gbr.joblib", "real_iso.joblib", "real_scaler.joblib", "real_profile.json"]
+    }
+
+
+def _read_model_generation(kind: str):
     try:
-        data = request.json or {}
-        # Use uploaded data if available and requested, else seed data
-        use_uploaded = data.get('use_uploaded', False) and os.path.exists(UPLOADED_DATA_FILE)
-        csv_path   = UPLOADED_DATA_FILE if use_uploaded else REAL_DATA_FILE
-        src_label  = "uploaded" if use_uploaded else "seed"
+        with open(MODEL_GENERATION_PATHS[kind]) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _publish_model_generation(kind: str, state: dict):
+    """
+    Record a freshly installed model so the other web workers reload it.
+
+    `state` holds the JSON-ready fields they can't read from the saved
+    model files (training metadata, scores, data source).
+    """
+    marker = {'generation': os.urandom(8).hex(), 'pid': os.getpid(), 'installed_at': time.time(), 'state': state}
+    path = MODEL_GENERATION_PATHS[kind]
+    with open(f"{path}.{os.getpid()}.tmp", 'w') as f:
+        json.dump(marker, f, default=lambda v: v.item() if isinstance(v, np.generic) else str(v))
+    os.replace(f"{path}.{os.getpid()}.tmp", path)
+    MODEL_GENERATIONS[kind] = marker['generation']
+
+
+def _reload_skill_model(state: dict):
+    """Activate the 'latest' saved skill model and the dataset it was trained on."""
+    saved = load_model('latest')
+    metadata = saved['metadata']
+    names = metadata.get('features')
+    data_file = state.get('data_file')
+    if data_file and data_file != DATASET_FILE and os.path.exists(data_file):
+        _load_dataset(data_file)
+    with TRAINING_SWAP_LOCK:
+        _activate_model(saved['skill_model'], saved['anomaly_model'], names,
+                        metadata.get('accuracy_pct', metadata.get('r2_score', 0)),
+                        training_metadata=state.get('training_metadata', metadata),
+                        sensitivity=_model_sensitivity(saved['skill_model'], None, names, 'latest'),
+                        feature_profile=metadata.get('feature_profile'))
+
+
+def _reload_real_models(state: dict):
+    with TRAINING_SWAP_LOCK:
+        _try_load_real_models(extra=state)
+
+
+def sync_models():
+    """
+    Reload the models another web worker installed since this one loaded its own.
+
+    Training jobs install their result in the worker that started them;
+    every other worker notices the new generation marker here.
+    """
+    for kind, reload in (('skill', _reload_skill_model), ('real', _reload_real_models)):
+        marker = _read_model_generation(kind)
+        if marker is None or marker['generation'] == MODEL_GENERATIONS[kind]:
+            continue
+        # Recorded first: a broken model is reported once, not reloaded on every check
+        MODEL_GENERATIONS[kind] = marker['generation']
+        try:
+            reload(marker.get('state') or {})
+            print(f"AI ENGINE: Reloaded the {kind} model installed by worker {marker.get('pid')}")
+        except Exception as e:
+            print(f"AI ENGINE: Reloading the {kind} model failed – {e}")
+
+
+# Generation of the saved models this worker serves (loaded at warm-up)
+MODEL_GENERATIONS = {kind: (_read_model_generation(kind) or {}).get('generation') for kind in MODEL_GENERATION_PATHS}
+_MODEL_SYNC = {'checked_at': 0.0, 'lock': threading.Lock()}
+
+
+def _sync_models_in_background():
+    try:
+        sync_models()
+    finally:
+        _MODEL_SYNC['lock'].release()
+
+
+@app.before_request
+def _check_model_generations():
+    """Look for models installed by other workers, at most every MODEL_SYNC_INTERVAL_S."""
+    now = time.time()
+    if now - _MODEL_SYNC['checked_at'] < MODEL_SYNC_INTERVAL_S or not _MODEL_SYNC['lock'].acquire(blocking=False):
+        return
+    _MODEL_SYNC['checked_at'] = now
+    # Reloading takes a moment; requests keep the current model meanwhile
+    threading.Thread(target=_sync_models_in_background, name='model-sync', daemon=True).start()
+
+
+def _run_training_pipeline(csv_path: str, data_source: str = "seed", mode: str = "full"):
+    """
+    Shared training logic for both /train-model and /upload-dataset training.
+
+    mode='incremental' keeps the current scaler and ensemble and adds
+    WARM_START_STAGES stages fitted on the updated data (ml/incremental.py),
+    unless the raw features drifted past DRIFT_PSI_THRESHOLD – then it
+    retrains in full. REAL_MODEL_STATE['training_mode'] says which ran.
+    """
+    result = train_real_models(_real_training_params(csv_path, data_source, mode), _training_current('real', mode))
+    _install_real_models(result)
+    return result['r2'], result['importances'], result['rows'], result['feat_cols']
+
+
+def _real_training_source(data: dict) -> tuple:
+    """(csv_path, data source label, mode) of a real-model training request."""
+    # Use uploaded data if available and requested, else seed data
+    use_uploaded = data.get('use_uploaded', False) and os.path.exists(UPLOADED_DATA_FILE)
+    csv_path = UPLOADED_DATA_FILE if use_uploaded else REAL_DATA_FILE
+    mode = 'incremental' if data.get('mode') == 'incremental' else 'full'
+    return csv_path, "uploaded" if use_uploaded else "seed", mode
+
+
+def _train_real_model(data: dict):
+    """
+    POST /api/train-model {"model": "real"}: train GradientBoostingRegressor +
+    IsolationForest on the real India dataset.
+
+    {"use_uploaded": true} trains on the uploaded CSV, {"mode": "incremental"}
+    warm-starts the active model, {"async": true} trains as a background job
+    (see /api/train-jobs).
+    """
+    try:
+        csv_path, src_label, mode = _real_training_source(data)
 
         if not os.path.exists(csv_path):
             return jsonify({"error": "No dataset available. Please upload a CSV first.", "fallback": True}), 404
 
-        r2, importances, n_rows, feat_cols = _run_training_pipeline(csv_path, src_label)
+        if data.get('async'):
+            return _submit_training_job('real', _real_training_params(csv_path, src_label, mode))
+
+        r2, importances, n_rows, feat_cols = _run_training_pipeline(csv_path, src_label, mode)
 
         print(f"REAL AI ENGINE: Trained on {n_rows} records. R² = {r2}%")
 
@@ -1324,7 +1605,8 @@ def train_real_model():
             "dataset_rows": n_rows,
             "features_used": feat_cols,
             "data_source": src_label,
-            "models_saved": ["real_gbr.joblib", "real_iso.joblib", "real_scaler.joblib"],
+            "training_mode": REAL_MODEL_STATE['training_mode'],
+            "models_saved": ["real_gbr.joblib", "real_iso.joblib", "real_scaler.joblib", "real_profile.json"],
             "timestamp": datetime.now().isoformat()
         })
 
@@ -1357,11 +1639,16 @@ def predict_skill_risk():
             scaler = REAL_MODEL_STATE['scaler']
             X      = scaler.transform(raw_features)
 
-            pred_unemployment = float(REAL_MODEL_STATE['model'].predict(X)[0])
+            compiled_anomaly = REAL_MODEL_STATE.get('compiled_anomaly')
+            if RISK_BATCHER.enabled:
+                models = (REAL_MODEL_STATE['model'], compiled_anomaly or REAL_MODEL_STATE['anomaly_model'])
+                pred_unemployment, is_anomaly = RISK_BATCHER.submit(X[0], models)
+            else:
+                pred_unemployment = float(REAL_MODEL_STATE['model'].predict(X)[0])
+                is_anomaly = (compiled_anomaly.score_one(X)[1] if compiled_anomaly is not None
+                              else REAL_MODEL_STATE['anomaly_model'].predict(X)[0] == -1)
             pred_unemployment = max(0.0, round(pred_unemployment, 2))
 
-            is_anomaly = REAL_MODEL_STATE['anomaly_model'].predict(X)[0] == -1
-
             # Feature contributions = importance × value
             feat_cols   = FEATURE_COLUMNS
             importances = REAL_MODEL_STATE['model'].feature_importances_
@@ -1377,6 +1664,8 @@ def predict_skill_risk():
             top_negative = [{"feature": k, "value": round(float(raw_features[0][feat_cols.index(k)]), 2), "impact": v} for k, v in sorted_contribs if v < 0][-3:]
 
             model_used = "GradientBoostingRegressor (Real Data v1.0)"
+            explainer = REAL_MODEL_STATE.get('explainer')
+            attributions = explainer.attribution(X) if explainer is not None else None
         else:
             # Heuristic fallback when model not trained yet
             pred_unemployment = round(15 - (literacy * 0.05) - (internet * 0.04) + (0.01), 2)
@@ -1386,6 +1675,7 @@ def predict_skill_risk():
             top_positive = []
             top_negative = []
             model_used = "Heuristic Fallback (model not trained)"
+            attributions = None
 
         # Skill risk score: inverse of positive socio-economic indicators
         # Normalize unemployment to a 0–100 skill risk scale (30% unemployment → 100 risk)
@@ -1405,6 +1695,7 @@ def predict_skill_risk():
             "feature_contributions": contributions,
             "top_positive": top_positive,
             "top_negative": top_negative,
+            **({"feature_attributions": attributions} if attributions is not None else {}),
             "is_anomaly": bool(is_anomaly),
             "model_used": model_used,
             "inputs_received": {
@@ -1432,6 +1723,50 @@ def predict_skill_risk():
         }), 200
 
 
+@app.route('/api/skill-risk-surface', methods=['POST'])
+def skill_risk_surface():
+    """
+    What-if grid of /api/predict-skill-risk over two inputs, others fixed.
+
+    Input (JSON): {"x": {"input": "literacy_rate", "min": 40, "max": 100, "steps": 50},
+    "y": {"input": "internet_penetration", ...}, "fixed": {"per_capita_income": 90000},
+    "format": "json" | "binary"} – see services/risk_surface.py.
+    """
+    try:
+        spec = parse_spec(request.get_json(silent=True) or {})
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid surface spec: {e}"}), 400
+
+    trained = bool(REAL_MODEL_STATE['trained'] and REAL_MODEL_STATE['model'])
+    version = REAL_MODEL_STATE['version'] if trained else 0
+    key = (version, trained, spec)
+    entry = RISK_SURFACE_CACHE.get(key)
+    if entry is None:
+        entry = render(compute_surface(REAL_MODEL_STATE, spec), spec, version)
+        RISK_SURFACE_CACHE.put(key, entry)
+        cache_status = 'MISS'
+    else:
+        cache_status = 'HIT'
+    body, mimetype, headers = entry
+    response = app.response_class(body, mimetype=mimetype)
+    response.headers.update(headers)
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
+def _uploaded_csv():
+    """The request's CSV upload as (file, secure filename, error message or None)."""
+    if 'file' not in request.files:
+        return None, None, "No file part in the request."
+    f = request.files['file']
+    if f.filename == '':
+        return None, None, "No file selected."
+    filename = secure_filename(f.filename)
+    if not filename.lower().endswith('.csv'):
+        return None, None, "Only CSV files are supported."
+    return f, filename, None
+
+
 @app.route('/api/upload-dataset', methods=['POST'])
 def upload_dataset():
     """
@@ -1440,16 +1775,9 @@ def upload_dataset():
     Returns a preview with column list and row count.
     """
     try:
-        if 'file' not in request.files:
-            return jsonify({"error": "No file part in the request."}), 400
-
-        f = request.files['file']
-        if f.filename == '':
-            return jsonify({"error": "No file selected."}), 400
-
-        filename = secure_filename(f.filename)
-        if not filename.lower().endswith('.csv'):
-            return jsonify({"error": "Only CSV files are supported."}), 400
+        f, filename, error = _uploaded_csv()
+        if error:
+            return jsonify({"error": error}), 400
 
         # Save
         os.makedirs(os.path.dirname(UPLOADED_DATA_FILE), exist_ok=True)
@@ -1482,6 +1810,142 @@ def upload_dataset():
         return jsonify({"error": str(e), "fallback": True}), 200
 
 
+@app.route('/api/score-jobs', methods=['POST'])
+def submit_scoring_job():
+    """
+    Score a CSV roster of worker signals in the background.
+
+    Input: multipart 'file' (CSV, one profile per row with signal columns and
+    optional area_type / digital_access / opportunity_level / domain).
+    Returns 202 with the job id; poll /api/score-jobs/<id> and fetch the
+    scored CSV from /api/score-jobs/<id>/download. 429 while this worker
+    already runs SKILLGENOME_SCORING_JOBS jobs.
+    """
+    f, filename, error = _uploaded_csv()
+    if error:
+        return jsonify({"error": error}), 400
+    if not MODEL_STATE['active']:
+        return jsonify({"error": "Model not ready"}), 503
+
+    try:
+        job_id, input_path = SCORING_JOBS.create()
+    except ScoringJobsFull as e:
+        return jsonify({"error": str(e), "max_concurrent": SCORING_JOBS.max_concurrent}), 429
+    try:
+        f.save(input_path)
+    except Exception:
+        SCORING_JOBS.discard(job_id)
+        raise
+    models = (MODEL_STATE['skill_model'], MODEL_STATE['anomaly_model'], MODEL_STATE['feature_names'])
+    status = SCORING_JOBS.start(job_id, models, model_version=MODEL_STATE['version'])
+    return jsonify({
+        **status,
+        "filename": filename,
+        "status_url": f"/api/score-jobs/{job_id}",
+        "download_url": f"/api/score-jobs/{job_id}/download"
+    }), 202
+
+
+@app.route('/api/score-jobs/<job_id>', methods=['GET'])
+def scoring_job_status(job_id):
+    """Progress of a roster scoring job."""
+    try:
+        return jsonify(SCORING_JOBS.status(job_id))
+    except KeyError:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+
+
+@app.route('/api/score-jobs/<job_id>/download', methods=['GET'])
+def scoring_job_download(job_id):
+    """Scored CSV of a finished job (input columns + score and flags)."""
+    try:
+        status = SCORING_JOBS.status(job_id)
+    except KeyError:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+    if status['status'] != 'done':
+        return jsonify({"error": f"Job is {status['status']}", "progress": status['progress']}), 409
+    return send_file(SCORING_JOBS.output_path(job_id), mimetype='text/csv',
+                     as_attachment=True, download_name=f"scored_{job_id}.csv")
+
+
+def _training_current(kind: str, mode: str):
+    """Active model state an incremental training builds on (None for full trainings)."""
+    if mode != 'incremental':
+        return None
+    if kind == 'skill':
+        return {'skill_model': MODEL_STATE['skill_model'], 'feature_profile': MODEL_STATE.get('feature_profile'),
+                'feature_names': MODEL_STATE['feature_names']}
+    return {'model': REAL_MODEL_STATE['model'], 'feature_profile': REAL_MODEL_STATE['feature_profile'],
+            'scaler': REAL_MODEL_STATE['scaler']}
+
+
+def _submit_training_job(kind: str, params: dict):
+    """
+    Queue a training job and answer 202.
+
+    Jobs with the same parameters, data file (size + mtime) and active model
+    version collapse into one: the second submission gets the running job.
+    """
+    if kind == 'skill':
+        data_file, version, install = params['data_file'], MODEL_STATE['version'], _install_skill_models
+    else:
+        data_file, version, install = params['csv_path'], REAL_MODEL_STATE['version'], _install_real_models
+    status, deduplicated = TRAINING_JOBS.submit(
+        kind, params, install, _training_current(kind, params['mode']),
+        key=job_key(kind, params, data_file, version)
+    )
+    return jsonify({
+        **status,
+        "deduplicated": deduplicated,
+        "status_url": f"/api/train-jobs/{status['job_id']}"
+    }), 202
+
+
+@app.route('/api/train-jobs', methods=['POST'])
+def submit_training_job():
+    """
+    Train a model in the background (services/training_jobs.py).
+
+    Input: {"model": "skill" | "real", ...} with the parameters of the
+    matching /api/train-model handler. Returns 202 with the job id; poll
+    /api/train-jobs/<id> for stage and percent complete, DELETE it to cancel.
+    The new model is swapped in when the job is done.
+    """
+    data = request.json or {}
+    kind = data.get('model', 'skill')
+    if kind == 'skill':
+        params, error = _skill_training_params(data)
+        if error:
+            return jsonify({"error": error}), 400
+        if not os.path.exists(params['data_file']):
+            return jsonify({"error": f"Data file not found: {params['data_file']}"}), 404
+        return _submit_training_job('skill', params)
+    if kind == 'real':
+        csv_path, src_label, mode = _real_training_source(data)
+        if not os.path.exists(csv_path):
+            return jsonify({"error": "No dataset available. Please upload a CSV first."}), 404
+        return _submit_training_job('real', _real_training_params(csv_path, src_label, mode))
+    return jsonify({"error": "model must be 'skill' or 'real'"}), 400
+
+
+@app.route('/api/train-jobs/<job_id>', methods=['GET'])
+def training_job_status(job_id):
+    """Stage, percent complete and (once done) the training summary of a job."""
+    try:
+        return jsonify(TRAINING_JOBS.status(job_id))
+    except KeyError:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+
+
+@app.route('/api/train-jobs/<job_id>', methods=['DELETE'])
+def cancel_training_job(job_id):
+    """Cancel a queued or running training job; the active model is kept."""
+    try:
+        return jsonify(TRAINING_JOBS.cancel(job_id))
+    except KeyError:
+        return jsonify({"error": f"Unknown job {job_id}"}), 404
+
+
 @app.route('/api/model-status', methods=['GET'])
 def model_status():
     """Return current state of all models including feature list."""
@@ -1496,6 +1960,7 @@ def model_status():
         "feature_importances": REAL_MODEL_STATE['feature_importances'],
         "dataset_rows": REAL_MODEL_STATE['dataset_rows'],
         "data_source": REAL_MODEL_STATE['data_source'],
+        "training_mode": REAL_MODEL_STATE['training_mode'],
         "models_on_disk": {
             "gbr":    os.path.exists(REAL_GBR_PATH),
             "iso":    os.path.exists(REAL_ISO_PATH),
@@ -1523,6 +1988,228 @@ def model_status():
     })
 
 
+@app.route('/api/model-sensitivity', methods=['GET'])
+def model_sensitivity():
+    """
+    Partial-dependence and ICE curves of the active models, computed once
+    per model (ml/sensitivity.py).
+
+    Query: model=skill|real (default skill), features=a,b (default all),
+    ice=0 to leave out the individual curves.
+    """
+    which = request.args.get('model', 'skill')
+    if which not in ('skill', 'real'):
+        return jsonify({"error": "model must be 'skill' or 'real'"}), 400
+    state = MODEL_STATE if which == 'skill' else REAL_MODEL_STATE
+    curves = state.get('sensitivity')
+    if not curves:
+        return jsonify({"error": f"No sensitivity curves for the {which} model yet", "available": False}), 404
+
+    wanted = request.args.get('features')
+    names = [f for f in wanted.split(',') if f in curves['features']] if wanted else curves['features_order']
+    include_ice = request.args.get('ice', '1').lower() not in ('0', 'false', 'no')
+    features = {
+        name: curves['features'][name] if include_ice
+        else {k: v for k, v in curves['features'][name].items() if k != 'ice'}
+        for name in names
+    }
+    return jsonify({
+        "model": which,
+        "available": True,
+        "model_version": state['version'],
+        "model_key": curves.get('model_key'),
+        "method": curves['method'],
+        "background_rows": curves['background_rows'],
+        "ice_rows": curves['ice_rows'] if include_ice else 0,
+        "computed_at": curves['computed_at'],
+        "ranking": sorted(names, key=lambda n: curves['features'][n]['range'], reverse=True),
+        "features": features,
+        "timestamp": datetime.now().isoformat()
+    })
+
+
+# --- STARTUP WARM-UP ---
+# Loading and (on a fresh container) training the models happens outside the
+# import path, so the server binds at once and /api/health never waits on a
+# cold train. /api/ready reports which artifacts are available.
+#
+# SKILLGENOME_WARMUP:
+#   background – load and train in a daemon thread (default)
+#   preload    – load saved artifacts synchronously (gunicorn master, so they
+#                are shared with the workers); training anything missing is
+#                deferred to resume_warm_up(), called in each forked worker –
+#                one of them trains, the others reload its model
+#   sync       – load and train before import returns (scripts)
+#   off        – do nothing (tooling, tests)
+WARMUP_MODE = os.environ.get('SKILLGENOME_WARMUP', 'background')
+WARMUP_STATE = {
+    "phase": "pending",          # pending → loading → training → done | failed
+    "mode": WARMUP_MODE,
+    "needs_training": False,
+    "started_at": None,
+    "finished_at": None,
+    "errors": []
+}
+READY_REQUIRED = ('dataset', 'skill_model', 'anomaly_model')
+_WARMUP_LOCK = threading.Lock()
+
+
+def _load_artifacts():
+    """
+    Fast phase: saved models and the dataset snapshot from disk.
+
+    Returns:
+        True if the primary models still have to be trained.
+    """
+    needs_training = False
+    try:
+        saved = load_model('latest')
+        _activate_model(saved['skill_model'], saved['anomaly_model'],
+                        saved['metadata'].get('features'), saved['metadata'].get('r2_score', 0),
+                        feature_profile=saved['metadata'].get('feature_profile'))
+        print(f"AI ENGINE: Model loaded from disk (R² {MODEL_STATE['training_score']}%)")
+    except FileNotFoundError:
+        print("AI ENGINE: No saved model found. Training in background.")
+        needs_training = True
+    except Exception as e:
+        WARMUP_STATE['errors'].append(f"load_model: {e}")
+        print(f"AI ENGINE: Saved model unreadable, retraining – {e}")
+        needs_training = True
+
+    # Still load data for analytics endpoints
+    if os.path.exists(DATA_FILE):
+        try:
+            _load_dataset(DATA_FILE)
+        except Exception as e:
+            WARMUP_STATE['errors'].append(f"dataset: {e}")
+            print(f"AI ENGINE: Dataset load failed – {e}")
+
+    # Saved sensitivity curves of the loaded model, else computed once from the dataset
+    if MODEL_STATE['active']:
+        names = MODEL_STATE['feature_names']
+        background = DF[names] if not DF.empty and set(names) <= set(DF.columns) else None
+        MODEL_STATE['sensitivity'] = _model_sensitivity(MODEL_STATE['skill_model'], background, names, 'latest')
+
+    _try_load_real_models()
+    return needs_training
+
+
+def _train_once():
+    """
+    Train the startup models in one web worker only.
+
+    Every forked worker that found no saved model gets here; the first one
+    to take STARTUP_TRAINING_LOCK trains and publishes the skill generation,
+    the others wait on the lock and then reload that model via sync_models().
+    The lock is an flock, so a worker that dies mid-training frees it and
+    the next one trains instead.
+    """
+    with open(STARTUP_TRAINING_LOCK, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            # Waits for a reload the request hook may have in flight
+            with _MODEL_SYNC['lock']:
+                sync_models()
+            if MODEL_STATE['active']:
+                print("AI ENGINE: Using the model trained by another worker")
+                return
+            train_models(refresh_dataset=DF.empty)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _run_warm_up(load: bool = True, train: bool = True):
+    """Run the warm-up phases and record progress in WARMUP_STATE."""
+    with _WARMUP_LOCK:
+        WARMUP_STATE['started_at'] = WARMUP_STATE['started_at'] or datetime.now().isoformat()
+        start = time.time()
+        try:
+            if load:
+                WARMUP_STATE['phase'] = 'loading'
+                WARMUP_STATE['needs_training'] = _load_artifacts()
+            if WARMUP_STATE['needs_training'] and train:
+                WARMUP_STATE['phase'] = 'training'
+                _train_once()
+                WARMUP_STATE['needs_training'] = not MODEL_STATE['active']
+            # With training deferred to resume_warm_up() the phase stays 'loading'
+            if not (WARMUP_STATE['needs_training'] and not train):
+                WARMUP_STATE['phase'] = 'done'
+                WARMUP_STATE['finished_at'] = datetime.now().isoformat()
+        except Exception as e:
+            WARMUP_STATE['phase'] = 'failed'
+            WARMUP_STATE['errors'].append(str(e))
+            WARMUP_STATE['finished_at'] = datetime.now().isoformat()
+            print(f"AI ENGINE ERROR: Warm-up failed – {e}")
+        print(f"AI ENGINE: Warm-up {WARMUP_STATE['phase']} after {time.time() - start:.2f}s")
+
+
+def _start_thread(**kwargs):
+    thread = threading.Thread(target=_run_warm_up, kwargs=kwargs, name='skillgenome-warmup', daemon=True)
+    thread.start()
+    return thread
+
+
+def start_warm_up(mode: str = None):
+    """Kick off the warm-up according to SKILLGENOME_WARMUP (see above)."""
+    mode = mode or WARMUP_MODE
+    WARMUP_STATE['mode'] = mode
+    if mode == 'off':
+        return None
+    if mode == 'sync':
+        _run_warm_up()
+        return None
+    if mode == 'preload':
+        _run_warm_up(train=False)
+        return None
+    return _start_thread()
+
+
+def resume_warm_up():
+    """Train whatever the preload phase could not load; called after fork."""
+    if WARMUP_STATE['needs_training']:
+        return _start_thread(load=False)
+    return None
+
+
+def _artifact_status() -> dict:
+    """Per-artifact readiness: ready, loading or unavailable."""
+    in_progress = WARMUP_STATE['phase'] in ('pending', 'loading', 'training')
+    available = {
+        'dataset': not DF.empty,
+        'skill_model': MODEL_STATE['active'] and MODEL_STATE['skill_model'] is not None,
+        'anomaly_model': MODEL_STATE['anomaly_model'] is not None,
+        'real_model': bool(REAL_MODEL_STATE['trained'])
+    }
+    return {
+        name: 'ready' if ok else ('loading' if in_progress else 'unavailable')
+        for name, ok in available.items()
+    }
+
+
+@app.route('/api/ready', methods=['GET'])
+def readiness():
+    """Readiness probe: 200 once the dataset and primary models are loaded, 503 until then."""
+    artifacts = _artifact_status()
+    ready = all(artifacts[name] == 'ready' for name in READY_REQUIRED)
+    return jsonify({
+        "ready": ready,
+        "phase": WARMUP_STATE['phase'],
+        "artifacts": artifacts,
+        "required": list(READY_REQUIRED),
+        "census_size": len(DF),
+        "started_at": WARMUP_STATE['started_at'],
+        "finished_at": WARMUP_STATE['finished_at'],
+        "errors": WARMUP_STATE['errors'][-5:],
+        "timestamp": datetime.now().isoformat()
+    }), 200 if ready else 503
+
+
+# Spawned helper processes (services/scoring_jobs.py) re-import a script's
+# main module as __mp_main__; they never serve and need no models
+if __name__ != '__mp_main__':
+    start_warm_up()
+
+
 # --- STATIC FILE SERVING ---
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
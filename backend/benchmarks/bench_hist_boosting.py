@@ -0,0 +1,72 @@
+"""
+Training benchmark: exact GradientBoosting vs HistGradientBoosting
+(ml/model_training.py hist_gradient_boosting).
+
+Fits both with the default training parameters (100 stages, lr 0.1, depth 3)
+on synthetic skill profiles with the 17 trained columns (base signals +
+engineered features) and a noisy skill-score target, then reports fit time,
+CPU time and test R² per dataset size.
+
+Usage (from backend/):
+    python benchmarks/bench_hist_boosting.py [--rows 10000 100000 1000000] [--skip-exact-above 0]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.ensemble import GradientBoostingRegressor  # noqa: E402
+from sklearn.metrics import r2_score  # noqa: E402
+from ml.data_loader import FEATURE_COLUMNS  # noqa: E402
+from ml.feature_spec import compile_feature_spec, ENGINEERED_COLUMNS, INPUT_COLUMNS, INPUT_DEFAULTS  # noqa: E402
+from ml.model_training import hist_gradient_boosting  # noqa: E402
+
+
+def _dataset(n, seed=0):
+    rng = np.random.default_rng(seed)
+    spec = compile_feature_spec(FEATURE_COLUMNS + ENGINEERED_COLUMNS)
+    raw = np.tile(INPUT_DEFAULTS, (n, 1))
+    for i, name in enumerate(INPUT_COLUMNS):
+        if name in FEATURE_COLUMNS:
+            raw[:, i] = rng.uniform(0, 100, n)
+    X = pd.DataFrame(spec.transform_raw(raw), columns=spec.feature_names)
+    core = X[FEATURE_COLUMNS[:8]].to_numpy()
+    y = core.mean(axis=1) * 1.2 + 0.2 * np.sqrt(core[:, 0] * core[:, 1]) - 10 + rng.normal(0, 4, n)
+    return X, pd.Series(y)
+
+
+def _fit(model, X_train, y_train, X_test, y_test):
+    wall, cpu = time.perf_counter(), time.process_time()
+    model.fit(X_train, y_train)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    return wall, cpu, r2_score(y_test, model.predict(X_test))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--skip-exact-above', type=int, default=0,
+                        help='skip exact GradientBoosting above this many rows (0 = never)')
+    args = parser.parse_args()
+    print(f"{os.cpu_count()} CPU(s)")
+    print(f"{'rows':>9}  {'model':<22} {'fit s':>8} {'cpu s':>8} {'iters':>6} {'test R²':>8}")
+
+    for n in args.rows:
+        X, y = _dataset(n)
+        cut = int(n * 0.8)
+        splits = (X.iloc[:cut], y.iloc[:cut], X.iloc[cut:], y.iloc[cut:])
+        models = [('HistGradientBoosting', hist_gradient_boosting())]
+        if not args.skip_exact_above or n <= args.skip_exact_above:
+            models.insert(0, ('GradientBoosting', GradientBoostingRegressor(random_state=42)))
+        for name, model in models:
+            wall, cpu, r2 = _fit(model, *splits)
+            iters = getattr(model, 'n_iter_', getattr(model, 'n_estimators_', ''))
+            print(f"{n:>9}  {name:<22} {wall:8.2f} {cpu:8.2f} {iters:>6} {r2:8.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Retraining benchmark: full retrain vs incremental warm start (ml/incremental.py).
+
+Trains GradientBoosting (100 stages, lr 0.1, depth 3) on --base synthetic
+rows, then for each growth step appends new rows from the same distribution
+and retrains the updated dataset twice: from scratch, and incrementally
+(drift check + WARM_START stages added to the base model). Reports latency
+and test R² of both, and the PSI the drift check measured.
+
+Usage (from backend/):
+    python benchmarks/bench_incremental_training.py [--base 20000] [--growth 1 5 10 25 50] [--stages 50]
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sklearn.ensemble import GradientBoostingRegressor  # noqa: E402
+from sklearn.metrics import r2_score  # noqa: E402
+from ml.incremental import feature_profile, plan_incremental, warm_start, stage_count  # noqa: E402
+
+N_FEATURES = 17
+
+
+def _rows(n, rng):
+    X = rng.uniform(0, 100, (n, N_FEATURES))
+    y = X[:, :8].mean(axis=1) * 1.2 + 0.2 * np.sqrt(X[:, 0] * X[:, 1]) - 10 + rng.normal(0, 4, n)
+    return X, y
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base', type=int, default=20_000, help='rows of the initial training')
+    parser.add_argument('--growth', type=float, nargs='+', default=[1, 5, 10, 25, 50], help='%% rows added')
+    parser.add_argument('--stages', type=int, default=50, help='stages added per incremental update')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    names = [f'f{i}' for i in range(N_FEATURES)]
+    X_base, y_base = _rows(args.base, rng)
+    X_test, y_test = _rows(10_000, rng)
+    X_new, y_new = _rows(int(args.base * max(args.growth) / 100), rng)
+
+    t = time.perf_counter()
+    base = GradientBoostingRegressor(random_state=42).fit(X_base, y_base)
+    print(f"Base: {args.base} rows, {stage_count(base)} stages in {time.perf_counter() - t:.2f}s, "
+          f"test R² {r2_score(y_test, base.predict(X_test)):.4f}")
+    profile = feature_profile(X_base, names, stage_count(base))
+
+    print(f"{'growth':>7} {'rows':>8}  {'full s':>8} {'full R²':>8}  {'incr s':>8} {'incr R²':>8} {'max PSI':>8}  speedup")
+    for growth in args.growth:
+        added = int(args.base * growth / 100)
+        X = np.vstack([X_base, X_new[:added]])
+        y = np.concatenate([y_base, y_new[:added]])
+
+        t = time.perf_counter()
+        full = GradientBoostingRegressor(random_state=42).fit(X, y)
+        full_s = time.perf_counter() - t
+
+        t = time.perf_counter()
+        plan = plan_incremental(base, profile, X, names, names, extra_stages=args.stages)
+        incr = warm_start(base, X, y, args.stages) if plan['mode'] == 'incremental' else None
+        incr_s = time.perf_counter() - t
+
+        incr_r2 = f"{r2_score(y_test, incr.predict(X_test)):8.4f}" if incr is not None else f"{'(full)':>8}"
+        print(f"{growth:>6.0f}% {len(X):>8}  {full_s:8.2f} {r2_score(y_test, full.predict(X_test)):8.4f}  "
+              f"{incr_s:8.2f} {incr_r2} {plan['drift']['max_psi'] if plan['drift'] else float('nan'):8.4f}  "
+              f"{full_s / incr_s:5.1f}×")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Throughput benchmark: one model call per request vs the micro-batching
+coalescer (services/micro_batching.py).
+
+Simulates a threaded worker: --threads request threads each score --requests
+single profiles (skill score + anomaly flag) back to back, first with direct
+per-request calls, then through a MicroBatcher. Runs both with the sklearn
+models and with the compiled ones (ml/fast_trees.py, ml/fast_isolation.py).
+
+Usage (from backend/):
+    python benchmarks/bench_micro_batching.py [--threads 16] [--requests 200] [--window-ms 2]
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.model_manager import load_model, compile_model, compile_anomaly_model  # noqa: E402
+from services.micro_batching import MicroBatcher  # noqa: E402
+
+
+def _score_rows(models, X):
+    model, anomaly_model = models
+    return list(zip(model.predict(X).tolist(), (anomaly_model.predict(X) == -1).tolist()))
+
+
+def _models():
+    try:
+        saved = load_model('latest')
+        return saved['skill_model'], saved['anomaly_model']
+    except FileNotFoundError:
+        from sklearn.ensemble import GradientBoostingRegressor, IsolationForest
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 100, (5000, 17))
+        y = X[:, :8].mean(axis=1) + rng.normal(0, 5, 5000)
+        return (GradientBoostingRegressor(random_state=42).fit(X, y),
+                IsolationForest(contamination=0.03, random_state=42).fit(X))
+
+
+def _run(call, rows, n_threads, n_requests):
+    """Requests per second and per-request latency percentiles (ms)."""
+    latencies = [[] for _ in range(n_threads)]
+    barrier = threading.Barrier(n_threads + 1)
+
+    def worker(t):
+        barrier.wait()
+        for i in range(n_requests):
+            row = rows[(t * n_requests + i) % len(rows)]
+            start = time.perf_counter()
+            call(row)
+            latencies[t].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(n_threads)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    ms = np.concatenate(latencies) * 1000
+    return n_threads * n_requests / elapsed, np.percentile(ms, 50), np.percentile(ms, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16, help='concurrent request threads')
+    parser.add_argument('--requests', type=int, default=200, help='requests per thread')
+    parser.add_argument('--window-ms', type=float, default=2.0, help='batching window')
+    parser.add_argument('--max-rows', type=int, default=64, help='rows that close a batch early')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    skill, anomaly = _models()
+    compiled = (compile_model(skill), compile_anomaly_model(anomaly))
+    rows = np.random.default_rng(1).uniform(0, 100, (4096, skill.n_features_in_))
+    print(f"{args.threads} threads × {args.requests} requests, window {args.window_ms} ms, "
+          f"max {args.max_rows} rows")
+
+    for label, models in (('sklearn', (skill, anomaly)), ('compiled', compiled)):
+        if any(m is None for m in models):
+            continue
+        direct = _run(lambda row: _score_rows(models, row[None, :])[0], rows, args.threads, args.requests)
+        batcher = MicroBatcher(_score_rows, args.window_ms, args.max_rows, name=label)
+        batched = _run(lambda row: batcher.submit(row, models), rows, args.threads, args.requests)
+        m = batcher.metrics()
+        for mode, (rps, p50, p99) in (('direct', direct), ('batched', batched)):
+            print(f"{label:<9} {mode:<8} {rps:9.0f} req/s   p50 {p50:7.2f} ms   p99 {p99:7.2f} ms")
+        print(f"{'':<9} mean batch {m['mean_batch_size']}, queue delay p50 {m['queue_delay_ms']['p50']} ms, "
+              f"histogram {m['batch_size_histogram']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Latency benchmark: sklearn predict vs the flattened tree evaluator (ml/fast_trees.py).
+
+Scores the saved 'latest' skill model (or a freshly trained GradientBoosting
+model if none is saved) one row at a time and in batches, times its TreeSHAP
+explanations (ml/tree_shap.py), then does the same for the saved anomaly
+model (ml/fast_isolation.py).
+
+Usage (from backend/):
+    python benchmarks/bench_tree_inference.py [--rows 5000] [--batch 50000]
+"""
+import os
+import sys
+import time
+import argparse
+import warnings
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.model_manager import load_model, compile_model, compile_anomaly_model, compile_explainer  # noqa: E402
+
+
+def _percentiles(samples_s):
+    us = np.asarray(samples_s) * 1e6
+    return f"p50 {np.percentile(us, 50):8.1f} µs   p99 {np.percentile(us, 99):8.1f} µs"
+
+
+def _model():
+    try:
+        saved = load_model('latest')
+        return saved['skill_model'], 'saved latest'
+    except FileNotFoundError:
+        from sklearn.ensemble import GradientBoostingRegressor
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 100, (5000, 17))
+        y = X[:, :8].mean(axis=1) + rng.normal(0, 5, 5000)
+        return GradientBoostingRegressor(random_state=42).fit(X, y), 'fresh GradientBoosting'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000, help='single-row calls to time')
+    parser.add_argument('--batch', type=int, default=50000, help='rows in the batch run')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    model, label = _model()
+    compiled = compile_model(model)
+    if compiled is None:
+        print(f"{type(model).__name__} is not a tree ensemble; nothing to compare")
+        return
+
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 100, (max(args.rows, args.batch), model.n_features_in_))
+    print(f"Model: {type(model).__name__} ({label}), {compiled.n_trees} trees, depth {compiled.max_depth}")
+
+    # Timed in separate loops: sklearn's thread pool disturbs interleaved timings
+    sk, fast = [], []
+    for row in X[:args.rows]:
+        t = time.perf_counter()
+        model.predict(row[None, :])
+        sk.append(time.perf_counter() - t)
+    for row in X[:args.rows]:
+        t = time.perf_counter()
+        compiled.predict_one(row)
+        fast.append(time.perf_counter() - t)
+    print(f"single row  sklearn  {_percentiles(sk)}")
+    print(f"single row  compiled {_percentiles(fast)}")
+
+    for size in (32, 512, args.batch):
+        batch = X[:size]
+        t = time.perf_counter()
+        expected = model.predict(batch)
+        sk_batch = time.perf_counter() - t
+        t = time.perf_counter()
+        got = compiled.predict(batch)
+        fast_batch = time.perf_counter() - t
+        print(f"batch {size:>6}  sklearn {sk_batch * 1000:8.2f} ms   compiled {fast_batch * 1000:8.2f} ms   "
+              f"max |diff| {np.abs(expected - got).max():.1e}")
+
+    _bench_explainer(model, compiled, X, args)
+
+    try:
+        _bench_anomaly(load_model('latest')['anomaly_model'], X, args)
+    except FileNotFoundError:
+        pass
+
+
+def _bench_explainer(model, compiled, X, args):
+    t = time.perf_counter()
+    explainer = compile_explainer(compiled)
+    print(f"TreeSHAP: precomputed in {(time.perf_counter() - t) * 1000:.1f} ms")
+    lat = []
+    for row in X[:args.rows]:
+        t = time.perf_counter()
+        explainer.explain_one(row)
+        lat.append(time.perf_counter() - t)
+    print(f"single row  shap     {_percentiles(lat)}")
+    for size in (32, 512, args.batch):
+        batch = X[:size]
+        t = time.perf_counter()
+        values = explainer.shap_values(batch)
+        elapsed = time.perf_counter() - t
+        gap = np.abs(explainer.expected_value + values.sum(axis=1) - model.predict(batch)).max()
+        print(f"batch {size:>6}  shap    {elapsed * 1000:8.2f} ms   max |base + Σφ − prediction| {gap:.1e}")
+
+
+def _bench_anomaly(model, X, args):
+    compiled = compile_anomaly_model(model)
+    if compiled is None:
+        return
+    X = X[:, :model.n_features_in_]
+    print(f"Anomaly model: IsolationForest, {compiled.n_estimators} trees, max_samples {compiled.max_samples}")
+
+    sk, fast = [], []
+    for row in X[:args.rows]:
+        t = time.perf_counter()
+        model.predict(row[None, :])
+        sk.append(time.perf_counter() - t)
+    for row in X[:args.rows]:
+        t = time.perf_counter()
+        compiled.score_one(row)
+        fast.append(time.perf_counter() - t)
+    print(f"single row  sklearn  {_percentiles(sk)}")
+    print(f"single row  compiled {_percentiles(fast)}")
+
+    for size in (32, 512, args.batch):
+        batch = X[:size]
+        t = time.perf_counter()
+        expected = model.predict(batch)
+        sk_batch = time.perf_counter() - t
+        t = time.perf_counter()
+        got = compiled.predict(batch)
+        fast_batch = time.perf_counter() - t
+        print(f"batch {size:>6}  sklearn {sk_batch * 1000:8.2f} ms   compiled {fast_batch * 1000:8.2f} ms   "
+              f"decisions differ {int((expected != got).sum())}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+gunicorn.conf.py – Multi-worker serving with copy-on-write sharing
+SkillGenome X
+
+The app (models + dataset) is loaded once in the master (`preload_app`) and
+inherited by every worker through fork. To keep those pages shared:
+
+- the cyclic GC is disabled in the master while the app loads and
+  `gc.freeze()` moves every loaded object to the permanent generation right
+  before forking, so GC passes in the workers never write to them;
+- the dataset columns come memory-mapped from the snapshot (ml/snapshot.py),
+  so they are file-backed pages shared by all workers.
+
+Saved models and the dataset snapshot are loaded synchronously in the master
+(SKILLGENOME_WARMUP=preload); on a fresh container the missing models are
+trained in a background thread of one worker – the others wait on a file lock
+and then reload its result – so workers accept requests (and /api/health
+answers) while /api/ready reports 503.
+
+With GUNICORN_THREADS > 1, set SKILLGENOME_MICROBATCH_MS (e.g. 2) to score
+concurrent single-profile requests of a worker in shared batches
+(services/micro_batching.py; metrics at /api/inference-metrics).
+
+Each worker logs its shared vs unique RSS at startup.
+
+Usage:
+    gunicorn -c gunicorn.conf.py api:app
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = int(os.environ.get('GUNICORN_THREADS', '1'))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') != '0'
+
+if preload_app:
+    # Avoid GC passes touching (and un-sharing) objects while the app loads
+    gc.disable()
+    # Load saved artifacts in the master; anything that must be trained is
+    # trained in the background by one worker (see post_fork)
+    os.environ.setdefault('SKILLGENOME_WARMUP', 'preload')
+
+
+def when_ready(server):
+    from services.process_memory import memory_report, format_report
+    server.log.info(format_report('master', memory_report()))
+
+
+def pre_fork(server, worker):
+    if preload_app:
+        gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
+        # Threads do not survive fork: start any pending training (or the wait
+        # for another worker's) in the worker
+        import sys
+        api = sys.modules.get('api')
+        if api is not None:
+            api.resume_warm_up()
+
+
+def post_worker_init(worker):
+    from services.process_memory import memory_report, format_report
+    worker.log.info(format_report(f'worker {worker.age}', memory_report()))
@@ -0,0 +1,36 @@
+"""
+lazy_exports.py – Lazily Resolved Package Attributes
+SkillGenome X
+
+The ml, pipeline and services packages re-export their training entry points
+without importing them: the serving path must not pay for scikit-learn and
+the training modules. Each package builds its module-level __getattr__ /
+__dir__ (PEP 562) here.
+"""
+import importlib
+import sys
+
+
+def lazy_exports(name: str, mapping: dict) -> tuple:
+    """
+    PEP 562 hooks resolving attributes of package `name` on first access.
+
+    Args:
+        name: The package's __name__.
+        mapping: Attribute → module it is imported from.
+
+    Returns:
+        (__getattr__, __dir__) for the package's namespace; a resolved value
+        is cached in the package, so later lookups skip the hook.
+    """
+    def __getattr__(attr):
+        if attr not in mapping:
+            raise AttributeError(f"module {name!r} has no attribute {attr!r}")
+        value = getattr(importlib.import_module(mapping[attr]), attr)
+        setattr(sys.modules[name], attr, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[name])) | set(mapping))
+
+    return __getattr__, __dir__
@@ -1,12 +1,23 @@
 # SkillGenome X – ML Pipeline Package
+from lazy_exports import lazy_exports
 from ml.data_loader import load_csv, validate_columns
-from ml.preprocessing import handle_missing_values, feature_engineering, normalize_features
-from ml.model_training import split_data, train_model, evaluate_model, compare_models
+from ml.preprocessing import handle_missing_values, feature_engineering, normalize_features, compact_dtypes
 from ml.model_manager import save_model, load_model
+from ml.feature_spec import FeatureSpec, compile_feature_spec
+
+# Training functions resolve on first access (PEP 562), so the serving path
+# does not import ml.model_training and scikit-learn.
+_LAZY = {
+    'split_data': 'ml.model_training', 'train_model': 'ml.model_training',
+    'evaluate_model': 'ml.model_training', 'compare_models': 'ml.model_training'
+}
 
 __all__ = [
     'load_csv', 'validate_columns',
-    'handle_missing_values', 'feature_engineering', 'normalize_features',
+    'handle_missing_values', 'feature_engineering', 'normalize_features', 'compact_dtypes',
     'split_data', 'train_model', 'evaluate_model',
-    'save_model', 'load_model'
+    'save_model', 'load_model',
+    'FeatureSpec', 'compile_feature_spec'
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY)
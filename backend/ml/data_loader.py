@@ -44,6 +44,17 @@ FEATURE_COLUMNS = [
     'offline_capability', 'digital_presence', 'learning_hours', 'projects'
 ]
 
+# Socio-economic inputs used at inference when a request doesn't supply them
+# (midpoints of the auto-heal ranges above)
+SOCIO_ECONOMIC_DEFAULTS = {
+    'internet_penetration': 57.5,
+    'urban_population_percent': 50.0,
+    'per_capita_income': 190000.0,
+    'workforce_participation': 52.5,
+    'literacy_rate': 76.5,
+    'unemployment_rate': 13.5,
+}
+
 
 def load_csv(filepath: str) -> pd.DataFrame:
     """
@@ -0,0 +1,264 @@
+"""
+fast_trees.py – Flattened Tree Ensemble Evaluator
+SkillGenome X ML Pipeline
+
+sklearn's `predict` spends most of a single-row call on input validation and
+per-tree dispatch rather than on traversing the trees. Here every tree of a
+fitted ensemble is exported once into contiguous NumPy arrays (feature,
+threshold, children, value) and all trees are walked together, one depth
+level per step, for one row or a whole batch.
+
+Supported models:
+- GradientBoostingRegressor: init constant + learning_rate × Σ tree values
+- HistGradientBoostingRegressor (identity link, numeric splits only):
+  baseline + Σ tree values (the learning rate is already in the leaves)
+- RandomForestRegressor / ExtraTreesRegressor: mean of tree values
+
+Traversal follows sklearn exactly: inputs are cast to float32 (float64 for
+HistGradientBoosting, which compares raw float64 values with its split
+thresholds), a row goes left when X[feature] <= threshold, and NaN follows
+`missing_go_to_left`.
+"""
+import numpy as np
+
+TREE_LEAF = -1
+CHUNK_ROWS = 128           # keeps the (rows × trees) working arrays cache-resident
+
+
+def tree_arrays(tree) -> dict:
+    """
+    Node arrays of one fitted sklearn `Tree` (estimator.tree_).
+
+    Returns:
+        dict with feature, threshold, left, right, value (first output),
+        cover (weighted samples per node), n_samples, missing_go_to_left and
+        max_depth.
+    """
+    n = tree.node_count
+    missing = getattr(tree, 'missing_go_to_left', None)
+    return {
+        'feature': tree.feature.astype(np.int64),
+        'threshold': tree.threshold.astype(np.float64),
+        'left': tree.children_left.astype(np.int64),
+        'right': tree.children_right.astype(np.int64),
+        'value': tree.value[:, 0, 0].astype(np.float64),
+        'cover': tree.weighted_n_node_samples.astype(np.float64),
+        'n_samples': tree.n_node_samples.astype(np.int64),
+        'missing_go_to_left': (np.asarray(missing, dtype=bool) if missing is not None
+                               else np.zeros(n, dtype=bool)),
+        'max_depth': int(tree.max_depth)
+    }
+
+
+def hist_tree_arrays(nodes) -> dict:
+    """
+    Node arrays of one HistGradientBoosting TreePredictor (predictor.nodes),
+    in the tree_arrays layout; `count` (training rows per node) is the cover.
+    """
+    leaf = nodes['is_leaf'].astype(bool)
+    return {
+        'feature': nodes['feature_idx'].astype(np.int64),
+        'threshold': nodes['num_threshold'].astype(np.float64),
+        'left': np.where(leaf, TREE_LEAF, nodes['left']).astype(np.int64),
+        'right': np.where(leaf, TREE_LEAF, nodes['right']).astype(np.int64),
+        'value': nodes['value'].astype(np.float64),
+        'cover': nodes['count'].astype(np.float64),
+        'n_samples': nodes['count'].astype(np.int64),
+        'missing_go_to_left': nodes['missing_go_to_left'].astype(bool),
+        'max_depth': int(nodes['depth'].max())
+    }
+
+
+def flatten_trees(trees: list) -> dict:
+    """
+    Concatenate per-tree node arrays (see tree_arrays) into one node table.
+
+    Child indices become global; leaves point to themselves, so a walk of
+    max_depth steps from the roots ends on a leaf for every tree.
+
+    Returns:
+        dict with roots (n_trees), feature, threshold, children (2 × n_nodes
+        interleaved: [left, right] per node), missing_go_to_left, value,
+        cover, is_leaf, depth (of each node) and max_depth.
+    """
+    offsets = np.cumsum([0] + [len(t['feature']) for t in trees])
+    n_nodes = int(offsets[-1])
+    flat = {
+        'roots': offsets[:-1].astype(np.int64),
+        'feature': np.empty(n_nodes, dtype=np.int64),
+        'threshold': np.empty(n_nodes, dtype=np.float64),
+        'children': np.empty(2 * n_nodes, dtype=np.int64),
+        'missing_go_to_left': np.empty(n_nodes, dtype=bool),
+        'value': np.empty(n_nodes, dtype=np.float64),
+        'cover': np.empty(n_nodes, dtype=np.float64),
+        'is_leaf': np.empty(n_nodes, dtype=bool),
+        'depth': np.zeros(n_nodes, dtype=np.int64),
+        'max_depth': max((t['max_depth'] for t in trees), default=0)
+    }
+    for t, start in zip(trees, offsets[:-1]):
+        local = np.arange(len(t['feature']))
+        nodes = start + local
+        leaf = t['left'] == TREE_LEAF
+        flat['feature'][nodes] = np.where(leaf, 0, t['feature'])
+        flat['threshold'][nodes] = np.where(leaf, np.inf, t['threshold'])
+        flat['children'][2 * nodes] = np.where(leaf, nodes, start + t['left'])
+        flat['children'][2 * nodes + 1] = np.where(leaf, nodes, start + t['right'])
+        flat['missing_go_to_left'][nodes] = t['missing_go_to_left']
+        flat['value'][nodes] = t['value']
+        flat['cover'][nodes] = t['cover']
+        flat['is_leaf'][nodes] = leaf
+        # Children always come after their parent in sklearn's node order
+        for node in local[~leaf]:
+            flat['depth'][start + t['left'][node]] = flat['depth'][start + node] + 1
+            flat['depth'][start + t['right'][node]] = flat['depth'][start + node] + 1
+    return flat
+
+
+class CompiledTreeEnsemble:
+    """
+    Tree ensemble flattened into contiguous arrays.
+
+    Args:
+        trees: list of per-tree node arrays (tree_arrays output).
+        n_features: Number of input features.
+        aggregate: 'sum' (boosting) or 'mean' (forests).
+        init: Constant added to the aggregate (boosting init prediction).
+        scale: Factor applied to every tree value (boosting learning rate).
+        source: Name of the original estimator class.
+        input_dtype: dtype inputs are cast to before the threshold tests.
+    """
+
+    def __init__(self, trees: list, n_features: int, aggregate: str = 'mean',
+                 init: float = 0.0, scale: float = 1.0, source: str = '', input_dtype=np.float32):
+        flat = flatten_trees(trees)
+        self.input_dtype = input_dtype
+        self.n_trees = len(trees)
+        self.n_features = int(n_features)
+        self.aggregate = aggregate
+        self.init = float(init)
+        self.scale = float(scale)
+        self.source = source
+        self.max_depth = flat['max_depth']
+        self.roots = flat['roots']
+        self.feature = flat['feature']
+        self.threshold = flat['threshold']
+        self.children = flat['children']
+        self.missing_go_to_left = flat['missing_go_to_left']
+        self.value = flat['value']
+        self.cover = flat['cover']
+        self.is_leaf = flat['is_leaf']
+        self.depth = flat['depth']
+        self.n_nodes = len(self.feature)
+        # Traversal works on slot ids (2 × node): each node's split is stored
+        # twice, so one gather at slot + go_right yields the child's slot
+        self._slot_feature = np.repeat(self.feature, 2)
+        self._slot_threshold = np.repeat(self.threshold, 2)
+        self._slot_missing_right = np.repeat(~self.missing_go_to_left, 2)
+        self._slot_child = 2 * self.children
+        self._root_slots = 2 * self.roots
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Compile a fitted sklearn regressor.
+
+        Raises:
+            TypeError: If the model is not a supported tree ensemble.
+        """
+        name = type(model).__name__
+        if name == 'GradientBoostingRegressor':
+            init = 0.0
+            if model.init_ != 'zero':
+                # Only constant init estimators (DummyRegressor) can be folded in
+                probe = np.zeros((2, model.n_features_in_))
+                probe[1] = 1.0
+                pred = np.asarray(model.init_.predict(probe), dtype=np.float64).ravel()
+                if type(model.init_).__name__ != 'DummyRegressor' or pred[0] != pred[1]:
+                    raise TypeError(f"Unsupported GradientBoosting init estimator: {model.init_!r}")
+                init = float(pred[0])
+            trees = [tree_arrays(est.tree_) for est in model.estimators_[:, 0]]
+            return cls(trees, model.n_features_in_, aggregate='sum', init=init,
+                       scale=model.learning_rate, source=name)
+        if name == 'HistGradientBoostingRegressor':
+            if model.loss not in ('squared_error', 'absolute_error', 'quantile'):
+                raise TypeError(f"Unsupported HistGradientBoosting loss {model.loss!r} (non-identity link)")
+            nodes = [predictors[0].nodes for predictors in model._predictors]
+            if any(n['is_categorical'].any() for n in nodes):
+                raise TypeError("HistGradientBoosting with categorical splits is not supported")
+            return cls([hist_tree_arrays(n) for n in nodes], model.n_features_in_, aggregate='sum',
+                       init=float(np.ravel(model._baseline_prediction)[0]), scale=1.0, source=name,
+                       input_dtype=np.float64)
+        if name in ('RandomForestRegressor', 'ExtraTreesRegressor'):
+            if getattr(model, 'n_outputs_', 1) != 1:
+                raise TypeError(f"{name} with multiple outputs is not supported")
+            trees = [tree_arrays(est.tree_) for est in model.estimators_]
+            return cls(trees, model.n_features_in_, aggregate='mean', source=name)
+        raise TypeError(f"Cannot compile {name}: not a supported tree ensemble")
+
+    def apply(self, X) -> np.ndarray:
+        """
+        Leaf reached in every tree.
+
+        Args:
+            X: (n × n_features) array-like.
+
+        Returns:
+            (n × n_trees) global node indices of the leaves.
+        """
+        X = np.asarray(X, dtype=self.input_dtype)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features}")
+        out = np.empty((len(X), self.n_trees), dtype=np.int64)
+        for start in range(0, len(X), CHUNK_ROWS):
+            out[start:start + CHUNK_ROWS] = self._apply_chunk(X[start:start + CHUNK_ROWS])
+        return out
+
+    def _apply_chunk(self, X: np.ndarray) -> np.ndarray:
+        flat_x = X.ravel()
+        row_base = (np.arange(len(X)) * self.n_features)[:, None]
+        slots = np.repeat(self._root_slots[None, :], len(X), axis=0)
+        has_nan = bool(np.isnan(flat_x).any())
+        for _ in range(self.max_depth):
+            x = flat_x[row_base + self._slot_feature[slots]]
+            go_right = x > self._slot_threshold[slots]
+            if has_nan:
+                go_right |= np.isnan(x) & self._slot_missing_right[slots]
+            slots = self._slot_child[slots + go_right]
+        return slots // 2
+
+    def _combine(self, leaf_values: np.ndarray) -> np.ndarray:
+        """Aggregate (n × n_trees) leaf values in the same order sklearn does."""
+        if self.aggregate == 'mean':
+            return leaf_values.sum(axis=1) / self.n_trees
+        # Boosting adds scale × value stage by stage
+        out = np.full(len(leaf_values), self.init)
+        for column in (self.scale * leaf_values).T:
+            out += column
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        """Predictions for a batch (n × n_features); matches sklearn's predict."""
+        return self._combine(self.value[self.apply(X)])
+
+    def predict_one(self, row) -> float:
+        """Prediction for a single feature row (1-D or 1 × n_features)."""
+        x = np.asarray(row, dtype=self.input_dtype).reshape(-1)
+        if len(x) != self.n_features:
+            raise ValueError(f"X has {len(x)} features, but the model expects {self.n_features}")
+        has_nan = bool(np.isnan(x).any())
+        slots = self._root_slots
+        for _ in range(self.max_depth):
+            xv = x[self._slot_feature[slots]]
+            go_right = xv > self._slot_threshold[slots]
+            if has_nan:
+                go_right |= np.isnan(xv) & self._slot_missing_right[slots]
+            slots = self._slot_child[slots + go_right]
+        values = self.value[slots // 2]
+        if self.aggregate == 'mean':
+            return float(values.sum() / self.n_trees)
+        total = self.init
+        for v in (self.scale * values).tolist():
+            total += v
+        return total
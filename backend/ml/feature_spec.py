@@ -0,0 +1,169 @@
+"""
+feature_spec.py – Compiled Inference Feature Builder
+SkillGenome X ML Pipeline
+
+The model is trained on the columns listed in its metadata (`features`):
+the 10 base signals plus the engineered columns from feature_engineering.
+A FeatureSpec is compiled once per model from that list and turns request
+signals straight into a NumPy row (or matrix) in exactly the trained column
+order, with the same formulas and rounding as feature_engineering – without
+building a pandas DataFrame.
+"""
+import threading
+from functools import lru_cache
+import numpy as np
+
+from ml.data_loader import FEATURE_COLUMNS, SOCIO_ECONOMIC_DEFAULTS
+
+
+# Raw inputs read from the request, in slot order
+INPUT_COLUMNS = FEATURE_COLUMNS + list(SOCIO_ECONOMIC_DEFAULTS)
+INPUT_DEFAULTS = np.array([0.0] * len(FEATURE_COLUMNS) + list(SOCIO_ECONOMIC_DEFAULTS.values()))
+
+# Engineered columns (see preprocessing.feature_engineering) and their rounding
+ENGINEERED_COLUMNS = [
+    'behavioral_avg', 'output_to_learning_ratio', 'consistency_score', 'digital_economic_index',
+    'digital_index', 'economic_activity_index', 'opportunity_gap'
+]
+_ROUND_SCALE = np.array([10.0, 100.0, 10.0, 10.0, 10.0, 100.0, 10.0])
+
+_SLOT = {name: i for i, name in enumerate(INPUT_COLUMNS + ENGINEERED_COLUMNS)}
+_I = {name: i for i, name in enumerate(INPUT_COLUMNS)}
+_BEHAVIORAL = [_I[c] for c in FEATURE_COLUMNS[:8]]
+
+
+def _engineer(raw: np.ndarray, out: np.ndarray):
+    """
+    Engineered columns for a block of raw input rows.
+
+    Args:
+        raw: (n × len(INPUT_COLUMNS)) float64 inputs.
+        out: (n × len(ENGINEERED_COLUMNS)) float64 array written in place.
+    """
+    c = lambda name: raw[:, _I[name]]
+    # Column-by-column sum, the order pandas uses for a row mean
+    total = raw[:, _BEHAVIORAL[0]].copy()
+    for i in _BEHAVIORAL[1:]:
+        total += raw[:, i]
+    out[:, 0] = total / len(_BEHAVIORAL)
+    out[:, 1] = c('creation_output') / (c('learning_behavior') + 1)
+    out[:, 2] = c('experience_consistency') * c('offline_capability') / 100
+    out[:, 3] = (c('digital_presence') + c('economic_activity')) / 2
+    out[:, 4] = c('internet_penetration') * c('urban_population_percent') / 100
+    out[:, 5] = c('per_capita_income') * c('workforce_participation') / 100000
+    out[:, 6] = c('literacy_rate') - c('unemployment_rate')
+    # Same as Series.round(d): rint(x · 10^d) / 10^d
+    out *= _ROUND_SCALE
+    np.rint(out, out=out)
+    out /= _ROUND_SCALE
+
+
+def _engineer_row(r: list) -> list:
+    """Scalar version of _engineer for one row (Python round() is also half-to-even)."""
+    total = r[0]
+    for i in _BEHAVIORAL[1:]:
+        total += r[i]
+    (creation, learning, consistency, economic, _, _, offline, digital, _, _,
+     internet, urban, income, workforce, literacy, unemployment) = r
+    return [
+        round(total / len(_BEHAVIORAL) * 10.0) / 10.0,
+        round(creation / (learning + 1) * 100.0) / 100.0,
+        round(consistency * offline / 100 * 10.0) / 10.0,
+        round((digital + economic) / 2 * 10.0) / 10.0,
+        round(internet * urban / 100 * 10.0) / 10.0,
+        round(income * workforce / 100000 * 100.0) / 100.0,
+        round((literacy - unemployment) * 10.0) / 10.0
+    ]
+
+
+class FeatureSpec:
+    """
+    Compiled mapping from request signals to a model's feature vector.
+
+    Args:
+        feature_names: Column order the model was trained on.
+
+    Raises:
+        ValueError: If a feature can't be built from request signals.
+    """
+
+    def __init__(self, feature_names):
+        self.feature_names = list(feature_names)
+        unknown = [f for f in self.feature_names if f not in _SLOT]
+        if unknown:
+            raise ValueError(f"Cannot build features from request signals: {unknown}")
+        self._gather = np.array([_SLOT[f] for f in self.feature_names], dtype=np.intp)
+        self._gather_list = self._gather.tolist()
+        self._needs_engineering = any(f in ENGINEERED_COLUMNS for f in self.feature_names)
+        self._defaults = INPUT_DEFAULTS.tolist()
+        self._local = threading.local()
+
+    def __len__(self):
+        return len(self.feature_names)
+
+    def _row_buffer(self):
+        """Per-thread preallocated (1 × n_features) output row."""
+        row = getattr(self._local, 'row', None)
+        if row is None:
+            row = self._local.row = np.empty((1, len(self.feature_names)))
+        return row
+
+    def transform(self, signals: dict, out: np.ndarray = None) -> np.ndarray:
+        """
+        Feature row for one profile.
+
+        Missing base signals count as 0; missing socio-economic inputs take
+        SOCIO_ECONOMIC_DEFAULTS.
+
+        Args:
+            signals: Request signals dict.
+            out: Optional (1 × n_features) array to write into; by default a
+                per-thread buffer is reused, valid until the next call.
+
+        Returns:
+            (1 × n_features) float64 array ready for model.predict().
+        """
+        raw = []
+        for name, default in zip(INPUT_COLUMNS, self._defaults):
+            value = signals.get(name)
+            raw.append(default if value is None else float(value))
+        slots = raw + _engineer_row(raw) if self._needs_engineering else raw
+        out = self._row_buffer() if out is None else out
+        out[0] = [slots[i] for i in self._gather_list]
+        return out
+
+    def raw_inputs(self, signals: dict) -> np.ndarray:
+        """Raw input vector (len(INPUT_COLUMNS)) of one profile, defaults filled in."""
+        return np.array([default if signals.get(name) is None else float(signals[name])
+                         for name, default in zip(INPUT_COLUMNS, self._defaults)])
+
+    def transform_batch(self, signals: list) -> np.ndarray:
+        """
+        Feature matrix (n × n_features) for a list of signals dicts.
+
+        Raises:
+            ValueError: If a signal value isn't numeric.
+        """
+        raw = np.empty((len(signals), len(INPUT_COLUMNS)))
+        for i, name in enumerate(INPUT_COLUMNS):
+            column = np.array([s.get(name) for s in signals], dtype=np.float64)
+            raw[:, i] = np.where(np.isnan(column), INPUT_DEFAULTS[i], column)
+        return self.transform_raw(raw)
+
+    def transform_raw(self, raw: np.ndarray) -> np.ndarray:
+        """Feature matrix (n × n_features) from raw inputs (n × len(INPUT_COLUMNS))."""
+        slots = np.empty((len(raw), len(_SLOT)))
+        slots[:, :len(INPUT_COLUMNS)] = raw
+        if self._needs_engineering:
+            _engineer(slots[:, :len(INPUT_COLUMNS)], slots[:, len(INPUT_COLUMNS):])
+        return slots[:, self._gather]
+
+
+@lru_cache(maxsize=8)
+def _compile(feature_names: tuple) -> FeatureSpec:
+    return FeatureSpec(feature_names)
+
+
+def compile_feature_spec(feature_names) -> FeatureSpec:
+    """Cached FeatureSpec for a feature list (one per distinct model schema)."""
+    return _compile(tuple(feature_names))
@@ -0,0 +1,179 @@
+"""
+incremental.py – Warm-Start Retraining with a Drift Check
+SkillGenome X ML Pipeline
+
+A full retrain refits every boosting stage on the whole dataset, even when
+only a few thousand rows were added. Incremental retraining keeps the
+previous ensemble and fits only `extra_stages` new stages on the updated
+data (sklearn warm_start); each new stage corrects the residuals of the
+existing ones on the new rows as well as the old.
+
+That is only sound while the data still looks like what the existing trees
+were fitted on. Every full training therefore stores a feature profile
+(decile edges and bin shares per feature); before a warm start the updated
+data is binned on those edges and compared with the Population Stability
+Index:
+
+    PSI = Σ (actual% − expected%) · ln(actual% / expected%)
+
+(< 0.1 stable, 0.1–0.2 moderate shift, > 0.2 significant shift). Any feature
+above the threshold – or a model that can't be warm-started, a changed
+feature set or a stage cap reached – means a full retrain instead.
+
+Only GradientBoosting is warm-started. HistGradientBoosting refits its bin
+mapper on every fit(), while the trees it already has keep the bin
+thresholds of the old binning, so they would be evaluated on different
+bins than they were grown on.
+"""
+import copy
+import numpy as np
+
+PROFILE_BINS = 10
+PSI_THRESHOLD = 0.2
+EXTRA_STAGES = 50
+MAX_STAGE_FACTOR = 4        # full retrain once an ensemble has grown to 4× its original stages
+_EPS = 1e-4                 # floor for empty bins (ln(0) would be infinite)
+
+
+def feature_profile(X, feature_names, base_stages: int = 0, bins: int = PROFILE_BINS) -> dict:
+    """
+    Reference distribution of each feature, stored with a fully trained model.
+
+    Args:
+        X: (n × features) training matrix (array or DataFrame).
+        feature_names: Column names, in X's order.
+        base_stages: Boosting stages of the full training (for the stage cap).
+        bins: Quantile bins per feature.
+
+    Returns:
+        JSON-ready dict: {rows, bins, base_stages, features: {name: {edges,
+        expected}}} with the inner bin edges and the share of rows per bin.
+        Incremental updates keep it as is, so drift is always measured
+        against the data of the last full training.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    features = {}
+    for i, name in enumerate(feature_names):
+        column = X[:, i][np.isfinite(X[:, i])]
+        edges = np.unique(np.quantile(column, np.linspace(0, 1, bins + 1)[1:-1])) if len(column) else np.array([])
+        features[name] = {'edges': edges.tolist(), 'expected': _shares(column, edges).tolist()}
+    return {'rows': int(len(X)), 'bins': bins, 'base_stages': int(base_stages), 'features': features}
+
+
+def _shares(column: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    counts = np.bincount(np.searchsorted(edges, column, side='right'), minlength=len(edges) + 1)
+    return counts / max(1, len(column))
+
+
+def psi(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Population Stability Index of two bin-share vectors."""
+    expected = np.maximum(np.asarray(expected, dtype=np.float64), _EPS)
+    actual = np.maximum(np.asarray(actual, dtype=np.float64), _EPS)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def drift_report(profile: dict, X, feature_names, threshold: float = PSI_THRESHOLD) -> dict:
+    """
+    PSI of every profiled feature between the reference and X.
+
+    Returns:
+        dict with psi (name → value), max_psi, drifted (features above the
+        threshold, worst first) and threshold. Features missing from the
+        profile (psi None) count as drifted.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    values = {}
+    for i, name in enumerate(feature_names):
+        ref = profile['features'].get(name)
+        if ref is None:
+            values[name] = None
+            continue
+        column = X[:, i][np.isfinite(X[:, i])]
+        values[name] = round(psi(ref['expected'], _shares(column, np.asarray(ref['edges']))), 4)
+    drifted = sorted((n for n, v in values.items() if v is None or v > threshold),
+                     key=lambda n: -(values[n] if values[n] is not None else np.inf))
+    return {
+        'psi': values,
+        'max_psi': max((v for v in values.values() if v is not None), default=0.0),
+        'drifted': drifted,
+        'threshold': threshold
+    }
+
+
+WARM_STARTABLE = ('GradientBoostingRegressor',)
+
+
+def stage_count(model) -> int:
+    """Boosting stages of a fitted GradientBoosting / HistGradientBoosting model (0 otherwise)."""
+    if hasattr(model, 'n_estimators_'):
+        return int(model.n_estimators_)
+    if hasattr(model, 'n_iter_'):
+        return int(model.n_iter_)
+    return 0
+
+
+def prepare_warm_start(model, extra_stages: int = EXTRA_STAGES):
+    """
+    Copy of a fitted boosting model whose next fit() adds extra_stages stages.
+
+    The existing stages (and the init prediction) are kept as they are; the
+    active model itself is not touched.
+
+    Raises:
+        TypeError: If the model is not in WARM_STARTABLE.
+    """
+    name = type(model).__name__
+    if name not in WARM_STARTABLE:
+        raise TypeError(f"{name} can't be warm-started")
+    model = copy.deepcopy(model)
+    model.set_params(warm_start=True, n_estimators=stage_count(model) + int(extra_stages))
+    return model
+
+
+def warm_start(model, X, y, extra_stages: int = EXTRA_STAGES):
+    """
+    Copy of a fitted boosting model with extra_stages more stages fitted on (X, y).
+
+    Returned with warm_start off again, so a later plain fit() retrains from
+    scratch.
+    """
+    model = prepare_warm_start(model, extra_stages)
+    model.fit(X, y)
+    model.set_params(warm_start=False)
+    return model
+
+
+def plan_incremental(model, profile: dict, X, feature_names, trained_feature_names=None,
+                     threshold: float = PSI_THRESHOLD, extra_stages: int = EXTRA_STAGES) -> dict:
+    """
+    Decide between a warm start and a full retrain.
+
+    Args:
+        model: Currently active model.
+        profile: feature_profile() stored with it (or None).
+        X: Updated training matrix.
+        feature_names: Columns of X.
+        trained_feature_names: Columns the model was trained on.
+
+    Returns:
+        dict with mode ('incremental' | 'full'), reason (why a full retrain
+        is needed, else None) and drift (drift_report or None).
+    """
+    def full(reason, drift=None):
+        return {'mode': 'full', 'reason': reason, 'drift': drift}
+
+    if model is None:
+        return full("no trained model")
+    if type(model).__name__ not in WARM_STARTABLE:
+        return full(f"{type(model).__name__} can't be warm-started")
+    if trained_feature_names is not None and list(trained_feature_names) != list(feature_names):
+        return full("feature set changed")
+    if not profile:
+        return full("no feature profile stored with the current model")
+    original = profile.get('base_stages') or stage_count(model)
+    if stage_count(model) + extra_stages > MAX_STAGE_FACTOR * original:
+        return full(f"stage cap reached ({stage_count(model)} stages, first trained with {original})")
+    drift = drift_report(profile, X, feature_names, threshold)
+    if drift['drifted']:
+        return full(f"feature drift (PSI > {threshold}): {', '.join(drift['drifted'][:5])}", drift)
+    return {'mode': 'incremental', 'reason': None, 'drift': drift}
@@ -5,6 +5,7 @@ SkillGenome X ML Pipeline
 import os
 import json
 import joblib
+import numpy as np
 from datetime import datetime
 
 
@@ -100,6 +101,172 @@ def load_model(tag: str = 'latest') -> dict:
     }
 
 
+def save_sensitivity(curves: dict, tag: str = 'latest') -> str:
+    """
+    Save partial-dependence / ICE curves (ml/sensitivity.py) next to the
+    model files.
+
+    Args:
+        curves: compute_sensitivity() result, with its model_key.
+        tag: Version tag of the model the curves belong to.
+
+    Returns:
+        Path of the written JSON file.
+    """
+    _ensure_dir()
+    path = os.path.join(MODEL_DIR, f'sensitivity_{tag}.json')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(curves, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    print(f"[model_manager] Saved sensitivity curves '{tag}' → {path}")
+    return path
+
+
+def load_sensitivity(tag: str = 'latest', key: str = None):
+    """
+    Load saved sensitivity curves.
+
+    Args:
+        tag: Version tag.
+        key: If given, only curves computed for this model_key are returned.
+
+    Returns:
+        dict, or None if missing, unreadable or computed for another model.
+    """
+    path = os.path.join(MODEL_DIR, f'sensitivity_{tag}.json')
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            curves = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[model_manager] Sensitivity curves unreadable: {e}")
+        return None
+    if key is not None and curves.get('model_key') != key:
+        return None
+    return curves
+
+
+def importance_values(model):
+    """
+    Impurity-style feature importances of a fitted tree model, in column order.
+
+    feature_importances_ when the model has it; for HistGradientBoosting,
+    which doesn't, the split gains of all trees summed per feature and
+    normalized to 1. None for anything else (e.g. LinearRegression).
+    """
+    if hasattr(model, 'feature_importances_'):
+        return np.asarray(model.feature_importances_, dtype=np.float64)
+    if hasattr(model, '_predictors'):
+        values = np.zeros(model.n_features_in_)
+        for predictors in model._predictors:
+            for predictor in predictors:
+                splits = predictor.nodes[~predictor.nodes['is_leaf'].astype(bool)]
+                np.add.at(values, splits['feature_idx'], splits['gain'])
+        return values / values.sum() if values.sum() > 0 else values
+    return None
+
+
+def feature_importances(model, columns) -> dict:
+    """
+    Feature → importance of a fitted regressor, rounded to 4 decimals.
+
+    importance_values(), else coef_ for linear models; empty dict for
+    anything else.
+    """
+    values = importance_values(model)
+    if values is None and hasattr(model, 'coef_'):
+        values = model.coef_
+    if values is None:
+        return {}
+    return dict(zip(columns, [round(float(v), 4) for v in values]))
+
+
+def compile_model(model):
+    """
+    Export a fitted tree ensemble into flat NumPy arrays for fast scoring.
+
+    See ml/fast_trees.py. GradientBoosting, HistGradientBoosting and
+    RandomForest models are supported; anything else (e.g. a LinearRegression picked by
+    compare_models) is left to its own predict().
+
+    Args:
+        model: Fitted sklearn regressor.
+
+    Returns:
+        CompiledTreeEnsemble, or None if the model can't be compiled.
+    """
+    from ml.fast_trees import CompiledTreeEnsemble
+
+    try:
+        compiled = CompiledTreeEnsemble.from_sklearn(model)
+    except TypeError as e:
+        print(f"[model_manager] Model not compiled: {e}")
+        return None
+
+    print(f"[model_manager] Compiled {compiled.source}: {compiled.n_trees} trees, "
+          f"{compiled.n_nodes} nodes, depth {compiled.max_depth}")
+    return compiled
+
+
+def compile_explainer(compiled, feature_names=None, max_cost: int = None):
+    """
+    Precompute TreeSHAP path data for a compiled tree ensemble (see
+    ml/tree_shap.py).
+
+    Args:
+        compiled: CompiledTreeEnsemble (compile_model output) or None.
+        feature_names: Column names used in attributions.
+        max_cost: Leaves × depth² above which no explainer is built
+            (default MAX_EXPLAIN_COST).
+
+    Returns:
+        TreeExplainer, or None when there is no compiled model or it is too
+        large to explain within the serving latency budget.
+    """
+    from ml.tree_shap import TreeExplainer, MAX_EXPLAIN_COST, explain_cost
+
+    if compiled is None:
+        return None
+    max_cost = MAX_EXPLAIN_COST if max_cost is None else max_cost
+    cost = explain_cost(compiled)
+    if cost > max_cost:
+        print(f"[model_manager] TreeSHAP explainer skipped: {int(compiled.is_leaf.sum())} leaves at depth "
+              f"{compiled.max_depth} (cost {cost} > {max_cost}); legacy explanations")
+        return None
+    explainer = TreeExplainer(compiled, feature_names)
+    print(f"[model_manager] TreeSHAP explainer: {explainer.n_leaves} leaves, "
+          f"≤{explainer.max_path_features} features per path")
+    return explainer
+
+
+def compile_anomaly_model(model):
+    """
+    Precompute per-leaf path lengths of a fitted IsolationForest for fast
+    anomaly scoring (see ml/fast_isolation.py).
+
+    Args:
+        model: Fitted IsolationForest.
+
+    Returns:
+        CompiledIsolationForest, or None if the model can't be compiled.
+    """
+    from ml.fast_isolation import CompiledIsolationForest
+
+    if model is None:
+        return None
+    try:
+        compiled = CompiledIsolationForest.from_sklearn(model)
+    except TypeError as e:
+        print(f"[model_manager] Anomaly model not compiled: {e}")
+        return None
+
+    print(f"[model_manager] Compiled IsolationForest: {compiled.n_estimators} trees, "
+          f"max_samples {compiled.max_samples}, depth {compiled.trees.max_depth}")
+    return compiled
+
+
 def list_saved_models() -> list:
     """List all saved model tags."""
     _ensure_dir()
@@ -2,12 +2,24 @@
 model_training.py – Model Training, Comparison & Evaluation
 SkillGenome X ML Pipeline
 """
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, IsolationForest
+from sklearn.ensemble import (
+    RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor, IsolationForest
+)
 from sklearn.model_selection import train_test_split as sklearn_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from threadpoolctl import threadpool_limits
+
+from ml.model_manager import feature_importances
+
+# Below this many training rows, starting worker processes costs more than it saves
+PARALLEL_MIN_ROWS = 20_000
 
 
 def split_data(X: pd.DataFrame, y: pd.Series, test_size: float = 0.2, random_state: int = 42) -> dict:
@@ -32,6 +44,91 @@ def split_data(X: pd.DataFrame, y: pd.Series, test_size: float = 0.2, random_sta
     }
 
 
+def hist_gradient_boosting(
+    n_estimators: int = 100,
+    learning_rate: float = 0.1,
+    max_depth: int = 3,
+    random_state: int = 42
+) -> HistGradientBoostingRegressor:
+    """
+    Histogram-based gradient boosting configured like the GradientBoosting
+    candidate.
+
+    Features are binned into at most 255 buckets once, so each split scans
+    bin histograms instead of sorted raw values, and histograms are built on
+    all cores (OpenMP). n_estimators is the maximum number of boosting
+    iterations: above 10,000 rows 10% of the training data is held out and
+    boosting stops once it no longer improves (early_stopping='auto').
+    """
+    return HistGradientBoostingRegressor(
+        max_iter=n_estimators, learning_rate=learning_rate, max_depth=max_depth,
+        early_stopping='auto', random_state=random_state
+    )
+
+
+def fit_candidate(model, X_train, y_train, X_test, y_test, threads: int = 1) -> tuple:
+    """
+    Fit one candidate and evaluate it on the test split.
+
+    Runs in a pool process when candidates are trained concurrently; each
+    process fits one candidate at a time, so its CPU time is the candidate's.
+    Multi-threaded estimators use at most `threads` threads: RandomForest
+    through n_jobs, HistGradientBoosting through the OpenMP thread limit.
+
+    The splits are copied first: unpickled slices can come back read-only,
+    which sklearn's input validation rejects, and fitting on the same
+    contiguous layout in both modes keeps LinearRegression bit-identical.
+
+    Returns:
+        (fitted model, metrics dict incl. fit_seconds / cpu_seconds)
+    """
+    X_train, y_train, X_test, y_test = X_train.copy(), y_train.copy(), X_test.copy(), y_test.copy()
+    if 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=threads)
+    wall, cpu = time.perf_counter(), time.process_time()
+    with threadpool_limits(limits=threads):
+        model.fit(X_train, y_train)
+    fit_seconds, cpu_seconds = time.perf_counter() - wall, time.process_time() - cpu
+    if 'n_jobs' in model.get_params():
+        # Trees don't depend on n_jobs; serving predicts single-threaded
+        model.set_params(n_jobs=None)
+
+    y_pred = model.predict(X_test)
+    r2 = round(r2_score(y_test, y_pred), 4)
+    return model, {
+        'r2_score': r2,
+        'mae': round(mean_absolute_error(y_test, y_pred), 2),
+        'rmse': round(float(np.sqrt(mean_squared_error(y_test, y_pred))), 2),
+        'accuracy_pct': round(r2 * 100, 1),
+        'fit_seconds': round(fit_seconds, 3),
+        'cpu_seconds': round(cpu_seconds, 3)
+    }
+
+
+def worker_budget(n_workers: int, n_candidates: int, n_threaded: int, n_rows: int,
+                  min_rows: int = PARALLEL_MIN_ROWS) -> tuple:
+    """
+    Split a CPU budget between candidate processes and estimator threads.
+
+    Args:
+        n_workers: Cores to use (None/0 = all).
+        n_candidates: Candidates to fit.
+        n_threaded: How many of them are multi-threaded (RandomForest,
+            HistGradientBoosting).
+        n_rows: Training rows.
+
+    Returns:
+        (pool processes, threads per multi-threaded candidate); 0 processes
+        = train in-process one candidate after another, each with all cores.
+    """
+    n_workers = max(1, int(n_workers or os.cpu_count() or 1))
+    if n_workers == 1 or n_candidates < 2 or n_rows < min_rows:
+        return 0, n_workers
+    processes = min(n_workers, n_candidates)
+    # Every process holds one core; the multi-threaded candidates share the rest
+    return processes, 1 + (n_workers - processes) // max(1, n_threaded)
+
+
 def compare_models(
     X_train: pd.DataFrame,
     y_train: pd.Series,
@@ -40,7 +137,10 @@ def compare_models(
     n_estimators: int = 100,
     learning_rate: float = 0.1,
     max_depth: int = 3,
-    random_state: int = 42
+    random_state: int = 42,
+    n_workers: int = None,
+    parallel_min_rows: int = PARALLEL_MIN_ROWS,
+    progress=None
 ) -> dict:
     """
     Train and evaluate multiple models, then select the best one.
@@ -49,11 +149,23 @@ def compare_models(
     - LinearRegression
     - RandomForestRegressor
     - GradientBoostingRegressor
+    - HistGradientBoostingRegressor (see hist_gradient_boosting)
 
     Selection criterion: highest R² score on test data.
 
+    With a worker budget above 1 (default: all cores) and at least
+    parallel_min_rows training rows, the candidates are fitted concurrently
+    in a process pool and the multi-threaded ones (RandomForest,
+    HistGradientBoosting) share the cores left over.
+    Every candidate has a fixed random_state, so the fitted models and
+    metrics are the same as when training them one after another.
+
+    progress, if given, is called as progress(key, done, total) whenever a
+    candidate has been fitted (in completion order when run in parallel).
+
     Returns:
-        dict with: best_model_name, best_model, best_metrics, all_models (name→r2)
+        dict with: best_model_name, best_model, best_metrics, all_models (name→r2),
+        all_metrics (incl. per-candidate fit_seconds / cpu_seconds), parallelism
     """
     candidates = {
         'linear': LinearRegression(),
@@ -63,46 +175,58 @@ def compare_models(
         'gradient_boosting': GradientBoostingRegressor(
             n_estimators=n_estimators, learning_rate=learning_rate,
             max_depth=max_depth, random_state=random_state
-        )
+        ),
+        'hist_gradient_boosting': hist_gradient_boosting(n_estimators, learning_rate, max_depth, random_state)
     }
+    threaded = {'random_forest', 'hist_gradient_boosting'}
 
     display_names = {
         'linear': 'LinearRegression',
         'random_forest': 'RandomForest',
-        'gradient_boosting': 'GradientBoosting'
+        'gradient_boosting': 'GradientBoosting',
+        'hist_gradient_boosting': 'HistGradientBoosting'
     }
 
     results = {}
     trained_models = {}
-
-    for key, model in candidates.items():
-        print(f"[model_training] Training {display_names[key]}...")
-        model.fit(X_train, y_train)
+    start = time.perf_counter()
+    processes, threads = worker_budget(n_workers, len(candidates), len(threaded), len(X_train), parallel_min_rows)
+
+    def budget(key):
+        return threads if key in threaded else 1
+
+    if processes:
+        print(f"[model_training] Training {len(candidates)} candidates in {processes} processes "
+              f"({threads} threads each for RandomForest / HistGradientBoosting)...")
+        # Spawned workers: the caller may be a threaded web server
+        with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {pool.submit(fit_candidate, model, X_train, y_train, X_test, y_test, budget(key)): key
+                       for key, model in candidates.items()}
+            done = {}
+            for future in as_completed(futures):
+                done[futures[future]] = future.result()
+                if progress:
+                    progress(futures[future], len(done), len(candidates))
+            fitted = {key: done[key] for key in candidates}
+    else:
+        fitted = {}
+        for key, model in candidates.items():
+            print(f"[model_training] Training {display_names[key]}...")
+            fitted[key] = fit_candidate(model, X_train, y_train, X_test, y_test, budget(key))
+            if progress:
+                progress(key, len(fitted), len(candidates))
+
+    for key, (model, metrics) in fitted.items():
         trained_models[key] = model
-
-        y_pred = model.predict(X_test)
-        r2 = round(r2_score(y_test, y_pred), 4)
-        mae = round(mean_absolute_error(y_test, y_pred), 2)
-        rmse = round(float(np.sqrt(mean_squared_error(y_test, y_pred))), 2)
-
-        results[key] = {
-            'r2_score': r2,
-            'mae': mae,
-            'rmse': rmse,
-            'accuracy_pct': round(r2 * 100, 1)
-        }
-        print(f"[model_training]   {display_names[key]}: R²={r2}, MAE={mae}")
+        results[key] = metrics
+        print(f"[model_training]   {display_names[key]}: R²={metrics['r2_score']}, MAE={metrics['mae']} "
+              f"({metrics['fit_seconds']}s wall, {metrics['cpu_seconds']}s CPU)")
 
     # Select best model by R² score
     best_key = max(results, key=lambda k: results[k]['r2_score'])
     best_model = trained_models[best_key]
 
-    # Get feature importances if available
-    feature_importances = {}
-    if hasattr(best_model, 'feature_importances_'):
-        feature_importances = dict(zip(X_train.columns, [round(float(v), 4) for v in best_model.feature_importances_]))
-    elif hasattr(best_model, 'coef_'):
-        feature_importances = dict(zip(X_train.columns, [round(float(v), 4) for v in best_model.coef_]))
+    importances = feature_importances(best_model, X_train.columns)
 
     print(f"[model_training] ★ Best model: {display_names[best_key]} (R²={results[best_key]['r2_score']})")
 
@@ -113,8 +237,66 @@ def compare_models(
         'best_metrics': results[best_key],
         'all_models': {k: results[k]['r2_score'] for k in results},
         'all_metrics': results,
-        'feature_importances': feature_importances,
-        'trained_models': trained_models
+        'feature_importances': importances,
+        'trained_models': trained_models,
+        'parallelism': {
+            'processes': processes,
+            'threads': threads,
+            'wall_seconds': round(time.perf_counter() - start, 3)
+        }
+    }
+
+
+def incremental_update(
+    model,
+    X_train: pd.DataFrame,
+    y_train: pd.Series,
+    X_test: pd.DataFrame,
+    y_test: pd.Series,
+    extra_stages: int = 50,
+    n_workers: int = None
+) -> dict:
+    """
+    Warm-start a fitted GradientBoosting model with extra_stages new stages.
+
+    The existing stages are kept and the new ones are fitted on the updated
+    training split (see ml/incremental.py); the active model itself is not
+    modified. Fit time is reported like a compare_models candidate.
+
+    Returns:
+        dict shaped like compare_models (the updated model is the only
+        candidate) plus stages_before / stages_after.
+    """
+    from ml.incremental import prepare_warm_start, stage_count
+
+    key, name = {
+        'GradientBoostingRegressor': ('gradient_boosting', 'GradientBoosting')
+    }.get(type(model).__name__, (None, type(model).__name__))
+    if key is None:
+        raise TypeError(f"{name} can't be warm-started")
+
+    stages_before = stage_count(model)
+    threads = max(1, int(n_workers or os.cpu_count() or 1))
+    print(f"[model_training] Warm-starting {name}: {stages_before} + {extra_stages} stages on {len(X_train)} rows...")
+    start = time.perf_counter()
+    updated, metrics = fit_candidate(prepare_warm_start(model, extra_stages), X_train, y_train, X_test, y_test,
+                                      threads=threads)
+    updated.set_params(warm_start=False)
+    print(f"[model_training]   {name}: R²={metrics['r2_score']}, MAE={metrics['mae']} "
+          f"({metrics['fit_seconds']}s wall, {metrics['cpu_seconds']}s CPU)")
+
+    return {
+        'best_model_name': name,
+        'best_model_key': key,
+        'best_model': updated,
+        'best_metrics': metrics,
+        'all_models': {key: metrics['r2_score']},
+        'all_metrics': {key: metrics},
+        'feature_importances': feature_importances(updated, X_train.columns),
+        'trained_models': {key: updated},
+        'parallelism': {'processes': 0, 'threads': threads, 'wall_seconds': round(time.perf_counter() - start, 3)},
+        'stages_before': stages_before,
+        'stages_after': stage_count(updated)
     }
 
 
@@ -126,36 +308,51 @@ def train_model(
     max_depth: int = 3,
     random_state: int = 42,
     train_anomaly: bool = True,
-    X_full: pd.DataFrame = None
+    X_full: pd.DataFrame = None,
+    anomaly_max_samples='auto',
+    hist_min_rows: int = None
 ) -> dict:
     """
     Train GradientBoostingRegressor and optionally IsolationForest.
     Used for startup training (no comparison needed).
 
+    anomaly_max_samples is the IsolationForest subsample size per tree; it
+    bounds tree depth (~log2) and therefore anomaly scoring cost.
+
+    With hist_min_rows set and at least that many training rows, the
+    histogram-based HistGradientBoostingRegressor (hist_gradient_boosting)
+    is trained instead: exact GradientBoosting fit time grows with every
+    sorted split scan and uses one core. It is scored by its own predict()
+    (compile_model only flattens exact tree ensembles).
+
     Returns:
         dict with keys: skill_model, anomaly_model (or None), feature_importances
     """
-    print(f"[model_training] Training GradientBoostingRegressor (n={n_estimators}, lr={learning_rate}, d={max_depth})...")
-
-    gbr = GradientBoostingRegressor(
-        n_estimators=n_estimators,
-        learning_rate=learning_rate,
-        max_depth=max_depth,
-        random_state=random_state
-    )
+    if hist_min_rows is not None and len(X_train) >= hist_min_rows:
+        print(f"[model_training] Training HistGradientBoostingRegressor ({len(X_train)} rows ≥ {hist_min_rows}; "
+              f"max_iter={n_estimators}, lr={learning_rate}, d={max_depth})...")
+        gbr = hist_gradient_boosting(n_estimators, learning_rate, max_depth, random_state)
+    else:
+        print(f"[model_training] Training GradientBoostingRegressor (n={n_estimators}, lr={learning_rate}, d={max_depth})...")
+        gbr = GradientBoostingRegressor(
+            n_estimators=n_estimators,
+            learning_rate=learning_rate,
+            max_depth=max_depth,
+            random_state=random_state
+        )
     gbr.fit(X_train, y_train)
 
-    importances = dict(zip(X_train.columns, [round(float(v), 4) for v in gbr.feature_importances_]))
+    importances = feature_importances(gbr, X_train.columns)
     sorted_imp = sorted(importances.items(), key=lambda x: x[1], reverse=True)
     print(f"[model_training] Top features: {sorted_imp[:5]}")
 
     anomaly_model = None
     if train_anomaly:
         print("[model_training] Training IsolationForest for anomaly detection...")
-        iso = IsolationForest(contamination=0.03, random_state=random_state)
+        iso = IsolationForest(contamination=0.03, max_samples=anomaly_max_samples, random_state=random_state)
         iso.fit(X_full if X_full is not None else X_train)
         anomaly_model = iso
-        print("[model_training] Anomaly model trained")
+        print(f"[model_training] Anomaly model trained (max_samples={iso.max_samples_})")
 
     return {
         'skill_model': gbr,
@@ -110,6 +110,61 @@ def feature_engineering(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+CATEGORICAL_COLUMNS = ['state', 'domain', 'area_type', 'digital_access', 'opportunity_level']
+
+
+def _compact_numeric(series: pd.Series) -> pd.Series:
+    """Smallest dtype that holds the column: int8/int16/int32 if integral, else float32."""
+    if pd.api.types.is_bool_dtype(series):
+        return series
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    values = series.to_numpy()
+    if np.isfinite(values).all() and (values == np.round(values)).all():
+        return pd.to_numeric(series, downcast='integer')
+    return series.astype(np.float32)
+
+
+def compact_dtypes(df: pd.DataFrame, categorical_columns: list = None) -> pd.DataFrame:
+    """
+    Shrink the in-memory dataset after feature engineering.
+
+    - Low-cardinality text columns (state, domain, area_type, digital_access,
+      opportunity_level) become pandas Categorical, so equality filters and
+      groupbys compare integer codes instead of Python strings.
+    - Integral numeric columns are downcast to the smallest integer type,
+      all other numeric columns (behavioral scores, engineered features) to float32.
+
+    Run it on the serving copy of the data, after the feature matrix for
+    training has been extracted.
+
+    Args:
+        df: Preprocessed DataFrame.
+        categorical_columns: Columns to convert to Categorical (default CATEGORICAL_COLUMNS).
+
+    Returns:
+        The same DataFrame with compacted columns.
+    """
+    if categorical_columns is None:
+        categorical_columns = CATEGORICAL_COLUMNS
+
+    before = int(df.memory_usage(deep=True).sum())
+
+    for col in categorical_columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+
+    for col in df.select_dtypes(include='number').columns:
+        df[col] = _compact_numeric(df[col])
+
+    after = int(df.memory_usage(deep=True).sum())
+    saved = before - after
+    ratio = before / after if after else 0
+    print(f"[preprocessing] Compacted dtypes: {before / 1e6:.1f} MB → {after / 1e6:.1f} MB "
+          f"(saved {saved / 1e6:.1f} MB, {ratio:.1f}×)")
+    return df
+
+
 def normalize_features(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
     """
     Normalize numeric feature columns to 0–100 range using min-max scaling.
@@ -0,0 +1,154 @@
+"""
+sensitivity.py – Partial-Dependence and ICE Curves
+SkillGenome X ML Pipeline
+
+How the model output moves with each feature, computed once per trained
+model:
+
+- ICE (individual conditional expectation): for a background row, the
+  prediction as one feature sweeps a grid while the row's other features
+  stay fixed.
+- PD (partial dependence): the mean ICE curve over the background sample.
+
+All curves of all features come from one stacked matrix
+(features × grid points × background rows) scored in a few large `predict`
+calls, instead of one call per feature and grid point.
+
+The result is a plain JSON-ready dict stored next to the model in
+models/saved (model_manager.save_sensitivity) with a fingerprint of the
+model (model_key), so it is only recomputed when the model changes.
+"""
+import hashlib
+from datetime import datetime
+import numpy as np
+
+GRID_POINTS = 20
+BACKGROUND_ROWS = 500
+ICE_ROWS = 30
+GRID_PERCENTILES = (5, 95)      # grid spans the central range of each feature
+PREDICT_CHUNK_ROWS = 100_000    # bounds the stacked matrix scored per predict call
+
+
+def _digest(obj, h):
+    """Feed an estimator's parameters and fitted state into a hash, recursively."""
+    if isinstance(obj, np.ndarray):
+        h.update(f'{obj.dtype.str}{obj.shape}'.encode())
+        if obj.dtype.names:             # record arrays: field by field (skips padding bytes)
+            for name in obj.dtype.names:
+                _digest(obj[name], h)
+        elif obj.dtype.hasobject:
+            _digest(obj.tolist(), h)
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple)):
+        h.update(f'{type(obj).__name__}{len(obj)}'.encode())
+        for item in obj:
+            _digest(item, h)
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=str):
+            h.update(str(k).encode())
+            _digest(obj[k], h)
+    elif obj is None or isinstance(obj, (bool, int, float, str, np.generic)):
+        h.update(repr(obj).encode())
+    elif hasattr(obj, '__getstate__') and type(obj).__name__ == 'Tree':
+        _digest(obj.__getstate__(), h)      # sklearn tree: node and value arrays
+    elif hasattr(obj, '__dict__'):
+        h.update(type(obj).__name__.encode())
+        _digest(vars(obj), h)
+    else:
+        h.update(type(obj).__name__.encode())
+
+
+def model_key(model) -> str:
+    """
+    Fingerprint of a fitted model's parameters and fitted state.
+
+    Unlike a hash of the pickle, it is the same for a model and its reloaded
+    copy.
+    """
+    h = hashlib.sha1()
+    _digest(model, h)
+    return h.hexdigest()[:16]
+
+
+def _grid(column: np.ndarray, grid_points: int) -> np.ndarray:
+    """Up to grid_points distinct values across the central range of a column."""
+    column = column[np.isfinite(column)]
+    if not len(column):
+        return np.zeros(1)
+    distinct = np.unique(column)
+    if len(distinct) <= grid_points:
+        return distinct
+    lo, hi = np.percentile(column, GRID_PERCENTILES)
+    return np.unique(np.linspace(lo, hi, grid_points))
+
+
+def compute_sensitivity(model, X, feature_names, grid_points: int = GRID_POINTS,
+                        background_rows: int = BACKGROUND_ROWS, ice_rows: int = ICE_ROWS,
+                        transform=None, seed: int = 0) -> dict:
+    """
+    Partial-dependence and ICE curves for every feature of a model.
+
+    Args:
+        model: Fitted regressor with predict().
+        X: (n × features) training data (array or DataFrame) in the units the
+            curves are reported in.
+        feature_names: Column names of X.
+        grid_points: Maximum grid values per feature.
+        background_rows: Rows sampled from X to average over.
+        ice_rows: Background rows whose individual curves are kept.
+        transform: Optional callable mapping rows of X to model inputs
+            (e.g. a fitted scaler's transform).
+        seed: Seed of the background sample.
+
+    Returns:
+        dict with method, background_rows, ice_rows, computed_at, and per
+        feature {grid, pd, ice, range}: grid values, the mean prediction at
+        each, the first ice_rows individual curves, and max − min of pd.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    names = list(feature_names)
+    rng = np.random.default_rng(seed)
+    if len(X) > background_rows:
+        X = X[np.sort(rng.choice(len(X), background_rows, replace=False))]
+    n = len(X)
+    grids = [_grid(X[:, j], grid_points) for j in range(X.shape[1])]
+
+    # Stack every (feature, grid value) copy of the background
+    sizes = [len(g) for g in grids]
+    stacked = np.tile(X, (sum(sizes), 1))
+    offset = 0
+    for j, grid in enumerate(grids):
+        block = stacked[offset * n:(offset + len(grid)) * n]
+        block[:, j] = np.repeat(grid, n)
+        offset += len(grid)
+
+    predictions = np.empty(len(stacked))
+    for start in range(0, len(stacked), PREDICT_CHUNK_ROWS):
+        chunk = stacked[start:start + PREDICT_CHUNK_ROWS]
+        predictions[start:start + PREDICT_CHUNK_ROWS] = model.predict(
+            transform(chunk) if transform is not None else chunk)
+
+    features = {}
+    offset = 0
+    for name, grid in zip(names, grids):
+        curves = predictions[offset * n:(offset + len(grid)) * n].reshape(len(grid), n).T   # (rows × grid)
+        offset += len(grid)
+        pd_curve = curves.mean(axis=0)
+        features[name] = {
+            'grid': np.round(grid, 4).tolist(),
+            'pd': np.round(pd_curve, 3).tolist(),
+            'ice': np.round(curves[:ice_rows], 3).tolist(),
+            'range': round(float(pd_curve.max() - pd_curve.min()), 3)
+        }
+
+    print(f"[sensitivity] {len(names)} features × ≤{grid_points} grid points × {n} rows "
+          f"({len(stacked)} predictions)")
+    return {
+        'method': 'partial_dependence',
+        'features_order': names,
+        'background_rows': n,
+        'ice_rows': min(ice_rows, n),
+        'computed_at': datetime.now().isoformat(),
+        'features': features
+    }
@@ -0,0 +1,170 @@
+"""
+snapshot.py – Columnar Snapshot of the Preprocessed Dataset
+SkillGenome X ML Pipeline
+
+Every worker used to parse the CSV and rerun validate → heal → engineer on
+boot. The fully preprocessed (and compacted) dataset is instead written once
+as one .npy file per column, keyed by a content hash of the source CSV and
+of the preprocessing code. Later boots memory-map the columns and skip CSV
+parsing and feature engineering entirely.
+
+Layout:
+    <SNAPSHOT_DIR>/<key>/manifest.json
+    <SNAPSHOT_DIR>/<key>/col_<i>.npy        (categoricals store their codes)
+    <SNAPSHOT_DIR>/<key>/history_<part>.npy (decoded skill_history matrix)
+"""
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SNAPSHOT_DIR = os.environ.get('SKILLGENOME_SNAPSHOT_DIR', os.path.join(BASE_DIR, 'data', 'snapshots'))
+
+# Source files whose behaviour determines the preprocessed output
+PREPROCESSING_SOURCES = [
+    os.path.join(BASE_DIR, 'ml', 'data_loader.py'),
+    os.path.join(BASE_DIR, 'ml', 'preprocessing.py'),
+    os.path.join(BASE_DIR, 'pipeline', 'skill_history.py'),
+    os.path.abspath(__file__),
+]
+
+HISTORY_PARTS = ('values', 'mask', 'lengths')
+_HASH_BLOCK = 1 << 20
+
+
+def preprocessing_version() -> str:
+    """Hash of the preprocessing source code; changes whenever the chain changes."""
+    digest = hashlib.sha256()
+    for path in PREPROCESSING_SOURCES:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def snapshot_key(csv_path: str) -> str:
+    """Content hash of the source CSV combined with the preprocessing version."""
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    digest.update(preprocessing_version().encode())
+    return digest.hexdigest()[:24]
+
+
+def save_snapshot(df: pd.DataFrame, history: dict, key: str, source: str = None) -> str:
+    """
+    Write a preprocessed DataFrame and its decoded history as a snapshot.
+
+    The snapshot is written to a temporary directory and renamed into place,
+    so concurrent workers never see a half-written snapshot. Older snapshots
+    of the same source file are removed.
+
+    Returns:
+        Path of the snapshot directory.
+    """
+    target = os.path.join(SNAPSHOT_DIR, key)
+    if os.path.exists(os.path.join(target, 'manifest.json')):
+        return target
+
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        filename = f'col_{i}.npy'
+        if isinstance(series.dtype, pd.CategoricalDtype) or series.dtype == object:
+            cat = series.astype('category') if series.dtype == object else series
+            np.save(os.path.join(tmp, filename), np.ascontiguousarray(cat.cat.codes.to_numpy()))
+            columns.append({'name': col, 'kind': 'categorical', 'file': filename,
+                            'categories': [str(c) for c in cat.cat.categories]})
+        else:
+            np.save(os.path.join(tmp, filename), np.ascontiguousarray(series.to_numpy()))
+            columns.append({'name': col, 'kind': 'array', 'file': filename})
+
+    for part in HISTORY_PARTS:
+        np.save(os.path.join(tmp, f'history_{part}.npy'), np.ascontiguousarray(history[part]))
+
+    manifest = {
+        'key': key,
+        'source': os.path.abspath(source) if source else None,
+        'rows': len(df),
+        'columns': columns,
+        'preprocessing_version': preprocessing_version(),
+        'created_at': datetime.now().isoformat()
+    }
+    with open(os.path.join(tmp, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    try:
+        os.rename(tmp, target)
+    except OSError:
+        # Another worker finished first
+        shutil.rmtree(tmp, ignore_errors=True)
+        return target
+
+    _prune(keep=key, source=manifest['source'])
+    size_kb = sum(os.path.getsize(os.path.join(target, f)) for f in os.listdir(target)) / 1024
+    print(f"[snapshot] Saved {len(df)} rows × {len(columns)} cols → {target} ({size_kb:.0f} KB)")
+    return target
+
+
+def load_snapshot(key: str, mmap: bool = True):
+    """
+    Load a snapshot by key.
+
+    Columns are memory-mapped read-only (mmap=True), so pages are shared
+    between processes and only touched when used.
+
+    Returns:
+        (df, history) tuple, or None if no snapshot exists for the key.
+    """
+    target = os.path.join(SNAPSHOT_DIR, key)
+    manifest_path = os.path.join(target, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    mode = 'r' if mmap else None
+    data = {}
+    for col in manifest['columns']:
+        values = np.load(os.path.join(target, col['file']), mmap_mode=mode)
+        if col['kind'] == 'categorical':
+            data[col['name']] = pd.Categorical.from_codes(values, categories=col['categories'])
+        else:
+            data[col['name']] = values
+    df = pd.DataFrame(data, copy=False)
+
+    history = {
+        part: np.load(os.path.join(target, f'history_{part}.npy'), mmap_mode=mode)
+        for part in HISTORY_PARTS
+    }
+
+    print(f"[snapshot] Loaded {manifest['rows']} rows × {len(manifest['columns'])} cols from {target}")
+    return df, history
+
+
+def _prune(keep: str, source: str):
+    """Delete older snapshots built from the same source file."""
+    if not source or not os.path.isdir(SNAPSHOT_DIR):
+        return
+    for name in os.listdir(SNAPSHOT_DIR):
+        manifest_path = os.path.join(SNAPSHOT_DIR, name, 'manifest.json')
+        if name == keep or not os.path.exists(manifest_path):
+            continue
+        try:
+            with open(manifest_path) as f:
+                if json.load(f).get('source') == source:
+                    shutil.rmtree(os.path.join(SNAPSHOT_DIR, name), ignore_errors=True)
+        except (OSError, ValueError):
+            continue
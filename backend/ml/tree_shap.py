@@ -0,0 +1,232 @@
+"""
+tree_shap.py – Exact Path-Dependent TreeSHAP
+SkillGenome X ML Pipeline
+
+Signed per-feature contributions φ (SHAP values) for the tree ensembles
+compiled by ml/fast_trees.py, such that expected_value + Σφ equals the
+model's prediction.
+
+For path-dependent TreeSHAP, a leaf with value v whose root path tests the
+distinct features D (|D| = d) contributes to feature i ∈ D
+
+    φ_i = v · (o_i − z_i) · Σ_{S ⊆ D∖{i}} |S|!(d−|S|−1)!/d! · Π_{j∈S} o_j · Π_{j∈D∖S∖{i}} z_j
+
+where o_j = 1 if the row satisfies every split on feature j along the path
+(else 0) and z_j is the fraction of training cover that follows those
+splits. The sum over subsets is a weighted read-out of the coefficients of
+Π_{j≠i} (z_j + o_j·t), so each leaf costs O(d²).
+
+Per-leaf path data (features, [lo, hi] intervals, z fractions, Shapley
+weights) is precomputed once per model. Since φ of a leaf only depends on
+which of its d path conditions the row satisfies, models with small trees
+(the depth-3 ensembles trained here) also get a table of φ for all 2^d
+patterns of every leaf; explaining rows is then one comparison, one gather
+and one matrix product. Larger models evaluate the polynomial per row.
+Features that never appear on a path get φ = 0.
+
+That per-row cost grows with leaves × depth² (and so does the precompute),
+so models above MAX_EXPLAIN_COST get no explainer (compile_explainer
+returns None) and keep the legacy importance-based explanation: a depth-16
+forest would otherwise take seconds per /api/predict.
+"""
+from math import factorial
+import numpy as np
+
+CHUNK_ROWS = 64            # bounds the (rows × leaves × depth) working arrays
+TABLE_MAX_ENTRIES = 4_000_000   # leaves × 2^depth × depth values in the pattern table (32 MB)
+MAX_EXPLAIN_COST = 2_000_000    # leaves × depth²; ≈ 50 ms per row and 0.3 s to build at the cap
+
+
+def explain_cost(compiled) -> int:
+    """Leaves × max depth² of a compiled ensemble – the per-row TreeSHAP work."""
+    return int(compiled.is_leaf.sum()) * int(compiled.max_depth) ** 2
+
+
+def _shapley_weights(d_max: int) -> np.ndarray:
+    """W[d, k] = k!(d−k−1)!/d! for k < d (weight of a size-k coalition among d players)."""
+    W = np.zeros((d_max + 1, max(d_max, 1)))
+    for d in range(1, d_max + 1):
+        for k in range(d):
+            W[d, k] = factorial(k) * factorial(d - k - 1) / factorial(d)
+    return W
+
+
+class TreeExplainer:
+    """
+    Exact TreeSHAP for a CompiledTreeEnsemble.
+
+    Args:
+        compiled: CompiledTreeEnsemble (ml/fast_trees.py).
+        feature_names: Optional column names, used by attribution().
+    """
+
+    def __init__(self, compiled, feature_names=None):
+        self.n_features = compiled.n_features
+        self.input_dtype = compiled.input_dtype
+        self.feature_names = list(feature_names) if feature_names is not None else None
+        # Leaf values on the output scale: boosting stages are scaled by the
+        # learning rate, forest trees averaged
+        weight = compiled.scale if compiled.aggregate == 'sum' else 1.0 / compiled.n_trees
+
+        leaves = []
+        for root in compiled.roots.tolist():
+            self._collect_leaves(compiled, root, {}, leaves)
+
+        self.n_leaves = len(leaves)
+        self.max_path_features = max((len(path) for _, path in leaves), default=0)
+        L, D = self.n_leaves, max(self.max_path_features, 1)
+        self.leaf_value = np.array([compiled.value[leaf] * weight for leaf, _ in leaves])
+        self.path_feature = np.zeros((L, D), dtype=np.intp)
+        self.lo = np.full((L, D), -np.inf)
+        self.hi = np.full((L, D), np.inf)
+        self.nan_ok = np.zeros((L, D), dtype=bool)
+        self.zero_fraction = np.ones((L, D))      # padding slots: factor 1, never credited
+        self.valid = np.zeros((L, D), dtype=bool)
+        depth = np.zeros(L, dtype=np.intp)
+        for l, (_, path) in enumerate(leaves):
+            depth[l] = len(path)
+            for j, (feature, (lo, hi, nan_ok, z)) in enumerate(path.items()):
+                self.path_feature[l, j] = feature
+                self.lo[l, j], self.hi[l, j] = lo, hi
+                self.nan_ok[l, j] = nan_ok
+                self.zero_fraction[l, j] = z
+                self.valid[l, j] = True
+        self.weights = _shapley_weights(D)[depth]            # (L × D)
+        # (leaf, path slot) indices grouped by feature, to add contributions per
+        # feature with a per-row sequential sum (same result for any batch size)
+        slots = np.flatnonzero(self.valid.ravel())
+        slot_feature = self.path_feature.ravel()[slots]
+        order = np.argsort(slot_feature, kind='stable')
+        self._slots = slots[order]
+        self._used_features, self._starts = np.unique(slot_feature[order], return_index=True)
+        # φ only depends on which path conditions a row satisfies: for small
+        # trees tabulate it for every satisfied-pattern of every leaf
+        self._table = None
+        if L * (2 ** D) * D <= TABLE_MAX_ENTRIES:
+            self._bits = (1 << np.arange(D)).astype(np.intp)
+            patterns = ((np.arange(2 ** D)[:, None] & self._bits) > 0)[:, None, :] & self.valid
+            self._table = np.ascontiguousarray(self._leaf_phi(patterns).transpose(1, 0, 2))   # (L × 2^D × D)
+            self._leaf_index = np.arange(L)
+        # E[f(X)] under the tree cover distribution
+        self.expected_value = float(compiled.init + (self.leaf_value * self.zero_fraction.prod(axis=1)).sum())
+
+    @staticmethod
+    def _collect_leaves(compiled, node: int, path: dict, out: list):
+        """Depth-first walk keeping, per feature, (lo, hi, nan follows path, cover fraction)."""
+        if compiled.is_leaf[node]:
+            out.append((node, path))
+            return
+        feature = int(compiled.feature[node])
+        threshold = float(compiled.threshold[node])
+        cover = compiled.cover[node]
+        for side, child in enumerate(compiled.children[2 * node:2 * node + 2].tolist()):
+            lo, hi, nan_ok, z = path.get(feature, (-np.inf, np.inf, True, 1.0))
+            if side == 0:       # left: x <= threshold
+                hi = min(hi, threshold)
+                nan_ok = nan_ok and bool(compiled.missing_go_to_left[node])
+            else:               # right: x > threshold
+                lo = max(lo, threshold)
+                nan_ok = nan_ok and not compiled.missing_go_to_left[node]
+            child_path = dict(path)
+            child_path[feature] = (lo, hi, nan_ok, z * compiled.cover[child] / cover)
+            TreeExplainer._collect_leaves(compiled, child, child_path, out)
+
+    def shap_values(self, X) -> np.ndarray:
+        """
+        SHAP values for a batch.
+
+        Args:
+            X: (n × n_features) array-like (or a single 1-D row).
+
+        Returns:
+            (n × n_features) contributions; each row sums to
+            prediction − expected_value.
+        """
+        X = np.asarray(X, dtype=self.input_dtype)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.n_features:
+            raise ValueError(f"X has {X.shape[1]} features, but the model expects {self.n_features}")
+        out = np.empty((len(X), self.n_features))
+        for start in range(0, len(X), CHUNK_ROWS):
+            out[start:start + CHUNK_ROWS] = self._chunk(X[start:start + CHUNK_ROWS])
+        return out
+
+    def explain_one(self, row) -> np.ndarray:
+        """SHAP values (1-D, n_features) for a single feature row."""
+        return self.shap_values(np.asarray(row).reshape(1, -1))[0]
+
+    def attribution(self, row, ndigits: int = 3) -> dict:
+        """JSON-ready attribution of one row: base value and {feature: SHAP value}."""
+        return self.attributions(np.asarray(row).reshape(1, -1), ndigits)[0]
+
+    def attributions(self, X, ndigits: int = 3) -> list:
+        """attribution() for every row of a batch."""
+        names = self.feature_names or [f'f{i}' for i in range(self.n_features)]
+        base = round(self.expected_value, ndigits)
+        return [
+            {'method': 'tree_shap', 'base_value': base,
+             'contributions': {name: round(v, ndigits) for name, v in zip(names, values)}}
+            for values in self.shap_values(X).tolist()
+        ]
+
+    def _satisfied(self, X: np.ndarray) -> np.ndarray:
+        """(n × L × D) True where the row satisfies every split on the path feature."""
+        x = X[:, self.path_feature]
+        o = ((x > self.lo) & (x <= self.hi)) | (np.isnan(x) & self.nan_ok)
+        return o & self.valid
+
+    def _leaf_phi(self, o: np.ndarray) -> np.ndarray:
+        """(n × L × D) contribution of every leaf to each of its path features."""
+        D = self.path_feature.shape[1]
+        o = o.astype(np.float64)
+        z = self.zero_fraction
+
+        # Coefficients of Π_j (z_j + o_j·t), lowest degree first
+        P = np.zeros(o.shape[:2] + (D + 1,))
+        P[..., 0] = 1.0
+        for j in range(D):
+            shifted = P[..., :-1] * o[..., j, None]
+            P *= z[:, j, None]
+            P[..., 1:] += shifted
+
+        phi = np.empty(o.shape)
+        for i in range(D):
+            zi = z[:, i]
+            # o_i = 1: divide out (z_i + t) from the top coefficient down
+            q = P[..., D].copy()
+            total_in = self.weights[:, D - 1] * q
+            for k in range(D - 1, 0, -1):
+                q = P[..., k] - zi * q
+                total_in += self.weights[:, k - 1] * q
+            # o_i = 0: the factor is the constant z_i
+            total_out = (P[..., :D] * self.weights).sum(axis=2) / zi
+            oi = o[..., i]
+            phi[..., i] = self.leaf_value * (oi - zi) * np.where(oi > 0, total_in, total_out)
+        return phi
+
+    def _chunk(self, X: np.ndarray) -> np.ndarray:
+        o = self._satisfied(X)
+        if self._table is not None:
+            pattern = o @ self._bits                                            # (n × L)
+            phi = self._table[self._leaf_index, pattern]                        # (n × L × D)
+        else:
+            phi = self._leaf_phi(o)
+        out = np.zeros((len(X), self.n_features))
+        if len(self._slots):
+            grouped = phi.reshape(len(X), -1)[:, self._slots]
+            out[:, self._used_features] = np.add.reduceat(grouped, self._starts, axis=1)
+        return out
+
+
+def factor_contributions(attribution: dict, row, ndigits: int = 1) -> list:
+    """
+    An attribution() as explanation factors: [{feature, value, impact}] in
+    feature order, with the row's feature value and the SHAP value rounded
+    to `ndigits` as impact.
+    """
+    values = np.asarray(row, dtype=np.float64).ravel().tolist()
+    return [
+        {'feature': name, 'value': int(value), 'impact': round(impact, ndigits)}
+        for (name, impact), value in zip(attribution['contributions'].items(), values)
+    ]
@@ -1,10 +1,22 @@
 # Pipeline Layer – Data Processing & Model Training
-from pipeline.preprocessing import handle_missing_values, normalize_features, get_feature_matrix
+from lazy_exports import lazy_exports
+from pipeline.preprocessing import handle_missing_values, normalize_features, get_feature_matrix, compact_dtypes
 from pipeline.feature_engineering import feature_engineering
-from pipeline.model_training import split_data, train_model, evaluate_model, compare_models
+from pipeline.aggregates import build_state_aggregates
+
+# Training functions resolve on first access (PEP 562), so the serving path
+# does not import pipeline.model_training and scikit-learn.
+_LAZY = {
+    'split_data': 'pipeline.model_training', 'train_model': 'pipeline.model_training',
+    'evaluate_model': 'pipeline.model_training', 'compare_models': 'pipeline.model_training',
+    'search_models': 'pipeline.hyperparameter_search'
+}
 
 __all__ = [
-    'handle_missing_values', 'normalize_features', 'get_feature_matrix',
+    'handle_missing_values', 'normalize_features', 'get_feature_matrix', 'compact_dtypes',
     'feature_engineering',
-    'split_data', 'train_model', 'evaluate_model', 'compare_models'
+    'split_data', 'train_model', 'evaluate_model', 'compare_models', 'search_models',
+    'build_state_aggregates'
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY)
@@ -0,0 +1,111 @@
+"""
+pipeline/aggregates.py – Per-State Aggregate Cube
+SkillGenome X
+
+Regional endpoints (risk analysis, regional analysis, state specialization,
+policy engine, economic impact) all need the same handful of per-state shares
+and means. Instead of re-filtering the full dataset once per state on every
+request, they are computed here in a single groupby pass whenever the dataset
+is loaded or replaced.
+"""
+import pandas as pd
+
+# Digital access levels that count towards the digital divide
+DIGITAL_DIVIDE_LEVELS = ['Limited', 'Occasional']
+
+# Thresholds shared by the regional endpoints
+LEARNING_DEFICIT_THRESHOLD = 40     # learning_behavior below this → learning deficit
+HIGH_SKILL_THRESHOLD = 70           # skill_score above this in a Low-opportunity area → hidden talent / migration risk
+RURAL_HIDDEN_THRESHOLD = 65         # skill_score above this in a Rural area → rural hidden talent
+
+STATE_COLUMNS = [
+    'profiles',
+    'digital_divide_pct',
+    'learning_deficit_pct',
+    'high_skill_low_opp_pct',
+    'high_skill_low_opp_count',
+    'rural_hidden_pct',
+    'rural_hidden_count',
+    'avg_skill',
+    'innovation_mean',
+    'collaboration_mean',
+    'economic_mean',
+    'dominant_domain',
+    'top_domain',
+    'top_domain_avg_skill',
+]
+
+
+def empty_state_aggregates() -> dict:
+    """Aggregate cube for an empty dataset."""
+    return {
+        'states': pd.DataFrame(columns=STATE_COLUMNS),
+        'rows': 0
+    }
+
+
+def build_state_aggregates(df: pd.DataFrame) -> dict:
+    """
+    Build the per-state aggregate cube.
+
+    States keep the order in which they first appear in the dataset, matching
+    the previous `df['state'].unique()` iteration order of the endpoints.
+
+    Args:
+        df: Preprocessed dataset (after feature engineering).
+
+    Returns:
+        dict with:
+        - states: DataFrame indexed by state with the columns in STATE_COLUMNS
+          (shares are percentages, 0–100)
+        - rows: number of profiles aggregated
+    """
+    if df.empty or 'state' not in df.columns:
+        return empty_state_aggregates()
+
+    skill = df['skill_score']
+    flags = pd.DataFrame({
+        'state': df['state'],
+        'digital_divide': df['digital_access'].isin(DIGITAL_DIVIDE_LEVELS),
+        'learning_deficit': df['learning_behavior'] < LEARNING_DEFICIT_THRESHOLD,
+        'high_skill_low_opp': (skill > HIGH_SKILL_THRESHOLD) & (df['opportunity_level'] == 'Low'),
+        'rural_hidden': (df['area_type'] == 'Rural') & (skill > RURAL_HIDDEN_THRESHOLD),
+        'skill_score': skill,
+        'innovation_problem_solving': df['innovation_problem_solving'],
+        'collaboration_community': df['collaboration_community'],
+        'economic_activity': df['economic_activity'],
+    })
+
+    # Single pass: means of the boolean flags are the per-state shares
+    grouped = flags.groupby('state', sort=False, observed=True)
+    means = grouped.mean()
+    sums = grouped[['high_skill_low_opp', 'rural_hidden']].sum()
+
+    states = pd.DataFrame(index=means.index)
+    states['profiles'] = grouped.size()
+    states['digital_divide_pct'] = means['digital_divide'] * 100
+    states['learning_deficit_pct'] = means['learning_deficit'] * 100
+    states['high_skill_low_opp_pct'] = means['high_skill_low_opp'] * 100
+    states['high_skill_low_opp_count'] = sums['high_skill_low_opp'].astype(int)
+    states['rural_hidden_pct'] = means['rural_hidden'] * 100
+    states['rural_hidden_count'] = sums['rural_hidden'].astype(int)
+    states['avg_skill'] = means['skill_score']
+    states['innovation_mean'] = means['innovation_problem_solving']
+    states['collaboration_mean'] = means['collaboration_community']
+    states['economic_mean'] = means['economic_activity']
+
+    # State × domain mean skill and profile counts, domains sorted alphabetically
+    # so idxmax breaks ties like the endpoints did: groupby('domain') sorts its
+    # keys, and value_counts() on the categorical domain column orders tied
+    # counts by category (alphabetical) order
+    by_domain = skill.groupby([df['state'], df['domain']], sort=False, observed=True).agg(['mean', 'size'])
+    domain_means = by_domain['mean'].unstack('domain').sort_index(axis=1).reindex(states.index)
+    domain_counts = by_domain['size'].unstack('domain', fill_value=0).sort_index(axis=1).reindex(states.index)
+
+    states['dominant_domain'] = domain_counts.idxmax(axis=1)
+    states['top_domain'] = domain_means.idxmax(axis=1)
+    states['top_domain_avg_skill'] = domain_means.max(axis=1)
+    states.index = states.index.astype(str)
+    states.index.name = 'state'
+
+    return {'states': states, 'rows': len(df)}
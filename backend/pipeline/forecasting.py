@@ -0,0 +1,258 @@
+"""
+pipeline/forecasting.py – Batched Trend & Forecast Engine
+SkillGenome X
+
+Fits two closed-form trend models to every profile's skill history at once
+(the dense matrix from pipeline/skill_history.py):
+
+- linear: weighted least squares over the observed months
+- damped_trend: Holt's additive damped-trend exponential smoothing, with
+  (alpha, beta) chosen per profile from a small grid by in-sample SSE
+
+Per-profile projections (mean and forecast variance) for each horizon are then
+aggregated per domain, per state and per state × domain. Results are cached
+per dataset version, so repeat /api/forecast calls cost no compute.
+"""
+import time
+import threading
+import numpy as np
+import pandas as pd
+
+HORIZONS = (3, 6, 12)
+MIN_MONTHS = 3                      # profiles with fewer observed months are not forecast
+HOLT_ALPHAS = (0.2, 0.5, 0.8)
+HOLT_BETAS = (0.05, 0.2)
+HOLT_DAMPING = 0.9
+CHUNK_ROWS = 8192                   # keeps the Holt working set (grid × rows) cache-resident
+Z_95 = 1.96
+
+METHODS = ('damped_trend', 'linear')
+LEVELS = ('domain', 'state', 'state_domain')
+
+# (dataset version, forecasts), replaced as one tuple
+_CACHE = (None, None)
+_CACHE_LOCK = threading.Lock()
+
+
+def _length_groups(history: dict):
+    """
+    Yield (length, row indices) for each distinct history length >= MIN_MONTHS.
+
+    Histories are right-aligned and contiguous, so rows sharing a length share
+    the same month columns and can be fitted without any per-cell masking.
+    """
+    lengths = history['lengths'].astype(np.int64)
+    for length in np.unique(lengths):
+        if length >= MIN_MONTHS:
+            yield int(length), np.flatnonzero(lengths == length)
+
+
+def fit_linear(history: dict, horizons=HORIZONS) -> dict:
+    """
+    Least-squares line per profile over its observed months.
+
+    Returns:
+        dict with slope (per month), mean/var arrays (n × len(horizons)) and
+        a `valid` mask for profiles with at least MIN_MONTHS observations.
+    """
+    values = history['values']
+    n, months = values.shape
+    out = {
+        'slope': np.zeros(n), 'mean': np.zeros((n, len(horizons))), 'var': np.zeros((n, len(horizons))),
+        'valid': history['lengths'] >= MIN_MONTHS
+    }
+    for length, idx in _length_groups(history):
+        y = values[idx, months - length:].astype(np.float64)
+        t = np.arange(length, dtype=np.float64)
+        tc = t - t.mean()
+        sxx = float(tc @ tc)
+
+        ybar = y.mean(axis=1)
+        slope = (y @ tc) / sxx
+        resid = y - ybar[:, None] - slope[:, None] * tc[None, :]
+        sigma2 = np.einsum('ij,ij->i', resid, resid) / max(length - 2, 1)
+
+        # Horizon h lands h months after the last observation
+        hc = (length - 1 - t.mean()) + np.asarray(horizons, dtype=np.float64)
+        out['slope'][idx] = slope
+        out['mean'][idx] = ybar[:, None] + slope[:, None] * hc[None, :]
+        out['var'][idx] = sigma2[:, None] * (1 + 1 / length + hc[None, :] ** 2 / sxx)
+    return out
+
+
+def _holt_chunk(y, alphas, betas, phi, horizons):
+    """Damped-trend recursion for a block of equal-length rows, all grid parameters at once."""
+    rows, length = y.shape
+    a = np.repeat(np.asarray(alphas, dtype=np.float64), len(betas))[:, None]
+    b = np.tile(np.asarray(betas, dtype=np.float64), len(alphas))[:, None]
+    ab = a * b
+
+    # Level from the first two observations, trend from their difference
+    level = np.repeat(y[None, :, 1], len(a), axis=0)
+    trend = np.repeat((y[:, 1] - y[:, 0])[None, :], len(a), axis=0)
+    sse = np.zeros_like(level)
+    err = np.empty_like(level)
+
+    for t in range(2, length):
+        # one-step forecast = level + phi·trend; error-correction update
+        level += phi * trend
+        np.subtract(y[None, :, t], level, out=err)
+        sse += err * err
+        level += a * err
+        trend *= phi
+        trend += ab * err
+
+    # Best (alpha, beta) per row
+    best = np.argmin(sse, axis=0)
+    cols = np.arange(rows)
+    level, trend, sse = level[best, cols], trend[best, cols], sse[best, cols]
+    alpha, beta = a[best, 0], b[best, 0]
+    sigma2 = sse / max(length - 2, 1)
+
+    mean = np.empty((rows, len(horizons)))
+    var = np.empty((rows, len(horizons)))
+    for k, h in enumerate(horizons):
+        mean[:, k] = level + phi * (1 - phi ** h) / (1 - phi) * trend
+        j = np.arange(1, h)
+        c = alpha[:, None] * (1 + beta[:, None] * phi * (1 - phi ** j[None, :]) / (1 - phi))
+        var[:, k] = sigma2 * (1 + (c * c).sum(axis=1))
+    return mean, var, trend, alpha, beta
+
+
+def fit_damped_trend(history: dict, horizons=HORIZONS, alphas=HOLT_ALPHAS,
+                     betas=HOLT_BETAS, phi=HOLT_DAMPING) -> dict:
+    """
+    Holt damped-trend model per profile, vectorized across rows.
+
+    Returns:
+        dict with trend (per month), alpha, beta, mean/var arrays
+        (n × len(horizons)) and a `valid` mask.
+    """
+    values = history['values']
+    n, months = values.shape
+    out = {
+        'mean': np.zeros((n, len(horizons))), 'var': np.zeros((n, len(horizons))),
+        'trend': np.zeros(n), 'alpha': np.zeros(n), 'beta': np.zeros(n),
+        'valid': history['lengths'] >= MIN_MONTHS
+    }
+    for length, idx in _length_groups(history):
+        for start in range(0, len(idx), CHUNK_ROWS):
+            rows = idx[start:start + CHUNK_ROWS]
+            y = values[rows, months - length:].astype(np.float64)
+            mean, var, trend, alpha, beta = _holt_chunk(y, alphas, betas, phi, horizons)
+            out['mean'][rows], out['var'][rows] = mean, var
+            out['trend'][rows], out['alpha'][rows], out['beta'][rows] = trend, alpha, beta
+    return out
+
+
+def _aggregate(codes, n_groups, valid, current, velocity, mean, var):
+    """Per-group averages of the per-profile fit (bincount over group codes)."""
+    keep = valid & (codes >= 0)
+    idx = codes[keep]
+    counts = np.bincount(idx, minlength=n_groups)
+    denom = np.maximum(counts, 1)
+
+    def avg(values):
+        return np.bincount(idx, weights=values[keep], minlength=n_groups) / denom
+
+    result = {
+        'profiles': counts,
+        'current': avg(current),
+        'velocity': avg(velocity),
+        'forecast': np.column_stack([avg(mean[:, k]) for k in range(mean.shape[1])]),
+        # Individual-level 95% band: mean forecast ± z · sqrt(mean forecast variance)
+        'spread': Z_95 * np.sqrt(np.column_stack([avg(var[:, k]) for k in range(var.shape[1])]))
+    }
+    return result
+
+
+def _format(labels, agg, horizons):
+    """Turn aggregated arrays into {label: {...}} JSON-ready dicts."""
+    out = {}
+    for g, label in enumerate(labels):
+        if agg['profiles'][g] == 0:
+            continue
+        projections = {}
+        for k, h in enumerate(horizons):
+            fc = float(agg['forecast'][g, k])
+            spread = float(agg['spread'][g, k])
+            projections[f"{h}m"] = {
+                'forecast': round(min(100.0, max(0.0, fc)), 1),
+                'lower': round(min(100.0, max(0.0, fc - spread)), 1),
+                'upper': round(min(100.0, max(0.0, fc + spread)), 1)
+            }
+        out[label] = {
+            'profiles': int(agg['profiles'][g]),
+            'current': round(float(agg['current'][g]), 1),
+            'velocity': float(agg['velocity'][g]),
+            'projections': projections
+        }
+    return out
+
+
+def build_forecasts(history: dict, states: pd.Series, domains: pd.Series, horizons=HORIZONS) -> dict:
+    """
+    Fit both models to every profile and aggregate per domain, state and state × domain.
+
+    Returns:
+        dict: method → level → label → {profiles, current, velocity (per month),
+        projections: {'3m': {forecast, lower, upper}, ...}}. State × domain
+        labels are (state, domain) tuples.
+    """
+    start = time.time()
+    current = history['values'][:, -1].astype(np.float64)
+
+    fits = {
+        'linear': fit_linear(history, horizons),
+        'damped_trend': fit_damped_trend(history, horizons)
+    }
+    velocity = {'linear': fits['linear']['slope'], 'damped_trend': fits['damped_trend']['trend']}
+
+    state_codes, state_labels = pd.factorize(states, sort=False)
+    domain_codes, domain_labels = pd.factorize(domains, sort=False)
+    pair = np.where((state_codes >= 0) & (domain_codes >= 0),
+                    state_codes.astype(np.int64) * max(len(domain_labels), 1) + domain_codes, -1)
+    pair_codes, pair_values = pd.factorize(pair, sort=False)
+    pair_codes = np.where(pair >= 0, pair_codes, -1)
+    pair_labels = [
+        (str(state_labels[v // max(len(domain_labels), 1)]), str(domain_labels[v % max(len(domain_labels), 1)]))
+        if v >= 0 else None
+        for v in pair_values
+    ]
+
+    groupings = {
+        'domain': (domain_codes, [str(d) for d in domain_labels]),
+        'state': (state_codes, [str(s) for s in state_labels]),
+        'state_domain': (pair_codes, pair_labels)
+    }
+
+    result = {'methods': {}, 'horizons': list(horizons)}
+    for method, fit in fits.items():
+        result['methods'][method] = {}
+        for level, (codes, labels) in groupings.items():
+            agg = _aggregate(codes, len(labels), fit['valid'], current, velocity[method], fit['mean'], fit['var'])
+            result['methods'][method][level] = _format(labels, agg, horizons)
+
+    result['profiles_fitted'] = int(fits['linear']['valid'].sum())
+    result['fit_seconds'] = round(time.time() - start, 3)
+    print(f"[pipeline/forecasting] Fitted {result['profiles_fitted']} histories in {result['fit_seconds']}s")
+    return result
+
+
+def get_forecasts(version, history: dict, states: pd.Series, domains: pd.Series) -> dict:
+    """
+    Forecasts for a dataset version, fitted on first use and cached until the version changes.
+
+    Concurrent first requests fit once: the others wait on the lock and
+    reuse the result.
+    """
+    global _CACHE
+    cached_version, result = _CACHE
+    if cached_version == version and result is not None:
+        return result
+    with _CACHE_LOCK:
+        cached_version, result = _CACHE
+        if cached_version != version or result is None:
+            result = build_forecasts(history, states, domains)
+            _CACHE = (version, result)
+        return result
@@ -0,0 +1,234 @@
+"""
+pipeline/hyperparameter_search.py – Time-Budgeted Successive-Halving Search
+SkillGenome X
+
+Instead of training each candidate once with fixed hyperparameters, many
+random configurations (GradientBoosting, HistGradientBoosting, RandomForest)
+are first fitted on a small subset of the training rows. After every rung
+only the best 1/ETA by validation R² are promoted to ETA× as many rows,
+until the survivors see the whole fitting split:
+
+    27 configs × n/9 rows → 9 × n/3 → 3 × n
+
+Fits run in a process pool, one single-threaded fit per core. The search
+stops at a wall-clock budget, REFIT_RESERVE of which is kept back for the
+final refit: the pool is terminated and, among the configurations of the
+highest rung reached, the best one whose refit fits the remaining time wins
+(its measured fit time scaled to the full row count). The winner is refit on
+the full training split and scored on the test split like compare_models;
+any overrun of the budget is reported.
+"""
+import math
+import time
+import multiprocessing
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, HistGradientBoostingRegressor
+from sklearn.model_selection import train_test_split as sklearn_split
+from sklearn.metrics import r2_score
+from threadpoolctl import threadpool_limits
+
+from ml.model_training import fit_candidate
+from ml.model_manager import feature_importances
+
+N_CONFIGS = 27
+ETA = 3                              # keep the best 1/ETA per rung, ETA× rows for the next
+MIN_RUNG_ROWS = 200
+VALIDATION_FRACTION = 0.2            # of the training split; the test split is only used for the winner
+TIME_BUDGET_S = 60.0
+REFIT_RESERVE = 0.2                  # share of the budget kept for refitting the winner
+
+NAMES = {'gradient_boosting': 'GradientBoosting', 'hist_gradient_boosting': 'HistGradientBoosting',
+         'random_forest': 'RandomForest'}
+# family → param → (low, high, kind); 'log' = log-uniform float, 'int' / 'float' = uniform
+SEARCH_SPACE = {
+    'gradient_boosting': {'n_estimators': (50, 400, 'int'), 'learning_rate': (0.02, 0.3, 'log'),
+                          'max_depth': (2, 6, 'int'), 'subsample': (0.6, 1.0, 'float')},
+    'hist_gradient_boosting': {'max_iter': (50, 500, 'int'), 'learning_rate': (0.02, 0.3, 'log'),
+                               'max_depth': (2, 8, 'int'), 'l2_regularization': (0.0, 1.0, 'float')},
+    'random_forest': {'n_estimators': (50, 300, 'int'), 'max_depth': (4, 16, 'int'),
+                      'min_samples_leaf': (1, 10, 'int')},
+}
+
+
+def sample_configs(n, seed=0):
+    """n random configurations ({'model', 'params'}), families taken in turn."""
+    rng = np.random.default_rng(seed)
+    families = list(SEARCH_SPACE)
+    configs = []
+    for i in range(n):
+        family = families[i % len(families)]
+        params = {}
+        for name, (low, high, kind) in SEARCH_SPACE[family].items():
+            if kind == 'int':
+                params[name] = int(rng.integers(low, high + 1))
+            elif kind == 'log':
+                params[name] = round(float(np.exp(rng.uniform(np.log(low), np.log(high)))), 4)
+            else:
+                params[name] = round(float(rng.uniform(low, high)), 3)
+        configs.append({'model': family, 'params': params})
+    return configs
+
+
+def build_model(config, random_state=42):
+    """Unfitted estimator for a configuration."""
+    params = config['params']
+    if config['model'] == 'hist_gradient_boosting':
+        return HistGradientBoostingRegressor(**params, early_stopping='auto', random_state=random_state)
+    if config['model'] == 'random_forest':
+        return RandomForestRegressor(**params, random_state=random_state)
+    return GradientBoostingRegressor(**params, random_state=random_state)
+
+
+def rung_rows(n_rows, n_configs=N_CONFIGS, eta=ETA, min_rows=MIN_RUNG_ROWS):
+    """Training rows per rung; the last rung uses all n_rows."""
+    n_rungs = max(1, int(math.log(max(1, n_configs), eta) + 1e-9))
+    return [max(min(n_rows, min_rows), int(n_rows / eta ** (n_rungs - 1 - i))) for i in range(n_rungs)]
+
+
+# Fitting/validation data of a pool worker process, set once by the pool initializer
+_WORKER_DATA = None
+
+
+def _init_worker(data):
+    global _WORKER_DATA
+    _WORKER_DATA = data
+
+
+def _evaluate(config_id, config, rows, random_state):
+    """Fit a config on the first `rows` fitting rows (single-threaded); returns (id, validation R², seconds)."""
+    X_fit, y_fit, X_val, y_val = _WORKER_DATA
+    start = time.perf_counter()
+    model = build_model(config, random_state)
+    with threadpool_limits(limits=1):
+        model.fit(X_fit[:rows], y_fit[:rows])
+        r2 = float(r2_score(y_val, model.predict(X_val)))
+    return config_id, r2, time.perf_counter() - start
+
+
+def choose_refit(scores, leaderboard, n_rows, remaining_s):
+    """
+    Configuration to refit on n_rows rows within remaining_s.
+
+    Each config's refit time is estimated from its fit on the largest rung
+    it reached, scaled linearly to n_rows. The best by validation R² whose
+    estimate fits wins; if none does, the fastest.
+
+    Returns:
+        (config_id, estimated refit seconds)
+    """
+    estimates = {}
+    for entry in leaderboard:
+        cid = entry['config_id']
+        if cid in scores and entry['rows'] >= estimates.get(cid, (0, 0))[0]:
+            estimates[cid] = (entry['rows'], entry['fit_seconds'] * n_rows / max(1, entry['rows']))
+    ranked = sorted(scores, key=lambda c: (-scores[c], c))
+    for cid in ranked:
+        if estimates[cid][1] <= remaining_s:
+            return cid, estimates[cid][1]
+    cid = min(ranked, key=lambda c: estimates[c][1])
+    return cid, estimates[cid][1]
+
+
+def search_models(X_train, y_train, X_test, y_test, time_budget_s=TIME_BUDGET_S, n_configs=N_CONFIGS,
+                  n_workers=None, random_state=42, progress=None):
+    """
+    Successive-halving search + refit and test of the winner within time_budget_s.
+
+    progress, if given, is called as progress(step, done, total) before each
+    rung ('rung 1/3') and before the refit ('refit').
+
+    Returns:
+        compare_models-shaped dict (best_model_name, best_model_key, best_model,
+        best_metrics, all_models, all_metrics, feature_importances, trained_models,
+        parallelism) plus 'search': best_config, leaderboard (every evaluation,
+        best first), rungs, evaluated, stopped_by_budget, elapsed_seconds (of
+        the search), refit_estimate_seconds, refit_seconds, total_seconds and
+        overrun_seconds (past time_budget_s, 0 when within).
+    """
+    start = time.perf_counter()
+    budget_end = start + float(time_budget_s)
+    deadline = start + float(time_budget_s) * (1 - REFIT_RESERVE)
+    n_workers = max(1, int(n_workers or multiprocessing.cpu_count() or 1))
+    X_fit, X_val, y_fit, y_val = sklearn_split(np.asarray(X_train, dtype=np.float64), np.asarray(y_train, dtype=np.float64),
+                                               test_size=VALIDATION_FRACTION, random_state=random_state)
+    configs = sample_configs(n_configs, seed=random_state)
+    rungs = rung_rows(len(X_fit), n_configs)
+    alive = list(range(len(configs)))
+    leaderboard, best_rung, stopped = [], {}, False
+    print(f"[pipeline/hyperparameter_search] {len(configs)} configs, rungs {rungs} rows, "
+          f"{n_workers} processes, budget {time_budget_s}s")
+
+    pool = multiprocessing.get_context('spawn').Pool(min(n_workers, len(configs)), initializer=_init_worker,
+                                                     initargs=((X_fit, y_fit, X_val, y_val),))
+    try:
+        for rung, rows in enumerate(rungs):
+            if progress:
+                progress(f"rung {rung + 1}/{len(rungs)}", rung, len(rungs) + 1)
+            pending = [pool.apply_async(_evaluate, (cid, configs[cid], rows, random_state)) for cid in alive]
+            scores = {}
+            for result in pending:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining <= 0:
+                        raise multiprocessing.TimeoutError
+                    cid, r2, seconds = result.get(timeout=remaining)
+                except multiprocessing.TimeoutError:
+                    stopped = True
+                    break
+                except Exception as e:          # a config the estimator rejects drops out
+                    print(f"[pipeline/hyperparameter_search] Config failed: {e}")
+                    continue
+                scores[cid] = r2
+                leaderboard.append({'config_id': cid, **configs[cid], 'rung': rung, 'rows': rows,
+                                    'val_r2': round(r2, 4), 'fit_seconds': round(seconds, 3)})
+            if scores:
+                best_rung = scores
+            if stopped or not scores:
+                break
+            alive = sorted(scores, key=lambda c: (-scores[c], c))[:max(1, math.ceil(len(scores) / ETA))]
+    finally:
+        pool.terminate()
+        pool.join()
+    search_seconds = time.perf_counter() - start
+
+    estimate = None
+    if best_rung:
+        winner, estimate = choose_refit(best_rung, leaderboard, len(X_train), budget_end - time.perf_counter())
+        best_config = {**configs[winner], 'config_id': winner, 'val_r2': round(best_rung[winner], 4),
+                       'rows': max(e['rows'] for e in leaderboard if e['config_id'] == winner)}
+    else:
+        # Budget ran out before any fit finished: the default GradientBoosting
+        best_config = {'model': 'gradient_boosting', 'config_id': None, 'val_r2': None, 'rows': 0,
+                       'params': {'n_estimators': 100, 'learning_rate': 0.1, 'max_depth': 3}}
+    print(f"[pipeline/hyperparameter_search] Best after {search_seconds:.1f}s: {NAMES[best_config['model']]} "
+          f"{best_config['params']} (val R²={best_config['val_r2']}){' – stopped by budget' if stopped else ''}")
+
+    key = best_config['model']
+    if progress:
+        progress('refit', len(rungs), len(rungs) + 1)
+    refit_start = time.perf_counter()
+    model, metrics = fit_candidate(build_model(best_config, random_state), X_train, y_train, X_test, y_test,
+                                    threads=n_workers)
+    total_seconds = time.perf_counter() - start
+    overrun = max(0.0, total_seconds - float(time_budget_s))
+    if overrun > 0:
+        print(f"[pipeline/hyperparameter_search] Budget of {time_budget_s}s overrun by {overrun:.1f}s "
+              f"(refit {time.perf_counter() - refit_start:.1f}s, estimated "
+              f"{'n/a' if estimate is None else f'{estimate:.1f}s'})")
+    leaderboard.sort(key=lambda e: (-e['rung'], -e['val_r2'], e['config_id']))
+    return {
+        'best_model_name': NAMES[key], 'best_model_key': key,
+        'best_model': model, 'best_metrics': metrics,
+        'all_models': {key: metrics['r2_score']}, 'all_metrics': {key: metrics},
+        'feature_importances': feature_importances(model, X_train.columns), 'trained_models': {key: model},
+        'parallelism': {'processes': min(n_workers, len(configs)), 'threads': 1,
+                        'wall_seconds': round(total_seconds, 3)},
+        'search': {
+            'best_config': best_config, 'leaderboard': leaderboard, 'rungs': rungs,
+            'evaluated': len(leaderboard), 'n_configs': len(configs), 'time_budget_s': float(time_budget_s),
+            'stopped_by_budget': stopped, 'elapsed_seconds': round(search_seconds, 3),
+            'refit_estimate_seconds': None if estimate is None else round(estimate, 3),
+            'refit_seconds': round(total_seconds - (refit_start - start), 3),
+            'total_seconds': round(total_seconds, 3), 'overrun_seconds': round(overrun, 3)
+        }
+    }
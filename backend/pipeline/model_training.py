@@ -2,13 +2,19 @@
 pipeline/model_training.py – Model Training, Comparison & Evaluation
 SkillGenome X
 """
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import pandas as pd
 from sklearn.linear_model import LinearRegression
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor, IsolationForest
 from sklearn.model_selection import train_test_split as sklearn_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
+# Candidate fitting and the CPU budget are shared with the ml/ pipeline
+from ml.model_training import PARALLEL_MIN_ROWS, hist_gradient_boosting, fit_candidate, worker_budget
+from ml.model_manager import feature_importances
+
 
 def split_data(X, y, test_size=0.2, random_state=42):
     """Split into train/test sets."""
@@ -18,60 +24,76 @@ def split_data(X, y, test_size=0.2, random_state=42):
 
 
 def compare_models(X_train, y_train, X_test, y_test,
-                   n_estimators=100, learning_rate=0.1, max_depth=3, random_state=42):
+                   n_estimators=100, learning_rate=0.1, max_depth=3, random_state=42,
+                   n_workers=None, parallel_min_rows=PARALLEL_MIN_ROWS):
     """
-    Train LinearRegression, RandomForest, GradientBoosting.
+    Train LinearRegression, RandomForest, GradientBoosting, HistGradientBoosting.
     Evaluate each (R², MAE, RMSE). Auto-select best by R².
+    Candidates fit concurrently in a process pool when the worker budget and
+    data size allow (same models and metrics as sequential); RF and HistGB share the spare cores.
     """
     candidates = {
         'linear': LinearRegression(),
         'random_forest': RandomForestRegressor(n_estimators=n_estimators, max_depth=max_depth, random_state=random_state),
-        'gradient_boosting': GradientBoostingRegressor(n_estimators=n_estimators, learning_rate=learning_rate, max_depth=max_depth, random_state=random_state)
+        'gradient_boosting': GradientBoostingRegressor(n_estimators=n_estimators, learning_rate=learning_rate, max_depth=max_depth, random_state=random_state),
+        'hist_gradient_boosting': hist_gradient_boosting(n_estimators, learning_rate, max_depth, random_state)
     }
-    names = {'linear': 'LinearRegression', 'random_forest': 'RandomForest', 'gradient_boosting': 'GradientBoosting'}
+    names = {'linear': 'LinearRegression', 'random_forest': 'RandomForest', 'gradient_boosting': 'GradientBoosting',
+             'hist_gradient_boosting': 'HistGradientBoosting'}
+    threaded = {'random_forest', 'hist_gradient_boosting'}
     results, trained = {}, {}
+    start = time.perf_counter()
+    processes, threads = worker_budget(n_workers, len(candidates), len(threaded), len(X_train), parallel_min_rows)
+    budget = {k: threads if k in threaded else 1 for k in candidates}
+
+    if processes:
+        print(f"[pipeline/model_training] Training {len(candidates)} candidates in {processes} processes (RF/HistGB threads={threads})...")
+        with ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+            futures = {k: pool.submit(fit_candidate, m, X_train, y_train, X_test, y_test, budget[k])
+                       for k, m in candidates.items()}
+            fitted = {k: f.result() for k, f in futures.items()}
+    else:
+        fitted = {}
+        for key, model in candidates.items():
+            print(f"[pipeline/model_training] Training {names[key]}...")
+            fitted[key] = fit_candidate(model, X_train, y_train, X_test, y_test, budget[key])
 
-    for key, model in candidates.items():
-        print(f"[pipeline/model_training] Training {names[key]}...")
-        model.fit(X_train, y_train)
-        trained[key] = model
-        y_pred = model.predict(X_test)
-        results[key] = {
-            'r2_score': round(r2_score(y_test, y_pred), 4),
-            'mae': round(mean_absolute_error(y_test, y_pred), 2),
-            'rmse': round(float(np.sqrt(mean_squared_error(y_test, y_pred))), 2),
-            'accuracy_pct': round(r2_score(y_test, y_pred) * 100, 1)
-        }
-        print(f"[pipeline/model_training]   {names[key]}: R²={results[key]['r2_score']}, MAE={results[key]['mae']}")
+    for key, (model, metrics) in fitted.items():
+        trained[key], results[key] = model, metrics
+        print(f"[pipeline/model_training]   {names[key]}: R²={metrics['r2_score']}, MAE={metrics['mae']} "
+              f"({metrics['fit_seconds']}s wall, {metrics['cpu_seconds']}s CPU)")
 
     best_key = max(results, key=lambda k: results[k]['r2_score'])
     best = trained[best_key]
-    importances = {}
-    if hasattr(best, 'feature_importances_'):
-        importances = dict(zip(X_train.columns, [round(float(v), 4) for v in best.feature_importances_]))
-    elif hasattr(best, 'coef_'):
-        importances = dict(zip(X_train.columns, [round(float(v), 4) for v in best.coef_]))
+    importances = feature_importances(best, X_train.columns)
 
     print(f"[pipeline/model_training] ★ Best: {names[best_key]} (R²={results[best_key]['r2_score']})")
     return {
         'best_model_name': names[best_key], 'best_model_key': best_key,
         'best_model': best, 'best_metrics': results[best_key],
         'all_models': {k: results[k]['r2_score'] for k in results},
-        'all_metrics': results, 'feature_importances': importances, 'trained_models': trained
+        'all_metrics': results, 'feature_importances': importances, 'trained_models': trained,
+        'parallelism': {'processes': processes, 'threads': threads,
+                        'wall_seconds': round(time.perf_counter() - start, 3)}
     }
 
 
 def train_model(X_train, y_train, n_estimators=100, learning_rate=0.1,
-                max_depth=3, random_state=42, train_anomaly=True, X_full=None):
-    """Train GBR + optional IsolationForest (used for startup)."""
-    gbr = GradientBoostingRegressor(n_estimators=n_estimators, learning_rate=learning_rate,
-                                    max_depth=max_depth, random_state=random_state)
+                max_depth=3, random_state=42, train_anomaly=True, X_full=None,
+                anomaly_max_samples='auto', hist_min_rows=None):
+    """Train GBR (HistGradientBoosting from hist_min_rows rows) + optional IsolationForest (used for startup)."""
+    if hist_min_rows is not None and len(X_train) >= hist_min_rows:
+        gbr = hist_gradient_boosting(n_estimators, learning_rate, max_depth, random_state)
+    else:
+        gbr = GradientBoostingRegressor(n_estimators=n_estimators, learning_rate=learning_rate,
+                                        max_depth=max_depth, random_state=random_state)
     gbr.fit(X_train, y_train)
-    importances = dict(zip(X_train.columns, [round(float(v), 4) for v in gbr.feature_importances_]))
+    importances = feature_importances(gbr, X_train.columns)
 
     anomaly_model = None
     if train_anomaly:
-        iso = IsolationForest(contamination=0.03, random_state=random_state)
+        iso = IsolationForest(contamination=0.03, max_samples=anomaly_max_samples,
+                              random_state=random_state)
         iso.fit(X_full if X_full is not None else X_train)
         anomaly_model = iso
 
@@ -89,6 +89,30 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+CATEGORICAL_COLUMNS = ['state', 'domain', 'area_type', 'digital_access', 'opportunity_level']
+
+
+def compact_dtypes(df: pd.DataFrame, categorical_columns: list = None) -> pd.DataFrame:
+    """Categorical text columns, smallest int for integral numerics, float32 otherwise; reports bytes saved."""
+    if categorical_columns is None:
+        categorical_columns = CATEGORICAL_COLUMNS
+    before = int(df.memory_usage(deep=True).sum())
+    for col in categorical_columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    for col in df.select_dtypes(include='number').columns:
+        if pd.api.types.is_bool_dtype(df[col]):
+            continue
+        values = df[col].to_numpy()
+        if pd.api.types.is_integer_dtype(df[col]) or (np.isfinite(values).all() and (values == np.round(values)).all()):
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        else:
+            df[col] = df[col].astype(np.float32)
+    after = int(df.memory_usage(deep=True).sum())
+    print(f"[pipeline/preprocessing] Compacted: {before / 1e6:.1f} MB → {after / 1e6:.1f} MB (saved {(before - after) / 1e6:.1f} MB)")
+    return df
+
+
 def normalize_features(df: pd.DataFrame, columns: list = None) -> pd.DataFrame:
     """Min-max normalize numeric columns to 0-100."""
     if columns is None:
@@ -1,5 +1,12 @@
 # Services Layer
+from lazy_exports import lazy_exports
 from services.prediction_service import PredictionService
-from services.training_service import TrainingService
+from services.batch_prediction import BatchPredictionService
 
-__all__ = ['PredictionService', 'TrainingService']
+# TrainingService resolves on first access (PEP 562), so the serving path
+# does not import the training modules and scikit-learn.
+_LAZY = {'TrainingService': 'services.training_service'}
+
+__all__ = ['PredictionService', 'BatchPredictionService', 'TrainingService']
+
+__getattr__, __dir__ = lazy_exports(__name__, _LAZY)
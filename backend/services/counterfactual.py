@@ -0,0 +1,272 @@
+"""
+services/counterfactual.py – "What Gets Me to the Next Level" Search
+SkillGenome X
+
+Finds the smallest-effort change of a profile's signals that moves its
+/api/predict level up (Intermediate → Advanced at score > 60, Advanced →
+Expert at score > 80).
+
+Candidates are perturbations of the mutable base signals, generated as one
+integer delta matrix:
+
+- every single-signal move within its allowed range, and all signals at
+  their limit,
+- every pair of signals on a coarse grid of moves,
+- random sparse moves of 2–4 signals (seeded, so answers are reproducible),
+
+then refined by shrinking each changed signal of the cheapest crossing
+candidates. Each round is one feature-matrix build and one model `predict`
+call for all candidates; nothing is scored row by row.
+
+Effort is Σ cost × |delta| over the changed signals. Signals that can't
+change quickly get a small step limit and a high cost per point
+(ACTIONABILITY); callers can tighten or widen these per request.
+"""
+import time
+import numpy as np
+
+from ml.data_loader import FEATURE_COLUMNS
+from ml.feature_spec import compile_feature_spec
+from services.batch_prediction import COMPILED_MAX_ROWS
+
+# (level, score it must exceed), lowest first – same cut-offs as /api/predict
+LEVELS = [('Intermediate', None), ('Advanced', 60), ('Expert', 80)]
+
+SIGNAL_MIN, SIGNAL_MAX = 0, 100
+
+# Per signal: largest increase / decrease considered and effort per point
+ACTIONABILITY = {
+    'creation_output':            {'max_increase': 30, 'max_decrease': 0, 'cost': 1.0},
+    'learning_behavior':          {'max_increase': 30, 'max_decrease': 0, 'cost': 1.0},
+    'experience_consistency':     {'max_increase': 5,  'max_decrease': 0, 'cost': 3.0},   # builds up over years
+    'economic_activity':          {'max_increase': 20, 'max_decrease': 0, 'cost': 1.5},
+    'innovation_problem_solving': {'max_increase': 25, 'max_decrease': 0, 'cost': 1.2},
+    'collaboration_community':    {'max_increase': 30, 'max_decrease': 0, 'cost': 0.8},
+    'offline_capability':         {'max_increase': 15, 'max_decrease': 0, 'cost': 2.0},
+    'digital_presence':           {'max_increase': 40, 'max_decrease': 0, 'cost': 0.5},
+    'learning_hours':             {'max_increase': 40, 'max_decrease': 0, 'cost': 0.5},
+    'projects':                   {'max_increase': 30, 'max_decrease': 0, 'cost': 1.0},
+}
+
+PAIR_LEVELS = 6            # grid moves per direction for two-signal candidates
+RANDOM_CANDIDATES = 2048
+REFINE_TOP = 16            # cheapest crossing candidates shrunk per refinement round
+REFINE_ROUNDS = 3
+ALTERNATIVES = 3
+
+
+def level_of(score: float) -> str:
+    level = LEVELS[0][0]
+    for name, threshold in LEVELS[1:]:
+        if score > threshold:
+            level = name
+    return level
+
+
+def _limits(base: np.ndarray, constraints: dict):
+    """Per-signal allowed (down, up) deltas and cost after bounds and overrides."""
+    down = np.zeros(len(FEATURE_COLUMNS), dtype=np.int64)
+    up = np.zeros(len(FEATURE_COLUMNS), dtype=np.int64)
+    cost = np.ones(len(FEATURE_COLUMNS))
+    for j, name in enumerate(FEATURE_COLUMNS):
+        rule = {**ACTIONABILITY.get(name, {}), **(constraints.get(name) or {})}
+        cost[j] = float(rule.get('cost', 1.0))
+        if rule.get('mutable', True) is False or cost[j] <= 0:
+            continue
+        lo = max(SIGNAL_MIN, float(rule.get('min', SIGNAL_MIN)))
+        hi = min(SIGNAL_MAX, float(rule.get('max', SIGNAL_MAX)))
+        up[j] = max(0, min(int(rule.get('max_increase', 0)), int(np.floor(hi - base[j]))))
+        down[j] = max(0, min(int(rule.get('max_decrease', 0)), int(np.floor(base[j] - lo))))
+    return down, up, cost
+
+
+def _grid(down: int, up: int, levels: int) -> np.ndarray:
+    """Non-zero moves on a coarse grid within [-down, up]."""
+    moves = [np.rint(np.linspace(0, side, levels + 1)[1:]) * sign
+             for side, sign in ((up, 1), (down, -1)) if side > 0]
+    return np.unique(np.concatenate(moves)).astype(np.int64) if moves else np.zeros(0, dtype=np.int64)
+
+
+def _candidates(down: np.ndarray, up: np.ndarray, rng) -> np.ndarray:
+    """Initial (m × signals) integer delta matrix."""
+    F = len(down)
+    mutable = np.flatnonzero((down > 0) | (up > 0))
+    # Current profile and every signal at its limit (the most the bounds allow)
+    blocks = [np.zeros((1, F), dtype=np.int64), up[None, :].astype(np.int64)]
+
+    for j in mutable.tolist():
+        moves = np.concatenate([np.arange(-down[j], 0), np.arange(1, up[j] + 1)])
+        block = np.zeros((len(moves), F), dtype=np.int64)
+        block[:, j] = moves
+        blocks.append(block)
+
+    grids = {j: _grid(down[j], up[j], PAIR_LEVELS) for j in mutable.tolist()}
+    for a in range(len(mutable)):
+        for b in range(a + 1, len(mutable)):
+            i, j = mutable[a], mutable[b]
+            gi, gj = np.meshgrid(grids[i], grids[j], indexing='ij')
+            block = np.zeros((gi.size, F), dtype=np.int64)
+            block[:, i], block[:, j] = gi.ravel(), gj.ravel()
+            blocks.append(block)
+
+    if len(mutable) >= 2:
+        n = RANDOM_CANDIDATES
+        width = rng.integers(2, min(4, len(mutable)) + 1, n)
+        # A random subset of `width` signals per row: the `width` smallest random keys
+        keys = rng.random((n, len(mutable)))
+        chosen = np.argsort(np.argsort(keys, axis=1), axis=1) < width[:, None]
+        lo, hi = -down[mutable], up[mutable]
+        moves = np.rint(lo + rng.random((n, len(mutable))) * (hi - lo)).astype(np.int64)
+        block = np.zeros((n, F), dtype=np.int64)
+        block[:, mutable] = np.where(chosen, moves, 0)
+        blocks.append(block)
+    return np.vstack(blocks)
+
+
+def _shrunk(deltas: np.ndarray) -> np.ndarray:
+    """Every candidate with one changed signal moved closer to its current value."""
+    blocks = []
+    for row in deltas:
+        for j in np.flatnonzero(row).tolist():
+            steps = np.arange(abs(int(row[j])))                 # 0 .. |delta| − 1
+            block = np.repeat(row[None, :], len(steps), axis=0)
+            block[:, j] = np.sign(row[j]) * steps
+            blocks.append(block)
+    return np.vstack(blocks) if blocks else deltas[:0]
+
+
+class CounterfactualService:
+    """Stateless service searching minimal signal changes with the active model."""
+
+    @staticmethod
+    def _predict(model_state: dict, X: np.ndarray) -> np.ndarray:
+        compiled = model_state.get('compiled_model')
+        model = compiled if compiled is not None and len(X) <= COMPILED_MAX_ROWS else model_state['skill_model']
+        return np.clip(model.predict(X).astype(np.float64), 0, 100)
+
+    @staticmethod
+    def search(model_state: dict, signals: dict, constraints: dict = None, target_level: str = None,
+               seed: int = 0) -> dict:
+        """
+        Smallest-effort signal change that reaches the next level.
+
+        Args:
+            model_state: dict with skill_model, feature_spec / feature_names,
+                compiled_model (optional), active.
+            signals: Request signals dict (as sent to /api/predict).
+            constraints: Optional per-signal overrides of ACTIONABILITY, e.g.
+                {"projects": {"mutable": false}, "learning_hours": {"max_increase": 10}};
+                keys: mutable, min, max, max_increase, max_decrease, cost.
+            target_level: Level to reach (default: the one above the current level).
+            seed: Seed of the random candidates.
+
+        Returns:
+            dict with current, target, found, changes, predicted, effort,
+            alternatives, candidates_evaluated and timing_ms.
+
+        Raises:
+            ValueError: On non-numeric signals or an unknown target level.
+        """
+        start = time.time()
+        constraints = constraints if isinstance(constraints, dict) else {}
+        spec = model_state.get('feature_spec') or compile_feature_spec(model_state.get('feature_names') or FEATURE_COLUMNS)
+        raw = spec.raw_inputs(signals)
+        n_base = len(FEATURE_COLUMNS)
+
+        def score(deltas):
+            rows = np.repeat(raw[None, :], len(deltas), axis=0)
+            rows[:, :n_base] += deltas
+            return CounterfactualService._predict(model_state, spec.transform_raw(rows))
+
+        current = float(score(np.zeros((1, n_base), dtype=np.int64))[0])
+        current_level = level_of(current)
+        names = [name for name, _ in LEVELS]
+        if target_level is None:
+            target_index = names.index(current_level) + 1
+        elif target_level in names:
+            target_index = names.index(target_level)
+        else:
+            raise ValueError(f"target_level must be one of {names}")
+        result = {
+            'current': {'score': round(current, 1), 'level': current_level},
+            'target': None,
+            'found': False,
+            'changes': [],
+            'predicted': None,
+            'effort': 0.0,
+            'alternatives': [],
+            'candidates_evaluated': 0
+        }
+        if target_index >= len(LEVELS) or target_index <= names.index(current_level):
+            result['message'] = f"Already at {current_level} level"
+            result['timing_ms'] = round((time.time() - start) * 1000, 1)
+            return result
+        target, threshold = LEVELS[target_index]
+        result['target'] = {'level': target, 'score_above': threshold}
+
+        down, up, cost = _limits(raw[:n_base], constraints)
+        deltas = _candidates(down, up, np.random.default_rng(seed))
+        scores = score(deltas)
+        evaluated = len(deltas)
+
+        for _ in range(REFINE_ROUNDS):
+            effort = np.abs(deltas) @ cost
+            crossing = np.flatnonzero(scores > threshold)
+            if not len(crossing):
+                break
+            best = crossing[np.argsort(effort[crossing], kind='stable')[:REFINE_TOP]]
+            extra = _shrunk(deltas[best])
+            if not len(extra):
+                break
+            extra_scores = score(extra)
+            evaluated += len(extra)
+            improved = (extra_scores > threshold) & (np.abs(extra) @ cost < effort[best].min())
+            deltas = np.vstack([deltas, extra])
+            scores = np.concatenate([scores, extra_scores])
+            if not improved.any():
+                break
+
+        effort = np.abs(deltas) @ cost
+        changed = (deltas != 0).sum(axis=1)
+        crossing = scores > threshold
+        # Cheapest crossing candidate, then fewest changed signals, then highest score;
+        # without one, the candidate that gets closest
+        if crossing.any():
+            order = np.lexsort((-scores, changed, effort, ~crossing))
+        else:
+            order = np.lexsort((effort, -scores))
+
+        def describe(k):
+            return [
+                {'feature': FEATURE_COLUMNS[j], 'from': round(float(raw[j]), 1),
+                 'to': round(float(raw[j] + deltas[k, j]), 1), 'delta': int(deltas[k, j])}
+                for j in np.flatnonzero(deltas[k]).tolist()
+            ]
+
+        best = int(order[0])
+        result.update({
+            'found': bool(crossing[best]),
+            'changes': describe(best),
+            'predicted': {'score': round(float(scores[best]), 1), 'level': level_of(float(scores[best]))},
+            'effort': round(float(effort[best]), 2),
+            'candidates_evaluated': int(evaluated)
+        })
+        if crossing[best]:
+            # Next cheapest crossing changes that use a different set of signals
+            seen = {tuple(np.flatnonzero(deltas[best]).tolist())}
+            for k in order[1:].tolist():
+                if not crossing[k] or len(result['alternatives']) >= ALTERNATIVES:
+                    break
+                used = tuple(np.flatnonzero(deltas[k]).tolist())
+                if used in seen:
+                    continue
+                seen.add(used)
+                result['alternatives'].append({
+                    'changes': describe(k),
+                    'predicted': {'score': round(float(scores[k]), 1), 'level': level_of(float(scores[k]))},
+                    'effort': round(float(effort[k]), 2)
+                })
+        else:
+            result['message'] = f"No change within the allowed bounds reaches {target}"
+        result['timing_ms'] = round((time.time() - start) * 1000, 1)
+        return result
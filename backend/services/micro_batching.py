@@ -0,0 +1,214 @@
+"""
+services/micro_batching.py – Micro-Batching Request Coalescer
+SkillGenome X
+
+Concurrent single-profile requests (threaded gunicorn workers) each pay the
+fixed cost of a model `predict` call. A MicroBatcher queues their feature
+rows; a scoring thread waits up to `window_ms` after the first queued row
+(or until `max_rows` are queued), stacks the rows into one matrix, scores it
+once and hands each request its own result.
+
+Rows are grouped by the model snapshot they were submitted with, so a model
+swap in the middle of a window never mixes models within one request. The
+scoring thread is started lazily in the process that submits, so batchers
+created before a gunicorn fork work in every worker.
+
+A failure while forming or scoring a batch is raised in the requests of that
+batch; the scoring thread keeps running (and is restarted should it die). A
+request whose result hasn't arrived `timeout_ms` after submitting scores its
+row directly instead of waiting on.
+"""
+import os
+import time
+import threading
+from collections import deque
+import numpy as np
+
+DELAY_SAMPLES = 2048       # recent queueing delays kept for percentiles
+TIMEOUT_MS = 1000.0
+
+
+class _Pending:
+    __slots__ = ('row', 'models', 'enqueued', 'done', 'result', 'error')
+
+    def __init__(self, row, models):
+        self.row = row
+        self.models = models
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Coalesces single-row model calls into batched ones.
+
+    Args:
+        score_fn: score_fn(models, X) → list with one result per row of X.
+        window_ms: How long the first queued row waits for others; 0 disables
+            batching (submit scores the row directly).
+        max_rows: Batch size that triggers scoring before the window ends.
+        name: Label used in logs and metrics.
+        timeout_ms: How long submit waits for the scoring thread before it
+            scores the row itself.
+    """
+
+    def __init__(self, score_fn, window_ms: float = 0.0, max_rows: int = 64, name: str = 'model',
+                 timeout_ms: float = TIMEOUT_MS):
+        self.score_fn = score_fn
+        self.window_s = max(0.0, float(window_ms)) / 1000.0
+        self.max_rows = max(1, int(max_rows))
+        self.name = name
+        self.timeout_s = max(0.0, float(timeout_ms)) / 1000.0 + self.window_s
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._thread = None
+        self._pid = None
+        self._reset_metrics()
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_s > 0 and self.max_rows > 1
+
+    def _reset_metrics(self):
+        self._requests = 0
+        self._batches = 0
+        self._rows = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._size_hist = {}
+        self._delays = deque(maxlen=DELAY_SAMPLES)
+        self._score_times = deque(maxlen=DELAY_SAMPLES)
+
+    def submit(self, row, models):
+        """
+        Score one feature row, batched with concurrent submissions.
+
+        Args:
+            row: 1-D feature row (copied; the caller may reuse its buffer).
+            models: Hashable model snapshot passed to score_fn (e.g. a tuple of
+                the model objects); rows are batched only with equal snapshots.
+
+        Returns:
+            The row's entry of score_fn's result.
+
+        Raises:
+            Whatever score_fn (or forming the batch) raised for the batch
+            containing the row, or for the row itself after a timeout.
+        """
+        row = np.array(row, dtype=np.float64).reshape(-1)
+        if not self.enabled:
+            return self.score_fn(models, row[None, :])[0]
+
+        item = _Pending(row, models)
+        with self._cond:
+            self._ensure_worker()
+            self._pending.append(item)
+            self._requests += 1
+            if len(self._pending) == 1 or len(self._pending) >= self.max_rows:
+                self._cond.notify()
+        if not item.done.wait(self.timeout_s):
+            with self._cond:
+                self._timeouts += 1
+                try:
+                    self._pending.remove(item)
+                except ValueError:
+                    pass                # already taken into a batch that is still scoring
+            print(f"[micro_batching] {self.name}: no result after {self.timeout_s * 1000:g} ms, scoring directly")
+            return self.score_fn(models, row[None, :])[0]
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _ensure_worker(self):
+        """Start the scoring thread in this process (called with the lock held)."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        if self._pid is not None and self._pid != os.getpid():
+            # Forked from a process that had started scoring: its thread is gone
+            self._pending.clear()
+            self._reset_metrics()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name=f'microbatch-{self.name}', daemon=True)
+        self._thread.start()
+        print(f"[micro_batching] {self.name}: window {self.window_s * 1000:g} ms, max {self.max_rows} rows")
+
+    def _next_batch(self) -> list:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = self._pending[0].enqueued + self.window_s
+            while len(self._pending) < self.max_rows:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._pending.popleft() for _ in range(min(self.max_rows, len(self._pending)))]
+
+    def _run(self):
+        while True:
+            batch = []
+            try:
+                batch = self._next_batch()
+                self._score(batch)
+            except Exception as e:
+                # Fail this batch's requests, keep the thread serving the next ones
+                self._errors += 1
+                print(f"[micro_batching] {self.name}: batch of {len(batch)} failed: {e}")
+                for item in batch:
+                    if item.result is None and item.error is None:
+                        item.error = e
+            finally:
+                for item in batch:
+                    item.done.set()
+
+    def _score(self, batch: list):
+        start = time.perf_counter()
+        # One score_fn call per model snapshot, in arrival order
+        groups = {}
+        for item in batch:
+            groups.setdefault(item.models, []).append(item)
+        for items in groups.values():
+            try:
+                results = self.score_fn(items[0].models, np.vstack([item.row for item in items]))
+                for item, result in zip(items, results):
+                    item.result = result
+            except Exception as e:
+                self._errors += 1
+                for item in items:
+                    item.error = e
+        self._record(batch, start, time.perf_counter() - start)
+
+    def _record(self, batch: list, start: float, elapsed: float):
+        self._batches += 1
+        self._rows += len(batch)
+        lo = 1 << (len(batch).bit_length() - 1)
+        bucket = str(lo) if lo == 1 else f'{lo}-{2 * lo - 1}'
+        self._size_hist[bucket] = self._size_hist.get(bucket, 0) + 1
+        self._delays.extend(start - item.enqueued for item in batch)
+        self._score_times.append(elapsed)
+
+    def metrics(self) -> dict:
+        """Batch-size distribution, queueing delay and scoring time."""
+        def ms(samples):
+            if not samples:
+                return {'p50': 0.0, 'p99': 0.0, 'max': 0.0}
+            values = np.asarray(samples) * 1000
+            return {'p50': round(float(np.percentile(values, 50)), 3),
+                    'p99': round(float(np.percentile(values, 99)), 3),
+                    'max': round(float(values.max()), 3)}
+
+        return {
+            'enabled': self.enabled,
+            'window_ms': self.window_s * 1000,
+            'max_rows': self.max_rows,
+            'requests': self._requests,
+            'batches': self._batches,
+            'errors': self._errors,
+            'timeouts': self._timeouts,
+            'mean_batch_size': round(self._rows / self._batches, 2) if self._batches else 0.0,
+            'batch_size_histogram': dict(sorted(self._size_hist.items(), key=lambda kv: int(kv[0].split('-')[0]))),
+            'queue_delay_ms': ms(list(self._delays)),
+            'score_ms': ms(list(self._score_times))
+        }
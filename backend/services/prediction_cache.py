@@ -0,0 +1,127 @@
+"""
+services/prediction_cache.py – Bounded LRU Cache of /api/predict Responses
+SkillGenome X
+
+Signals on /api/predict come from 0–100 sliders, so the same profiles recur.
+The serialized response is cached under a key made of the quantized signal
+vector (integer grid codes of the model inputs), the context fields the
+response depends on and the model version, so a model swap never serves a
+stale response. The cache is bounded by entry count and by bytes.
+
+Only requests whose signals lie exactly on the quantization grid are cached:
+a hit always returns the response the request itself would have produced.
+"""
+import sys
+import math
+import threading
+from collections import OrderedDict
+
+from ml.feature_spec import INPUT_COLUMNS
+
+CONTEXT_FIELDS = ('area_type', 'digital_access', 'opportunity_level', 'domain')
+_MISSING = object()        # field absent (differs from any value, incl. defaults)
+
+
+class PredictionCache:
+    """
+    LRU cache of serialized prediction responses.
+
+    Args:
+        max_entries: Maximum cached responses (0 disables the cache).
+        max_bytes: Maximum total size of cached responses and keys.
+        step: Quantization step of signal values (1.0 = integer sliders).
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 16 * 2 ** 20, step: float = 1.0):
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.step = float(step)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.bypassed = self.evictions = self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0 and self.step > 0
+
+    def key(self, signals, context, version):
+        """
+        Cache key for a request, or None if the request can't be cached
+        (cache disabled, non-numeric or off-grid signals, unusual context).
+        """
+        if not self.enabled or not isinstance(signals, dict) or not isinstance(context, dict):
+            return None
+        codes = []
+        for name in INPUT_COLUMNS:
+            value = signals.get(name, _MISSING)
+            if value is _MISSING:
+                codes.append(value)
+                continue
+            if type(value) not in (int, float):
+                self.bypassed += 1
+                return None
+            code = value / self.step
+            if not math.isfinite(code) or code != int(code):
+                self.bypassed += 1
+                return None
+            # int and float inputs are kept apart: some values are echoed back as sent
+            codes.append((int(code), type(value) is float))
+        fields = tuple(context.get(name, _MISSING) for name in CONTEXT_FIELDS)
+        if not all(f is _MISSING or isinstance(f, str) for f in fields):
+            self.bypassed += 1
+            return None
+        return (version, tuple(codes), fields)
+
+    def get(self, key):
+        """Cached response body for key (marked most recently used), or None."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body: bytes):
+        """Cache a response body, evicting least recently used entries to fit."""
+        size = len(body) + sys.getsizeof(key[1])
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old) + sys.getsizeof(key[1])
+            self._entries[key] = body
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                old_key, old_body = self._entries.popitem(last=False)
+                self._bytes -= len(old_body) + sys.getsizeof(old_key[1])
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry (called when the model is swapped)."""
+        with self._lock:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'entries': len(self._entries),
+            'bytes': self._bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'step': self.step,
+            'hits': self.hits,
+            'misses': self.misses,
+            'bypassed': self.bypassed,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
@@ -7,6 +7,10 @@ workforce assessment, recommendations, opportunities, and trust metadata.
 """
 import numpy as np
 from pipeline.preprocessing import FEATURE_COLUMNS
+from ml.feature_spec import compile_feature_spec
+from ml.model_manager import importance_values
+from ml.tree_shap import factor_contributions
+from services.rule_tables import SERVICE_RULES
 
 
 class PredictionService:
@@ -32,9 +36,15 @@ class PredictionService:
         ]
         features = [signals.get(f, 50) for f in feature_names]
 
+        # Model input: base signals (defaulting to 50) plus engineered features, in trained order
+        spec = model_state.get('feature_spec') or compile_feature_spec(model_state.get('feature_names') or FEATURE_COLUMNS)
+        row = spec.transform({**dict(zip(feature_names, features)), **signals})
+
         # ── Model prediction ──
         if model_state.get('active') and model_state.get('skill_model'):
-            predicted_score = float(model_state['skill_model'].predict([features])[0])
+            compiled = model_state.get('compiled_model')
+            predicted_score = (compiled.predict_one(row) if compiled is not None
+                               else float(model_state['skill_model'].predict(row)[0]))
             predicted_score = max(0, min(100, predicted_score))
             confidence = model_state.get('training_score', 75)
         else:
@@ -44,12 +54,14 @@ class PredictionService:
         # ── Anomaly detection ──
         is_anomaly = False
         if model_state.get('anomaly_model'):
-            is_anomaly = bool(model_state['anomaly_model'].predict([features])[0] == -1)
+            compiled_anomaly = model_state.get('compiled_anomaly')
+            is_anomaly = (compiled_anomaly.score_one(row)[1] if compiled_anomaly is not None
+                          else bool(model_state['anomaly_model'].predict(row)[0] == -1))
             if is_anomaly:
                 confidence = max(30, confidence - 20)
 
         # ── Explainability ──
-        explanations = PredictionService._explain(model_state, features, feature_names)
+        explanations = PredictionService._explain(model_state, features, feature_names, row)
 
         # ── Workforce assessment ──
         workforce = {
@@ -58,11 +70,9 @@ class PredictionService:
             'risk_level': 'Low' if predicted_score > 70 else 'Moderate' if predicted_score > 40 else 'High'
         }
 
-        # ── Recommendations ──
-        recommendations = PredictionService._build_recommendations(predicted_score, signals)
-
-        # ── Opportunities ──
-        opportunities = PredictionService._build_opportunities(predicted_score, signals, domain)
+        # ── Recommendations & opportunities (services/rule_tables.py) ──
+        recommendations = SERVICE_RULES.recommend(predicted_score, signals)
+        opportunities = SERVICE_RULES.opportunities_for(predicted_score, signals, domain)
 
         # ── Trust metadata ──
         trust = {
@@ -84,69 +94,34 @@ class PredictionService:
         }
 
     @staticmethod
-    def _explain(model_state, features, feature_names):
-        """Generate top positive/negative factor explanations."""
-        if not model_state.get('skill_model') or not hasattr(model_state['skill_model'], 'feature_importances_'):
-            return {'top_positive': [], 'top_negative': []}
+    def _explain(model_state, features, feature_names, row):
+        """
+        Generate top positive/negative factor explanations.
 
-        importances = model_state['skill_model'].feature_importances_
-        contributions = []
-        for i, name in enumerate(feature_names):
-            impact = float(importances[i]) * (features[i] - 50)
-            contributions.append({'feature': name, 'value': features[i], 'impact': round(impact, 2)})
+        Factors come from the exact TreeSHAP attribution of the model row
+        (ml/tree_shap.py), also returned as feature_attributions; models
+        without an explainer fall back to importance × distance from 50.
+        """
+        explanations = {}
+        explainer = model_state.get('explainer') if model_state.get('active') else None
+        if explainer is not None:
+            attribution = explainer.attribution(row)
+            contributions = factor_contributions(attribution, row, ndigits=2)
+            explanations['feature_attributions'] = attribution
+        else:
+            importances = model_state.get('importances')
+            if importances is None and model_state.get('skill_model'):
+                importances = importance_values(model_state['skill_model'])
+            if importances is None:
+                return {'top_positive': [], 'top_negative': []}
+            contributions = []
+            for i, name in enumerate(feature_names):
+                impact = float(importances[i]) * (features[i] - 50)
+                contributions.append({'feature': name, 'value': features[i], 'impact': round(impact, 2)})
 
         contributions.sort(key=lambda x: x['impact'], reverse=True)
         return {
             'top_positive': [c for c in contributions if c['impact'] > 0][:3],
-            'top_negative': [c for c in contributions if c['impact'] < 0][-3:]
-        }
-
-    @staticmethod
-    def _build_recommendations(score, signals):
-        """Context-aware action recommendations."""
-        recs = []
-        digital = signals.get('digital_presence', 50)
-        economic = signals.get('economic_activity', 50)
-
-        if score < 50:
-            recs.append({'action': 'Join a skill training program in your domain', 'category': 'training', 'priority': 'high'})
-        if digital < 40:
-            recs.append({'action': 'Start accepting digital payments (UPI)', 'category': 'digital', 'priority': 'high'})
-            recs.append({'action': 'Create a WhatsApp Business profile', 'category': 'digital', 'priority': 'medium'})
-        if economic < 40:
-            recs.append({'action': 'Explore gig work platforms for additional income', 'category': 'income', 'priority': 'medium'})
-        if score > 70:
-            recs.append({'action': 'Mentor others and expand customer reach', 'category': 'growth', 'priority': 'low'})
-        if not recs:
-            recs.append({'action': 'Keep building consistency — you\'re on track', 'category': 'growth', 'priority': 'low'})
-        return recs
-
-    @staticmethod
-    def _build_opportunities(score, signals, domain):
-        """Domain-aware growth opportunities."""
-        opps = {'training': [], 'government_schemes': [], 'platforms': [], 'digital_growth': []}
-
-        if score < 60:
-            opps['training'].extend(['NSDC Skill India courses (free)', 'State-level skill programs'])
-        opps['training'].append('Industry-specific certification courses')
-
-        if signals.get('economic_activity', 50) < 50:
-            opps['government_schemes'].extend([
-                'Mudra Loan (up to ₹10 lakh)', 'PMEGP', 'State skill development missions'
-            ])
-
-        platform_map = {
-            'Retail & Sales': ['Meesho', 'Flipkart Seller Hub', 'Amazon Easy'],
-            'Service Industry': ['Urban Company', 'Housejoy'],
-            'Logistics & Delivery': ['Swiggy', 'Zomato', 'Porter'],
-            'Agriculture & Allied': ['DeHaat', 'AgroStar'],
-            'Creative & Media': ['Fiverr', '99designs'],
-            'Entrepreneurship': ['IndiaMART', 'GeM Portal'],
+            'top_negative': [c for c in contributions if c['impact'] < 0][-3:],
+            **explanations
         }
-        opps['platforms'] = platform_map.get(domain, ['Explore online marketplaces'])
-
-        if signals.get('digital_presence', 50) < 50:
-            opps['digital_growth'].extend(['Set up UPI payments', 'Create WhatsApp Business'])
-        opps['digital_growth'].append('Build an online presence for your work')
-
-        return opps
@@ -0,0 +1,67 @@
+"""
+services/process_memory.py – Per-Process Memory Report
+SkillGenome X
+
+Splits a process's resident memory into pages it shares with other
+processes (copy-on-write pages inherited from the gunicorn master,
+memory-mapped snapshot files) and pages unique to it. Reads
+/proc/<pid>/smaps_rollup (Linux); elsewhere reports only what is available.
+"""
+import os
+
+_FIELDS = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty', 'Swap')
+
+
+def _read_kb(path: str, fields) -> dict:
+    values = {}
+    with open(path) as f:
+        for line in f:
+            name, _, rest = line.partition(':')
+            if name in fields:
+                values[name] = int(rest.split()[0])
+    return values
+
+
+def memory_report(pid='self') -> dict:
+    """
+    Resident memory of a process in MB, split into shared and unique pages.
+
+    Returns:
+        dict with pid, rss_mb, pss_mb, shared_mb, unique_mb and source; or
+        {'available': False} when /proc is not available.
+    """
+    base = f'/proc/{pid}'
+    try:
+        if os.path.exists(f'{base}/smaps_rollup'):
+            kb = _read_kb(f'{base}/smaps_rollup', _FIELDS)
+            source = 'smaps_rollup'
+        else:
+            status = _read_kb(f'{base}/status', ('VmRSS', 'RssFile', 'RssShmem', 'RssAnon'))
+            kb = {
+                'Rss': status.get('VmRSS', 0),
+                'Shared_Clean': status.get('RssFile', 0) + status.get('RssShmem', 0),
+                'Private_Dirty': status.get('RssAnon', 0)
+            }
+            source = 'status'
+    except OSError:
+        return {'available': False}
+
+    shared = kb.get('Shared_Clean', 0) + kb.get('Shared_Dirty', 0)
+    unique = kb.get('Private_Clean', 0) + kb.get('Private_Dirty', 0)
+    return {
+        'available': True,
+        'pid': os.getpid() if pid == 'self' else pid,
+        'rss_mb': round(kb.get('Rss', 0) / 1024, 1),
+        'pss_mb': round(kb.get('Pss', 0) / 1024, 1) if 'Pss' in kb else None,
+        'shared_mb': round(shared / 1024, 1),
+        'unique_mb': round(unique / 1024, 1),
+        'source': source
+    }
+
+
+def format_report(label: str, report: dict) -> str:
+    """One-line log representation of a memory report."""
+    if not report.get('available'):
+        return f"[memory] {label}: /proc not available"
+    return (f"[memory] {label} pid={report['pid']}: rss={report['rss_mb']} MB "
+            f"(shared {report['shared_mb']} MB, unique {report['unique_mb']} MB, pss {report['pss_mb']} MB)")
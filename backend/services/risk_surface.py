@@ -0,0 +1,203 @@
+"""
+services/risk_surface.py – What-If Risk Surfaces for /api/predict-skill-risk
+SkillGenome X
+
+A risk surface sweeps two socio-economic inputs over a grid (e.g. literacy ×
+internet penetration) with the other inputs fixed, and returns predicted
+unemployment and skill_risk_score for every cell – the same formulas as
+/api/predict-skill-risk, but the whole grid (up to 200 × 200) is one matrix
+that is scaled and scored in a single vectorized call.
+
+Responses are JSON (nested lists) or compact binary (little-endian float32,
+shape 2 × ny × nx) and are cached per model version and grid spec in a
+bounded LRU (SurfaceCache).
+"""
+import json
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# Request name → (default value as in /api/predict-skill-risk, default sweep range);
+# order is the real model's column order
+RISK_INPUTS = OrderedDict([
+    ('literacy_rate',           (70.0,     (40.0, 100.0))),
+    ('internet_penetration',    (40.0,     (0.0, 100.0))),
+    ('workforce_participation', (55.0,     (30.0, 80.0))),
+    ('urban_population',        (35.0,     (0.0, 100.0))),
+    ('per_capita_income',       (100000.0, (20000.0, 400000.0))),
+    ('skill_training_count',    (30000.0,  (0.0, 100000.0))),
+])
+MAX_STEPS = 200
+DEFAULT_STEPS = 50
+LAYERS = ('predicted_unemployment', 'skill_risk_score')
+FORMATS = ('json', 'binary')
+
+
+def _axis(data, name: str, default_input: str) -> tuple:
+    axis = data.get(name) or {}
+    if not isinstance(axis, dict):
+        raise ValueError(f"'{name}' must be an object with input, min, max, steps")
+    field = axis.get('input', default_input)
+    if field not in RISK_INPUTS:
+        raise ValueError(f"{name}.input must be one of {list(RISK_INPUTS)}")
+    lo, hi = RISK_INPUTS[field][1]
+    lo, hi = float(axis.get('min', lo)), float(axis.get('max', hi))
+    steps = int(axis.get('steps', DEFAULT_STEPS))
+    if not (np.isfinite(lo) and np.isfinite(hi)) or lo >= hi:
+        raise ValueError(f"{name} needs finite min < max")
+    if not 2 <= steps <= MAX_STEPS:
+        raise ValueError(f"{name}.steps must be between 2 and {MAX_STEPS}")
+    return field, lo, hi, steps
+
+
+def parse_spec(data: dict) -> tuple:
+    """
+    Normalized, hashable grid spec from a request body.
+
+    Body: {"x": {"input", "min", "max", "steps"}, "y": {...},
+    "fixed": {input: value}, "format": "json" | "binary"}; every field is
+    optional (x = literacy_rate, y = internet_penetration, 50 steps each).
+
+    Returns:
+        (x, y, fixed, format) with x/y = (input, min, max, steps) and fixed a
+        tuple of the values of all inputs in RISK_INPUTS order.
+
+    Raises:
+        ValueError: On unknown inputs, bad ranges, too many steps or a bad format.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+    x = _axis(data, 'x', 'literacy_rate')
+    y = _axis(data, 'y', 'internet_penetration')
+    if x[0] == y[0]:
+        raise ValueError("x and y must sweep different inputs")
+    fixed = data.get('fixed') or {}
+    if not isinstance(fixed, dict) or any(k not in RISK_INPUTS for k in fixed):
+        raise ValueError(f"fixed must map inputs of {list(RISK_INPUTS)} to values")
+    values = tuple(float(fixed.get(name, default)) for name, (default, _) in RISK_INPUTS.items())
+    fmt = data.get('format', 'json')
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+    return x, y, values, fmt
+
+
+def axis_values(axis: tuple) -> np.ndarray:
+    _, lo, hi, steps = axis
+    return np.linspace(lo, hi, steps)
+
+
+def compute_surface(real_state: dict, spec: tuple) -> dict:
+    """
+    Predicted unemployment and skill risk over the grid.
+
+    Args:
+        real_state: REAL_MODEL_STATE (trained, model, scaler).
+        spec: parse_spec() result.
+
+    Returns:
+        dict with x_values, y_values, predicted_unemployment and
+        skill_risk_score ((ny × nx) float64 arrays) and model_used.
+    """
+    x, y, fixed, _ = spec
+    names = list(RISK_INPUTS)
+    xs, ys = axis_values(x), axis_values(y)
+    raw = np.tile(np.array(fixed), (len(xs) * len(ys), 1))
+    raw[:, names.index(x[0])] = np.tile(xs, len(ys))
+    raw[:, names.index(y[0])] = np.repeat(ys, len(xs))
+
+    if real_state.get('trained') and real_state.get('model') is not None:
+        unemployment = real_state['model'].predict(real_state['scaler'].transform(raw))
+        unemployment = np.maximum(0.0, np.round(unemployment, 2))
+        model_used = "GradientBoostingRegressor (Real Data v1.0)"
+    else:
+        literacy, internet = raw[:, 0], raw[:, 1]
+        unemployment = np.clip(np.round(15 - literacy * 0.05 - internet * 0.04 + 0.01, 2), 2.0, 30.0)
+        model_used = "Heuristic Fallback (model not trained)"
+    risk = np.round(np.minimum(100, unemployment / 25.0 * 100), 1)
+
+    shape = (len(ys), len(xs))
+    return {
+        'x_values': xs,
+        'y_values': ys,
+        'predicted_unemployment': unemployment.reshape(shape),
+        'skill_risk_score': risk.reshape(shape),
+        'model_used': model_used
+    }
+
+
+def render(surface: dict, spec: tuple, model_version) -> tuple:
+    """
+    Serialize a surface.
+
+    Returns:
+        (body bytes, mimetype, headers dict). JSON holds nested lists; binary
+        is float32 of shape (2, ny, nx) in LAYERS order, described by the
+        X-Surface-* headers.
+    """
+    x, y, fixed, fmt = spec
+    meta = {
+        'x': {'input': x[0], 'min': x[1], 'max': x[2], 'steps': x[3]},
+        'y': {'input': y[0], 'min': y[1], 'max': y[2], 'steps': y[3]},
+        'fixed': {name: value for name, value in zip(RISK_INPUTS, fixed) if name not in (x[0], y[0])},
+        'shape': [y[3], x[3]],
+        'model_used': surface['model_used'],
+        'model_version': model_version
+    }
+    if fmt == 'binary':
+        layers = np.stack([surface[name] for name in LAYERS]).astype('<f4')
+        headers = {
+            'X-Surface-Shape': ','.join(str(s) for s in layers.shape),
+            'X-Surface-Dtype': 'float32-le',
+            'X-Surface-Layers': ','.join(LAYERS),
+            'X-Surface-Meta': json.dumps(meta, separators=(',', ':'))
+        }
+        return layers.tobytes(), 'application/octet-stream', headers
+    body = {
+        **meta,
+        'x_values': np.round(surface['x_values'], 4).tolist(),
+        'y_values': np.round(surface['y_values'], 4).tolist(),
+        **{name: surface[name].tolist() for name in LAYERS}
+    }
+    return json.dumps(body, separators=(',', ':')).encode(), 'application/json', {}
+
+
+class SurfaceCache:
+    """
+    LRU of rendered surfaces keyed on (model version, grid spec).
+
+    Args:
+        max_entries: Cached surfaces kept (0 disables the cache).
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max(0, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                'hits': self.hits, 'misses': self.misses}
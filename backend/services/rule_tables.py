@@ -0,0 +1,253 @@
+"""
+services/rule_tables.py – Declarative Recommendation & Opportunity Rules
+SkillGenome X
+
+The recommendation, opportunity and domain-reasoning rules are data: each
+Rule says "when <input> <op> <threshold>, add these items". A RuleTable is
+compiled once into input-index / threshold arrays and evaluates either
+
+- one profile (scalar comparisons, no string building), or
+- a whole batch as a boolean mask matrix; rows with the same mask pattern
+  share one assembled item list.
+
+RuleSets bundle the tables used by /api/predict and /api/predict/batch
+(PROFILE_RULES) and by PredictionService (SERVICE_RULES).
+"""
+from collections import namedtuple
+import numpy as np
+
+# input: 'score' (predicted skill score) or a signal name; op: '<', '>' or None
+# (always fires); default: value used when the signal is missing
+Rule = namedtuple('Rule', ['input', 'op', 'threshold', 'items', 'default'], defaults=[None])
+
+SCORE = 'score'
+
+
+def signal_column(signals: list, name: str, default) -> np.ndarray:
+    """One signal across the batch as floats, with the rule's default for missing values."""
+    return np.array([s.get(name, default) for s in signals], dtype=np.float64)
+
+
+class RuleTable:
+    """
+    Ordered threshold rules compiled into arrays.
+
+    Args:
+        rules: list of Rule; fired rules contribute their items in table order.
+        fallback: Items returned when no rule fires.
+    """
+
+    def __init__(self, rules: list, fallback: list = ()):
+        self.rules = list(rules)
+        self.fallback = list(fallback)
+        # Distinct (input, default) pairs → column of the batch input matrix
+        self.inputs = []
+        index = []
+        for rule in self.rules:
+            if rule.op is None:
+                index.append(-1)
+                continue
+            key = (rule.input, rule.default)
+            if key not in self.inputs:
+                self.inputs.append(key)
+            index.append(self.inputs.index(key))
+        self._index = np.array(index, dtype=np.intp)
+        self._always = self._index < 0
+        self._less = np.array([rule.op == '<' for rule in self.rules])
+        self._threshold = np.array([np.nan if rule.op is None else float(rule.threshold) for rule in self.rules])
+        self._weights = 1 << np.arange(len(self.rules), dtype=np.int64)
+        self._scalar = [(rule.input, rule.default, rule.op, rule.threshold, rule.items) for rule in self.rules]
+
+    def evaluate(self, score, signals: dict) -> list:
+        """Items of the rules that fire for one profile."""
+        out = []
+        for name, default, op, threshold, items in self._scalar:
+            if op is not None:
+                value = score if name == SCORE else signals.get(name, default)
+                if not (value < threshold if op == '<' else value > threshold):
+                    continue
+            out.extend(items)
+        return out or list(self.fallback)
+
+    def masks(self, score: np.ndarray, signals: list) -> np.ndarray:
+        """(n × rules) boolean matrix: which rules fire for each profile."""
+        n = len(signals)
+        X = np.empty((n, max(len(self.inputs), 1)))
+        for j, (name, default) in enumerate(self.inputs):
+            X[:, j] = score if name == SCORE else signal_column(signals, name, default)
+        values = X[:, np.maximum(self._index, 0)]
+        fired = np.where(self._less, values < self._threshold, values > self._threshold)
+        fired[:, self._always] = True
+        return fired
+
+    def evaluate_batch(self, score: np.ndarray, signals: list) -> list:
+        """Items per profile for a batch (same result as evaluate() row by row)."""
+        patterns = self.masks(score, signals) @ self._weights
+        assembled = {}
+        for code in np.unique(patterns).tolist():
+            items = [item for rule, bit in zip(self.rules, self._weights.tolist()) if code & bit
+                     for item in rule.items]
+            assembled[code] = items or self.fallback
+        return [list(assembled[code]) for code in patterns.tolist()]
+
+
+class Lookup:
+    """
+    Keyed table with a default (e.g. domain → platforms).
+
+    Args:
+        table: dict of key → value.
+        default: Value for unknown keys.
+        default_format: If set, unknown keys give default_format.format(key) instead.
+    """
+
+    def __init__(self, table: dict, default=None, default_format: str = None):
+        self.table = dict(table)
+        self.default = default
+        self.default_format = default_format
+
+    def get(self, key):
+        try:
+            value = self.table.get(key, self)
+        except TypeError:       # unhashable key: never in the table
+            value = self
+        if value is not self:
+            return value
+        return self.default_format.format(key) if self.default_format is not None else self.default
+
+
+class RuleSet:
+    """
+    Recommendation and opportunity rules of one response format.
+
+    Args:
+        recommendations: RuleTable of action recommendations.
+        opportunities: dict of section → RuleTable or Lookup (keyed on domain),
+            in response order.
+        domain_reasoning: Lookup of domain → reasoning text (optional).
+    """
+
+    def __init__(self, recommendations: RuleTable, opportunities: dict, domain_reasoning: Lookup = None):
+        self.recommendations = recommendations
+        self.opportunities = opportunities
+        self.domain_reasoning = domain_reasoning
+
+    def recommend(self, score, signals: dict) -> list:
+        return self.recommendations.evaluate(score, signals)
+
+    def opportunities_for(self, score, signals: dict, domain) -> dict:
+        return {
+            section: list(table.get(domain)) if isinstance(table, Lookup) else table.evaluate(score, signals)
+            for section, table in self.opportunities.items()
+        }
+
+    def recommend_batch(self, score: np.ndarray, signals: list) -> list:
+        return self.recommendations.evaluate_batch(score, signals)
+
+    def opportunities_batch(self, score: np.ndarray, signals: list, domains) -> list:
+        columns = {}
+        for section, table in self.opportunities.items():
+            if isinstance(table, Lookup):
+                columns[section] = [list(table.get(d)) for d in domains]
+            else:
+                columns[section] = table.evaluate_batch(score, signals)
+        return [{section: columns[section][i] for section in self.opportunities} for i in range(len(signals))]
+
+
+# ── /api/predict and /api/predict/batch ──
+
+DOMAIN_REASONING = {
+    "Agriculture & Allied": "Agriculture & Allied domain prioritizes offline capability, yield, and practical farming factors",
+    "Construction & Skilled Trades": "Construction & Skilled Trades domain emphasizes hands-on experience and trade certifications",
+    "Manufacturing & Operations": "Manufacturing domain values production output quality and equipment proficiency",
+    "Retail & Sales": "Retail & Sales domain measures customer interaction volume and service consistency",
+    "Logistics & Delivery": "Logistics domain tracks delivery reliability and route management efficiency",
+    "Service Industry": "Service Industry domain evaluates customer satisfaction and shift consistency",
+    "Entrepreneurship": "Entrepreneurship domain assesses business sustainability and employment generation",
+    "Education & Training": "Education & Training domain measures teaching impact and curriculum development",
+    "Creative & Media": "Creative & Media domain values portfolio depth and client delivery",
+    "Business & Administration": "Business & Administration domain evaluates process improvement and team management",
+}
+
+DOMAIN_PLATFORMS = {
+    "Retail & Sales": ["Meesho (reselling)", "Flipkart Seller Hub", "Amazon Easy"],
+    "Service Industry": ["Urban Company", "Housejoy", "Local service apps"],
+    "Logistics & Delivery": ["Swiggy delivery partner", "Zomato delivery", "Porter / Uber"],
+    "Agriculture & Allied": ["DeHaat", "AgroStar", "Kisan Network"],
+    "Creative & Media": ["Fiverr", "99designs", "Instagram Shop"],
+    "Entrepreneurship": ["IndiaMART", "TradeIndia", "GeM Portal"],
+}
+
+PROFILE_RULES = RuleSet(
+    recommendations=RuleTable([
+        Rule(SCORE, '<', 50, [{"action": "Join a skill training program in your domain", "category": "training", "priority": "high"}]),
+        Rule('digital_presence', '<', 40, [
+            {"action": "Start accepting digital payments (UPI)", "category": "digital", "priority": "high"},
+            {"action": "Create a WhatsApp Business profile", "category": "digital", "priority": "medium"},
+            {"action": "Register on Google Business", "category": "digital", "priority": "medium"}
+        ], 50),
+        Rule('collaboration_community', '<', 40, [
+            {"action": "Join a local trade association or cooperative", "category": "community", "priority": "medium"}], 50),
+        Rule('economic_activity', '<', 40, [
+            {"action": "Explore freelancing or gig work platforms", "category": "income", "priority": "medium"}], 50),
+        Rule(SCORE, '>', 70, [{"action": "Mentor others and expand your customer reach", "category": "growth", "priority": "low"}]),
+        Rule('learning_behavior', '<', 40, [
+            {"action": "Dedicate 3-5 hours per week to learning new skills", "category": "training", "priority": "medium"}], 50),
+    ], fallback=[{"action": "Keep building consistency — you're on track", "category": "growth", "priority": "low"}]),
+    opportunities={
+        "training": RuleTable([
+            Rule(SCORE, '<', 60, ["NSDC Skill India courses (free)", "State-level skill development programs"]),
+            Rule(None, None, None, ["Industry-specific certification courses"]),
+        ]),
+        "government_schemes": RuleTable([
+            Rule('economic_activity', '<', 50, [
+                "Mudra Loan (up to ₹10 lakh for small business)",
+                "PMEGP – Prime Minister's Employment Generation Programme",
+                "State skill development mission programs"
+            ], 50),
+        ]),
+        "platforms": Lookup(DOMAIN_PLATFORMS, default=["Explore online marketplaces for your trade"]),
+        "digital_growth": RuleTable([
+            Rule('digital_presence', '<', 50, ["Set up UPI payments (PhonePe / Google Pay)", "Create WhatsApp Business account"], 50),
+            Rule('digital_presence', '<', 70, ["Register on Google My Business"], 50),
+            Rule(None, None, None, ["Build a simple online presence for your work"]),
+        ]),
+    },
+    domain_reasoning=Lookup(DOMAIN_REASONING, default_format="{} domain analysis based on skill pattern recognition")
+)
+
+# ── PredictionService ──
+
+SERVICE_RULES = RuleSet(
+    recommendations=RuleTable([
+        Rule(SCORE, '<', 50, [{'action': 'Join a skill training program in your domain', 'category': 'training', 'priority': 'high'}]),
+        Rule('digital_presence', '<', 40, [
+            {'action': 'Start accepting digital payments (UPI)', 'category': 'digital', 'priority': 'high'},
+            {'action': 'Create a WhatsApp Business profile', 'category': 'digital', 'priority': 'medium'}
+        ], 50),
+        Rule('economic_activity', '<', 40, [
+            {'action': 'Explore gig work platforms for additional income', 'category': 'income', 'priority': 'medium'}], 50),
+        Rule(SCORE, '>', 70, [{'action': 'Mentor others and expand customer reach', 'category': 'growth', 'priority': 'low'}]),
+    ], fallback=[{'action': 'Keep building consistency — you\'re on track', 'category': 'growth', 'priority': 'low'}]),
+    opportunities={
+        'training': RuleTable([
+            Rule(SCORE, '<', 60, ['NSDC Skill India courses (free)', 'State-level skill programs']),
+            Rule(None, None, None, ['Industry-specific certification courses']),
+        ]),
+        'government_schemes': RuleTable([
+            Rule('economic_activity', '<', 50, ['Mudra Loan (up to ₹10 lakh)', 'PMEGP', 'State skill development missions'], 50),
+        ]),
+        'platforms': Lookup({
+            'Retail & Sales': ['Meesho', 'Flipkart Seller Hub', 'Amazon Easy'],
+            'Service Industry': ['Urban Company', 'Housejoy'],
+            'Logistics & Delivery': ['Swiggy', 'Zomato', 'Porter'],
+            'Agriculture & Allied': ['DeHaat', 'AgroStar'],
+            'Creative & Media': ['Fiverr', '99designs'],
+            'Entrepreneurship': ['IndiaMART', 'GeM Portal'],
+        }, default=['Explore online marketplaces']),
+        'digital_growth': RuleTable([
+            Rule('digital_presence', '<', 50, ['Set up UPI payments', 'Create WhatsApp Business'], 50),
+            Rule(None, None, None, ['Build an online presence for your work']),
+        ]),
+    }
+)
@@ -0,0 +1,313 @@
+"""
+services/scoring_jobs.py – Chunked CSV Scoring Jobs for Worker Rosters
+SkillGenome X
+
+Scores an uploaded CSV of worker signals (one profile per row) in the
+background:
+
+- the file is read in chunks of `chunk_rows`;
+- each chunk gets the same feature matrix, skill score, anomaly flag and
+  hidden-talent / migration / workforce flags as /api/predict, with array
+  operations over the whole chunk (score_frame);
+- scored chunks are appended to the job's output CSV in input order.
+
+With more than one worker, chunks are scored in a process pool (spawned, so
+the serving process' threads and locks are never forked) while the parent
+reads ahead; at most 2 × workers chunks are in flight, so memory stays flat
+whatever the file size.
+
+Each job lives in its own directory (input.csv, output.csv, status.json).
+status.json is rewritten after every chunk, so any web worker can report
+progress and serve the download.
+
+A web worker runs at most `max_concurrent` jobs at a time; create() refuses
+more with ScoringJobsFull (HTTP 429). Directories of jobs that finished more
+than `ttl_s` ago are deleted whenever a new job is created.
+"""
+import os
+import json
+import uuid
+import time
+import shutil
+import threading
+import warnings
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+from ml.feature_spec import INPUT_COLUMNS, INPUT_DEFAULTS, compile_feature_spec
+
+CHUNK_ROWS = 20_000
+MAX_CONCURRENT = 2
+JOB_TTL_S = 24 * 3600
+FINISHED = ('done', 'failed')
+RESULT_COLUMNS = [
+    'skill_score', 'level', 'confidence', 'is_anomaly', 'hidden_talent_flag', 'migration_risk',
+    'work_capacity', 'growth_potential', 'risk_level'
+]
+
+
+def score_frame(models: tuple, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Score a chunk of roster rows.
+
+    Missing signal columns, empty cells and non-numeric values count as
+    missing: 0 for the base signals, SOCIO_ECONOMIC_DEFAULTS otherwise (as on
+    /api/predict).
+
+    Args:
+        models: (skill_model, anomaly_model, feature_names).
+        df: Chunk with signal columns and optional context columns
+            (area_type, digital_access, opportunity_level, domain).
+
+    Returns:
+        The chunk with RESULT_COLUMNS appended.
+    """
+    skill_model, anomaly_model, feature_names = models
+    n = len(df)
+    raw = np.empty((n, len(INPUT_COLUMNS)))
+    for i, name in enumerate(INPUT_COLUMNS):
+        if name in df.columns:
+            column = pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=np.float64)
+            raw[:, i] = np.where(np.isnan(column), INPUT_DEFAULTS[i], column)
+        else:
+            raw[:, i] = INPUT_DEFAULTS[i]
+    X = compile_feature_spec(feature_names).transform_raw(raw)
+
+    with warnings.catch_warnings():
+        # Models fitted on DataFrames warn on every chunk's plain array
+        warnings.filterwarnings('ignore', message='X does not have valid feature names')
+        score = np.clip(skill_model.predict(X).astype(np.float64), 0, 100)
+        if hasattr(anomaly_model, 'score_samples') and hasattr(anomaly_model, 'offset_'):
+            is_anomaly = (anomaly_model.score_samples(X) - anomaly_model.offset_) < 0
+        else:
+            is_anomaly = anomaly_model.predict(X) == -1
+
+    def context(name):
+        return df[name].astype(str).str.strip().to_numpy() if name in df.columns else np.full(n, '')
+
+    consistency = raw[:, INPUT_COLUMNS.index('experience_consistency')]
+    learning = raw[:, INPUT_COLUMNS.index('learning_behavior')]
+    opportunity = context('opportunity_level')
+    mig_high = (score > 75) & (opportunity == 'Low')
+    mig_medium = ~mig_high & (score > 65) & (opportunity == 'Moderate')
+
+    out = df.copy()
+    out['skill_score'] = np.round(score, 1)
+    out['level'] = np.select([score > 80, score > 60], ['Expert', 'Advanced'], 'Intermediate')
+    out['confidence'] = np.round(np.where(is_anomaly, 10.0, 85 + consistency * 0.1), 1)
+    out['is_anomaly'] = is_anomaly
+    out['hidden_talent_flag'] = (score > 70) & ((context('area_type') == 'Rural') | (context('digital_access') == 'Limited'))
+    out['migration_risk'] = np.select([mig_high, mig_medium], ['High', 'Medium'], 'Low')
+    out['work_capacity'] = np.select([score > 75, score > 45], ['High', 'Moderate'], 'Low')
+    out['growth_potential'] = np.select([learning > 60, learning > 30], ['High', 'Moderate'], 'Low')
+    out['risk_level'] = np.select([score > 70, score > 40], ['Low', 'Moderate'], 'High')
+    return out
+
+
+# Models of a pool worker process, set once by the pool initializer
+_WORKER_MODELS = None
+
+
+def _init_worker(models):
+    global _WORKER_MODELS
+    _WORKER_MODELS = models
+
+
+def _score_in_worker(df: pd.DataFrame) -> pd.DataFrame:
+    return score_frame(_WORKER_MODELS, df)
+
+
+class ScoringJobsFull(RuntimeError):
+    """Raised by ScoringJobs.create() while max_concurrent jobs are running."""
+
+
+class ScoringJobs:
+    """
+    Background CSV scoring jobs stored under one directory.
+
+    Args:
+        root: Directory holding one sub-directory per job.
+        workers: Scoring processes per job (≤ 1 scores in the job thread).
+        chunk_rows: Rows read and scored at a time.
+        max_concurrent: Jobs this process scores at the same time.
+        ttl_s: Age (since finishing) after which a job directory is deleted.
+    """
+
+    def __init__(self, root: str, workers: int = None, chunk_rows: int = CHUNK_ROWS,
+                 max_concurrent: int = MAX_CONCURRENT, ttl_s: float = JOB_TTL_S):
+        self.root = root
+        self.workers = max(1, int(workers if workers is not None else (os.cpu_count() or 1)))
+        self.chunk_rows = max(1, int(chunk_rows))
+        self.max_concurrent = max(1, int(max_concurrent))
+        self.ttl_s = float(ttl_s)
+        self._lock = threading.Lock()
+        self._status = {}           # jobs started by this process
+        self._active = set()        # created and not yet finished
+
+    def _dir(self, job_id: str) -> str:
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            raise KeyError(job_id)
+        return os.path.join(self.root, job_id)
+
+    def create(self) -> tuple:
+        """
+        New job directory; returns (job_id, path the input CSV goes to).
+
+        Raises:
+            ScoringJobsFull: If max_concurrent jobs are already running.
+        """
+        self.cleanup()
+        job_id = uuid.uuid4().hex[:16]
+        with self._lock:
+            if len(self._active) >= self.max_concurrent:
+                raise ScoringJobsFull(f"{len(self._active)} scoring jobs running, try again later")
+            self._active.add(job_id)
+        os.makedirs(self._dir(job_id), exist_ok=True)
+        return job_id, os.path.join(self._dir(job_id), 'input.csv')
+
+    def discard(self, job_id: str):
+        """Drop a created job that was never started (e.g. its upload failed)."""
+        with self._lock:
+            self._active.discard(job_id)
+        shutil.rmtree(self._dir(job_id), ignore_errors=True)
+
+    def cleanup(self, now: float = None) -> int:
+        """
+        Delete the directories of jobs that finished more than ttl_s ago, and
+        of jobs never started within ttl_s. Returns the number removed.
+        """
+        now = time.time() if now is None else now
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return 0
+        removed = 0
+        for job_id in names:
+            path = os.path.join(self.root, job_id)
+            try:
+                with self._lock:
+                    if job_id in self._active:
+                        continue
+                try:
+                    with open(os.path.join(path, 'status.json')) as f:
+                        status = json.load(f)
+                except FileNotFoundError:
+                    status = None
+                if status is not None and status['status'] not in FINISHED:
+                    continue
+                age = now - os.path.getmtime(os.path.join(path, 'status.json') if status else path)
+            except (OSError, ValueError, KeyError):
+                continue
+            if age > self.ttl_s:
+                shutil.rmtree(path, ignore_errors=True)
+                with self._lock:
+                    self._status.pop(job_id, None)
+                removed += 1
+        if removed:
+            print(f"[scoring_jobs] Removed {removed} expired job directories")
+        return removed
+
+    def output_path(self, job_id: str) -> str:
+        return os.path.join(self._dir(job_id), 'output.csv')
+
+    def start(self, job_id: str, models: tuple, model_version=None) -> dict:
+        """
+        Start scoring a created job's input.csv in a background thread.
+
+        Args:
+            job_id: From create().
+            models: (skill_model, anomaly_model, feature_names) snapshot.
+            model_version: Recorded in the job status.
+        """
+        input_path = os.path.join(self._dir(job_id), 'input.csv')
+        status = {
+            'job_id': job_id,
+            'status': 'queued',
+            'model_version': model_version,
+            'rows_scored': 0,
+            'chunks': 0,
+            'bytes_total': os.path.getsize(input_path),
+            'bytes_read': 0,
+            'progress': 0.0,
+            'workers': self.workers,
+            'chunk_rows': self.chunk_rows,
+            'submitted_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'elapsed_s': None,
+            'error': None
+        }
+        self._save(status)
+        threading.Thread(target=self._run, args=(status, input_path, models),
+                         name=f'scoring-job-{job_id}', daemon=True).start()
+        return dict(status)
+
+    def status(self, job_id: str) -> dict:
+        """Latest status of a job (from this process or from status.json)."""
+        with self._lock:
+            if job_id in self._status:
+                return dict(self._status[job_id])
+        try:
+            with open(os.path.join(self._dir(job_id), 'status.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            raise KeyError(job_id)
+
+    def _save(self, status: dict):
+        with self._lock:
+            self._status[status['job_id']] = dict(status)
+        path = os.path.join(self._dir(status['job_id']), 'status.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(status, f)
+        os.replace(path + '.tmp', path)
+
+    def _run(self, status: dict, input_path: str, models: tuple):
+        start = time.time()
+        status.update(status='running', started_at=datetime.now().isoformat())
+        self._save(status)
+        output_path = self.output_path(status['job_id'])
+        partial_path = output_path + '.partial'
+        pool = None
+        try:
+            with open(input_path, 'rb') as source, open(partial_path, 'w', newline='') as sink:
+                reader = pd.read_csv(source, chunksize=self.chunk_rows)
+                pending = deque()
+
+                def write(scored: pd.DataFrame):
+                    scored.to_csv(sink, header=status['chunks'] == 0, index=False)
+                    status['rows_scored'] += len(scored)
+                    status['chunks'] += 1
+                    status['bytes_read'] = source.tell()
+                    status['progress'] = round(min(1.0, status['bytes_read'] / max(1, status['bytes_total'])), 4)
+                    self._save(status)
+
+                for chunk in reader:
+                    if pool is None and self.workers > 1 and len(chunk) == self.chunk_rows:
+                        # More than one chunk may follow: worth starting the pool
+                        pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                                   initializer=_init_worker, initargs=(models,))
+                    if pool is None:
+                        write(score_frame(models, chunk))
+                        continue
+                    pending.append(pool.submit(_score_in_worker, chunk))
+                    while len(pending) >= 2 * self.workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+            os.replace(partial_path, output_path)
+            status.update(status='done', progress=1.0)
+            print(f"[scoring_jobs] {status['job_id']}: {status['rows_scored']} rows in {time.time() - start:.1f}s")
+        except Exception as e:
+            status.update(status='failed', error=str(e))
+            print(f"[scoring_jobs] {status['job_id']} failed: {e}")
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            status.update(finished_at=datetime.now().isoformat(), elapsed_s=round(time.time() - start, 2))
+            self._save(status)
+            with self._lock:
+                self._active.discard(status['job_id'])
@@ -12,6 +12,7 @@ from datetime import datetime
 from pipeline.preprocessing import load_csv, validate_columns, handle_missing_values, get_feature_matrix, FEATURE_COLUMNS
 from pipeline.feature_engineering import feature_engineering
 from pipeline.model_training import split_data, compare_models, train_model, evaluate_model
+from pipeline.hyperparameter_search import search_models, TIME_BUDGET_S, N_CONFIGS
 
 # Default paths
 MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'models', 'saved')
@@ -22,13 +23,22 @@ class TrainingService:
 
     @staticmethod
     def run_pipeline(data_file: str, test_size=0.2, n_estimators=100,
-                     learning_rate=0.1, max_depth=3) -> dict:
+                     learning_rate=0.1, max_depth=3, n_workers=None, mode='compare',
+                     time_budget_s=TIME_BUDGET_S, n_configs=N_CONFIGS) -> dict:
         """
         Full pipeline: load → validate → preprocess → engineer → split → compare → save.
 
+        n_workers: CPU budget for the model comparison (default: all cores).
+        mode='search' replaces the fixed-hyperparameter comparison with a
+        successive-halving search (pipeline/hyperparameter_search.py) that
+        stops after time_budget_s; its winning config and leaderboard are
+        saved with the model metadata.
+
         Returns:
             dict with metrics, comparison, saved info, timing.
         """
+        if mode not in ('compare', 'search'):
+            raise ValueError(f"Unknown training mode '{mode}' (expected 'compare' or 'search')")
         start = time.time()
 
         # Load & preprocess
@@ -43,14 +53,24 @@ class TrainingService:
         # Split
         splits = split_data(X, y, test_size=test_size)
 
-        # Compare models
-        comparison = compare_models(
-            splits['X_train'], splits['y_train'],
-            splits['X_test'], splits['y_test'],
-            n_estimators=n_estimators,
-            learning_rate=learning_rate,
-            max_depth=max_depth
-        )
+        # Compare models (or search their hyperparameters)
+        if mode == 'search':
+            comparison = search_models(
+                splits['X_train'], splits['y_train'],
+                splits['X_test'], splits['y_test'],
+                time_budget_s=time_budget_s,
+                n_configs=n_configs,
+                n_workers=n_workers
+            )
+        else:
+            comparison = compare_models(
+                splits['X_train'], splits['y_train'],
+                splits['X_test'], splits['y_test'],
+                n_estimators=n_estimators,
+                learning_rate=learning_rate,
+                max_depth=max_depth,
+                n_workers=n_workers
+            )
 
         # Train anomaly model on full data
         from sklearn.ensemble import IsolationForest
@@ -64,7 +84,9 @@ class TrainingService:
                 **comparison['best_metrics'],
                 'features': feature_names,
                 'samples': len(df),
-                'best_model': comparison['best_model_name']
+                'best_model': comparison['best_model_name'],
+                'mode': mode,
+                **({'search': comparison['search']} if 'search' in comparison else {})
             }
         )
 
@@ -79,6 +101,8 @@ class TrainingService:
             'best_metrics': comparison['best_metrics'],
             'all_models': comparison['all_models'],
             'all_metrics': comparison['all_metrics'],
+            'parallelism': comparison['parallelism'],
+            'search': comparison.get('search'),
             'feature_importances': comparison.get('feature_importances', {}),
             'feature_names': feature_names,
             'splits': splits,
@@ -0,0 +1,69 @@
+import os
+
+import pandas as pd
+import pytest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from pipeline.aggregates import build_state_aggregates, empty_state_aggregates, STATE_COLUMNS  # noqa: E402
+from tests.test_serving_dataset import talent_frame  # noqa: E402
+
+
+def _old_state_metrics(df, state):
+    """Per-state metrics as the regional endpoints computed them before the aggregate cube."""
+    sub = df[df['state'] == state]
+    top_domain = sub.groupby('domain', observed=True)['skill_score'].mean().idxmax()
+    return {
+        'profiles': len(sub),
+        'digital_divide_pct': sub['digital_access'].isin(['Limited', 'Occasional']).mean() * 100,
+        'learning_deficit_pct': (sub['learning_behavior'] < 40).mean() * 100,
+        'high_skill_low_opp_pct': ((sub['skill_score'] > 70) & (sub['opportunity_level'] == 'Low')).mean() * 100,
+        'high_skill_low_opp_count': len(sub[(sub['skill_score'] > 70) & (sub['opportunity_level'] == 'Low')]),
+        'rural_hidden_pct': len(sub[(sub['area_type'] == 'Rural') & (sub['skill_score'] > 65)]) / len(sub) * 100,
+        'avg_skill': sub['skill_score'].mean(),
+        'innovation_mean': sub['innovation_problem_solving'].mean(),
+        'collaboration_mean': sub['collaboration_community'].mean(),
+        'economic_mean': sub['economic_activity'].mean(),
+        'dominant_domain': sub['domain'].value_counts().index[0],
+        'top_domain': top_domain,
+        'top_domain_avg_skill': sub[sub['domain'] == top_domain]['skill_score'].mean(),
+    }
+
+
+def _serving(df):
+    return api._prepare_serving_frame(df)[0]
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_cube_matches_per_endpoint_computations(seed):
+    df = _serving(talent_frame(1500, seed=seed))
+    states = build_state_aggregates(df)['states']
+    assert list(states.index) == list(df['state'].unique())
+    assert list(states.columns) == STATE_COLUMNS
+    for state in df['state'].unique():
+        row = states.loc[state]
+        for name, expected in _old_state_metrics(df, state).items():
+            if isinstance(expected, str):
+                assert row[name] == expected, (state, name)
+            else:
+                assert row[name] == pytest.approx(expected, rel=1e-6), (state, name)
+
+
+def test_domain_ties_break_alphabetically():
+    # Technology is seen first, but ties with Agriculture & Allied on count and on mean skill
+    df = talent_frame(40)
+    df['state'] = 'Jharkhand'
+    df['domain'] = ['Technology', 'Agriculture & Allied'] * 20
+    df['skill_score'] = 60.0
+    df = _serving(df)
+    row = build_state_aggregates(df)['states'].loc['Jharkhand']
+    old = _old_state_metrics(df, 'Jharkhand')
+    assert row['dominant_domain'] == old['dominant_domain'] == 'Agriculture & Allied'
+    assert row['top_domain'] == old['top_domain'] == 'Agriculture & Allied'
+
+
+def test_empty_and_stateless_frames():
+    assert build_state_aggregates(pd.DataFrame())['rows'] == 0
+    cube = build_state_aggregates(talent_frame(50).drop(columns=['state']))
+    assert cube['states'].empty and list(cube['states'].columns) == STATE_COLUMNS
+    assert set(empty_state_aggregates()) == {'states', 'rows'}
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, IsolationForest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from ml.data_loader import FEATURE_COLUMNS  # noqa: E402
+from ml.feature_spec import compile_feature_spec, ENGINEERED_COLUMNS  # noqa: E402
+
+DOMAINS = ["Retail & Sales", "Agriculture & Allied", "Creative & Media", "Healthcare", "General"]
+
+
+def _records(n=300, seed=3):
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(n):
+        signals = {f: int(v) for f, v in zip(FEATURE_COLUMNS, rng.integers(0, 101, len(FEATURE_COLUMNS)))}
+        if i % 7 == 0:
+            signals.pop('learning_behavior')
+            signals.pop('digital_presence')
+        context = {
+            'area_type': ['Rural', 'Urban', 'Semi-Urban'][i % 3],
+            'digital_access': ['Limited', 'High', 'Regular'][i % 3 - 1],
+            'opportunity_level': ['Low', 'Moderate', 'High'][i % 3],
+            'domain': DOMAINS[i % len(DOMAINS)]
+        }
+        if i % 11 == 0:
+            context = {}
+        records.append({'signals': signals, 'context': context})
+    return records
+
+
+@pytest.fixture(params=['gradient_boosting', 'hist_gradient_boosting'])
+def trained_model(monkeypatch, request):
+    """Small model on the full trained feature set (base + engineered)."""
+    rng = np.random.default_rng(0)
+    spec = compile_feature_spec(FEATURE_COLUMNS + ENGINEERED_COLUMNS)
+    X = spec.transform_batch([
+        {f: float(v) for f, v in zip(FEATURE_COLUMNS, row)}
+        for row in rng.integers(0, 101, (600, len(FEATURE_COLUMNS)))
+    ])
+    y = X[:, :8].mean(axis=1) * 1.3 - 5 + rng.normal(0, 3, 600)
+    monkeypatch.setattr(api, 'MODEL_STATE', dict(api.MODEL_STATE))
+    model = (GradientBoostingRegressor(n_estimators=40, random_state=0) if request.param == 'gradient_boosting'
+             else HistGradientBoostingRegressor(max_iter=40, random_state=0))
+    api._activate_model(
+        model.fit(X, y),
+        IsolationForest(contamination=0.1, random_state=0).fit(X),
+        spec.feature_names, 90.0
+    )
+
+
+def test_batch_matches_single_predictions(trained_model):
+    records = _records()
+    client = api.app.test_client()
+    batch = client.post('/api/predict/batch', json={'records': records}).get_json()
+    assert batch['count'] == len(records)
+    for record, result in zip(records, batch['results']):
+        single = client.post('/api/predict', json=record).get_json()
+        assert 'fallback' not in single
+        assert result == single
+    # Compiled scoring, TreeSHAP and importance-based factors for every supported model
+    assert api.MODEL_STATE['compiled_model'] is not None and api.MODEL_STATE['explainer'] is not None
+    for result in batch['results']:
+        assert 'feature_attributions' in result['explanations']
+        assert result['explanations']['top_positive_factors'] != ["Experience consistency"]     # not the fallback
+
+
+def test_batch_rejects_malformed_input():
+    client = api.app.test_client()
+    assert client.post('/api/predict/batch', json={'records': []}).status_code == 400
+    assert client.post('/api/predict/batch', json={'records': [1, 2]}).status_code == 400
+
+
+def test_top_factors_come_from_tree_shap(trained_model):
+    from services.prediction_service import PredictionService
+
+    signals = {f: 20 + 7 * i for i, f in enumerate(FEATURE_COLUMNS)}
+    _, _, explanations = api.predict_skill(signals)
+    contributions = explanations['feature_attributions']['contributions']
+    ranked = sorted(contributions.items(), key=lambda item: item[1], reverse=True)
+    top = [c['feature'] for c in explanations['top_positive']]
+    assert top == [name for name, value in ranked[:len(top)] if round(value, 1) > 0]
+    assert all(c['impact'] == round(contributions[c['feature']], 1) for c in explanations['top_negative'])
+
+    service = PredictionService.predict(api.MODEL_STATE, signals)['explanations']
+    assert service['feature_attributions'] == explanations['feature_attributions']
+    assert [c['feature'] for c in service['top_positive']][:len(top)] == top
+
+
+def test_top_factors_fall_back_to_importances_without_explainer(trained_model):
+    api.MODEL_STATE['explainer'] = None
+    _, _, explanations = api.predict_skill({'creation_output': 95, 'learning_behavior': 5})
+    assert 'feature_attributions' not in explanations
+    assert explanations['top_positive'][0]['feature'] in api.BASE_FEATURE_COLUMNS
+    records = [{'signals': {'creation_output': 95, 'learning_behavior': 5}, 'context': {}}]
+    batch = api.app.test_client().post('/api/predict/batch', json={'records': records}).get_json()
+    single = api.app.test_client().post('/api/predict', json=records[0]).get_json()
+    assert batch['results'][0]['explanations'] == single['explanations']
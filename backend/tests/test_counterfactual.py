@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, IsolationForest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from ml.data_loader import FEATURE_COLUMNS  # noqa: E402
+from ml.feature_spec import compile_feature_spec, ENGINEERED_COLUMNS  # noqa: E402
+from services.counterfactual import ACTIONABILITY  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    rng = np.random.default_rng(0)
+    spec = compile_feature_spec(FEATURE_COLUMNS + ENGINEERED_COLUMNS)
+    X = spec.transform_batch([
+        {f: float(v) for f, v in zip(FEATURE_COLUMNS, row)}
+        for row in rng.integers(0, 101, (600, len(FEATURE_COLUMNS)))
+    ])
+    y = X[:, :8].mean(axis=1) * 1.3 - 5 + rng.normal(0, 3, 600)
+    monkeypatch.setattr(api, 'MODEL_STATE', dict(api.MODEL_STATE))
+    api._activate_model(
+        GradientBoostingRegressor(n_estimators=40, random_state=0).fit(X, y),
+        IsolationForest(contamination=0.1, random_state=0).fit(X),
+        spec.feature_names, 90.0
+    )
+    return api.app.test_client()
+
+
+def _signals(value=40):
+    return {f: value for f in FEATURE_COLUMNS}
+
+
+def _apply(signals, changes):
+    out = dict(signals)
+    for change in changes:
+        out[change['feature']] = change['to']
+    return out
+
+
+def test_change_reaches_next_level(client):
+    signals = _signals()
+    result = client.post('/api/counterfactual', json={'signals': signals}).get_json()
+    before = client.post('/api/predict', json={'signals': signals}).get_json()['core']
+    assert result['current']['level'] == before['level'] == 'Intermediate'
+    assert result['found'] and result['target'] == {'level': 'Advanced', 'score_above': 60}
+    assert result['candidates_evaluated'] > 1000
+
+    after = client.post('/api/predict', json={'signals': _apply(signals, result['changes'])}).get_json()['core']
+    assert after['level'] == 'Advanced' == result['predicted']['level']
+    for change in result['changes']:
+        assert 0 < change['delta'] <= ACTIONABILITY[change['feature']]['max_increase']
+    assert result['effort'] == pytest.approx(
+        sum(ACTIONABILITY[c['feature']]['cost'] * abs(c['delta']) for c in result['changes']), abs=0.01)
+
+    # No single-signal move that crosses is cheaper
+    model = api.MODEL_STATE['skill_model']
+    spec = api.MODEL_STATE['feature_spec']
+    for name, rule in ACTIONABILITY.items():
+        for delta in range(1, rule['max_increase'] + 1):
+            if model.predict(spec.transform(dict(signals, **{name: 40 + delta})))[0] > 60:
+                assert result['effort'] <= rule['cost'] * delta + 1e-9
+                break
+
+    for alternative in result['alternatives']:
+        assert alternative['effort'] >= result['effort']
+        assert alternative['predicted']['level'] == 'Advanced'
+
+
+def test_constraints_are_honoured(client):
+    signals = _signals(45)
+    constraints = {'digital_presence': {'mutable': False}, 'learning_hours': {'max_increase': 5},
+                   'projects': {'max': 50}}
+    result = client.post('/api/counterfactual', json={'signals': signals, 'constraints': constraints}).get_json()
+    for option in [result] + result['alternatives']:
+        moved = {c['feature']: c for c in option['changes']}
+        assert 'digital_presence' not in moved
+        assert moved.get('learning_hours', {'delta': 0})['delta'] <= 5
+        assert moved.get('projects', {'to': 45})['to'] <= 50
+        assert moved.get('experience_consistency', {'delta': 0})['delta'] <= 5
+
+
+def test_unreachable_and_top_level(client):
+    frozen = {f: {'mutable': False} for f in FEATURE_COLUMNS}
+    result = client.post('/api/counterfactual', json={'signals': _signals(), 'constraints': frozen}).get_json()
+    assert not result['found'] and result['changes'] == [] and 'message' in result
+
+    top = client.post('/api/counterfactual', json={'signals': _signals(95)}).get_json()
+    assert top['current']['level'] == 'Expert'
+    assert not top['found'] and top['target'] is None
+
+
+def test_invalid_requests(client):
+    assert client.post('/api/counterfactual', json={'signals': 5}).status_code == 400
+    assert client.post('/api/counterfactual', json={'signals': {'projects': 'many'}}).status_code == 400
+    assert client.post('/api/counterfactual',
+                       json={'signals': _signals(), 'target_level': 'Guru'}).status_code == 400
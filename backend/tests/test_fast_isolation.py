@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import IsolationForest, RandomForestRegressor
+
+from ml.fast_isolation import CompiledIsolationForest, _average_path_length
+from ml.model_manager import compile_anomaly_model
+
+
+def _data(n=2000, d=9, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(50, 15, (n, d))
+    X_test = np.vstack([rng.normal(50, 15, (600, d)), rng.uniform(-60, 160, (200, d))])
+    return X, X_test
+
+
+@pytest.mark.parametrize('model', [
+    IsolationForest(contamination=0.03, random_state=0),
+    IsolationForest(n_estimators=40, max_samples=64, random_state=1),
+    IsolationForest(n_estimators=30, max_samples=1000, max_features=0.5, contamination=0.1, random_state=2),
+    IsolationForest(n_estimators=25, max_features=3, bootstrap=True, random_state=3),
+])
+def test_scores_and_decisions_match_sklearn(model):
+    X, X_test = _data()
+    model.fit(X)
+    compiled = CompiledIsolationForest.from_sklearn(model)
+
+    np.testing.assert_array_equal(compiled.score_samples(X_test), model.score_samples(X_test))
+    np.testing.assert_array_equal(compiled.decision_function(X_test), model.decision_function(X_test))
+    np.testing.assert_array_equal(compiled.predict(X_test), model.predict(X_test))
+    expected = model.score_samples(X_test)
+    for i in range(0, len(X_test), 25):
+        assert compiled.score_one(X_test[i]) == (expected[i], expected[i] - model.offset_ < 0)
+
+
+def test_average_path_length_matches_sklearn():
+    from sklearn.ensemble._iforest import _average_path_length as sk_apl
+    n = np.array([0, 1, 2, 3, 10, 255, 256, 100000])
+    np.testing.assert_array_equal(_average_path_length(n), sk_apl(n))
+
+
+def test_compile_anomaly_model_rejects_other_models():
+    X, _ = _data(n=200)
+    assert compile_anomaly_model(RandomForestRegressor(n_estimators=3).fit(X, X[:, 0])) is None
+    assert compile_anomaly_model(None) is None
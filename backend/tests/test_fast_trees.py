@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import (GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor,
+                              ExtraTreesRegressor)
+from sklearn.linear_model import LinearRegression
+
+from ml.fast_trees import CompiledTreeEnsemble
+from ml.model_manager import compile_model
+
+
+def _data(n=1500, d=9, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 100, (n, d))
+    y = X[:, 0] * 0.6 + np.sin(X[:, 1] / 9) * 20 + rng.normal(0, 4, n)
+    return X, y, rng.uniform(-10, 110, (800, d))
+
+
+@pytest.mark.parametrize('model', [
+    GradientBoostingRegressor(random_state=0),
+    GradientBoostingRegressor(n_estimators=60, max_depth=5, learning_rate=0.3, init='zero', random_state=0),
+    RandomForestRegressor(n_estimators=30, random_state=0),
+    RandomForestRegressor(n_estimators=40, max_depth=3, random_state=0),
+    ExtraTreesRegressor(n_estimators=20, min_samples_leaf=3, random_state=0),
+    HistGradientBoostingRegressor(max_iter=80, max_depth=4, random_state=0),
+])
+def test_compiled_matches_sklearn(model):
+    X, y, X_test = _data()
+    model.fit(X, y)
+    compiled = CompiledTreeEnsemble.from_sklearn(model)
+    expected = model.predict(X_test)
+
+    np.testing.assert_allclose(compiled.predict(X_test), expected, rtol=0, atol=1e-9)
+    for i in range(0, len(X_test), 40):
+        assert compiled.predict_one(X_test[i]) == pytest.approx(expected[i], abs=1e-9)
+    if isinstance(model, (GradientBoostingRegressor, HistGradientBoostingRegressor)):
+        # Same stage-by-stage accumulation as sklearn
+        np.testing.assert_array_equal(compiled.predict(X_test), expected)
+
+
+def test_missing_values_follow_sklearn():
+    X, y, X_test = _data(seed=1)
+    X[::7, 2] = np.nan
+    X_test[::3, 2] = np.nan
+    for model in (RandomForestRegressor(n_estimators=15, random_state=0), HistGradientBoostingRegressor(random_state=0)):
+        model.fit(X, y)
+        compiled = CompiledTreeEnsemble.from_sklearn(model)
+        np.testing.assert_allclose(compiled.predict(X_test), model.predict(X_test), rtol=0, atol=1e-9)
+
+
+def test_unsupported_models_are_not_compiled():
+    X, y, _ = _data()
+    assert compile_model(LinearRegression().fit(X, y)) is None
+    assert compile_model(HistGradientBoostingRegressor(loss='poisson', max_iter=5).fit(X, np.abs(y))) is None
+    with pytest.raises(ValueError):
+        CompiledTreeEnsemble.from_sklearn(RandomForestRegressor(n_estimators=3).fit(X, y)).predict(X[:, :4])
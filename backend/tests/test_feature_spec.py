@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.data_loader import FEATURE_COLUMNS, SOCIO_ECONOMIC_DEFAULTS
+from ml.preprocessing import feature_engineering, get_feature_matrix
+from ml.feature_spec import FeatureSpec, compile_feature_spec
+
+
+def _profiles(n=500, seed=7):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.integers(0, 101, (n, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS).astype(float)
+    df.iloc[::2, :8] += rng.uniform(0, 1, (len(df.iloc[::2]), 8)).round(2)
+    df['internet_penetration'] = rng.uniform(20, 95, n).round(1)
+    df['urban_population_percent'] = rng.uniform(15, 85, n).round(1)
+    df['per_capita_income'] = rng.uniform(30000, 350000, n).round(0)
+    df['workforce_participation'] = rng.uniform(30, 75, n).round(1)
+    df['literacy_rate'] = rng.uniform(55, 98, n).round(1)
+    df['unemployment_rate'] = rng.uniform(2, 25, n).round(1)
+    df['skill_score'] = 50
+    return df
+
+
+def test_spec_matches_feature_engineering_exactly():
+    df = _profiles()
+    expected, _, names = get_feature_matrix(feature_engineering(df.copy()))
+    spec = compile_feature_spec(names)
+    records = df.drop(columns=['skill_score']).to_dict('records')
+
+    np.testing.assert_array_equal(spec.transform_batch(records), expected.to_numpy())
+    for i in range(len(records)):
+        np.testing.assert_array_equal(spec.transform(records[i])[0], expected.to_numpy()[i])
+
+
+def test_missing_inputs_take_defaults():
+    spec = compile_feature_spec(['projects', 'opportunity_gap', 'behavioral_avg'])
+    row = spec.transform({'creation_output': 80})
+    gap = SOCIO_ECONOMIC_DEFAULTS['literacy_rate'] - SOCIO_ECONOMIC_DEFAULTS['unemployment_rate']
+    assert row.tolist() == [[0.0, gap, 10.0]]
+    assert spec.transform_batch([{'creation_output': 80}, {}]).tolist() == [[0.0, gap, 10.0], [0.0, gap, 0.0]]
+
+
+def test_unknown_feature_is_rejected():
+    with pytest.raises(ValueError):
+        FeatureSpec(FEATURE_COLUMNS + ['Literacy_Rate'])
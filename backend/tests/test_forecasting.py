@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline.skill_history import decode_skill_history
+from pipeline import forecasting
+from pipeline.forecasting import fit_linear, fit_damped_trend, build_forecasts, get_forecasts, HOLT_DAMPING
+
+
+def _histories(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        length = 24 if i % 4 else int(rng.integers(3, 24))
+        rows.append(json.dumps(list(np.round(50 + np.cumsum(rng.normal(0.5, 1.5, length)), 2))))
+    return pd.Series(rows)
+
+
+def _holt_reference(y, alpha, beta, phi):
+    level, trend, sse = y[1], y[1] - y[0], 0.0
+    for value in y[2:]:
+        forecast = level + phi * trend
+        err = value - forecast
+        sse += err ** 2
+        level = forecast + alpha * err
+        trend = phi * trend + alpha * beta * err
+    return level, trend, sse
+
+
+def test_decode_right_aligns_and_masks_short_histories():
+    history = decode_skill_history(pd.Series(['[1, 2, 3]', None, 'not json', json.dumps(list(range(30)))]))
+    assert history['lengths'].tolist() == [3, 0, 0, 24]
+    assert history['values'][0, -3:].tolist() == [1, 2, 3]
+    assert not history['mask'][0, :-3].any() and not history['mask'][1].any()
+    assert history['values'][3, 0] == 6 and history['values'][3, -1] == 29
+
+
+def test_linear_fit_matches_polyfit():
+    series = _histories()
+    history = decode_skill_history(series)
+    fit = fit_linear(history)
+    for i, text in enumerate(series):
+        y = np.array(json.loads(text), dtype=np.float32).astype(np.float64)
+        slope, intercept = np.polyfit(np.arange(len(y)), y, 1)
+        assert np.isclose(fit['slope'][i], slope)
+        assert np.isclose(fit['mean'][i, 0], intercept + slope * (len(y) - 1 + 3))
+
+
+def test_damped_trend_matches_scalar_recursion():
+    series = _histories()
+    history = decode_skill_history(series)
+    fit = fit_damped_trend(history)
+    for i, text in enumerate(series):
+        y = np.array(json.loads(text), dtype=np.float32).astype(np.float64)
+        level, trend, _ = _holt_reference(y, fit['alpha'][i], fit['beta'][i], HOLT_DAMPING)
+        assert np.isclose(fit['trend'][i], trend)
+        expected = level + sum(HOLT_DAMPING ** k for k in range(1, 4)) * trend
+        assert np.isclose(fit['mean'][i, 0], expected)
+
+
+def test_build_forecasts_groups_every_level():
+    series = _histories()
+    history = decode_skill_history(series)
+    states = pd.Series(['A', 'B'] * 20)
+    domains = pd.Series(['X'] * 20 + ['Y'] * 20)
+    result = build_forecasts(history, states, domains)
+    by_domain = result['methods']['linear']['domain']
+    assert set(by_domain) == {'X', 'Y'}
+    assert sum(v['profiles'] for v in by_domain.values()) == 40
+    assert set(result['methods']['damped_trend']['state_domain']) == {('A', 'X'), ('B', 'X'), ('A', 'Y'), ('B', 'Y')}
+    band = by_domain['X']['projections']['12m']
+    assert band['lower'] <= band['forecast'] <= band['upper']
+
+
+def test_get_forecasts_fits_once_per_version(monkeypatch):
+    monkeypatch.setattr(forecasting, '_CACHE', (None, None))
+    calls = []
+
+    def slow_build(history, states, domains):
+        calls.append(history)
+        time.sleep(0.05)
+        return {'fitted_for': history}
+
+    monkeypatch.setattr(forecasting, 'build_forecasts', slow_build)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_forecasts(1, 'v1', None, None)))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == ['v1'] and all(r is results[0] for r in results)
+    assert get_forecasts(2, 'v2', None, None) == {'fitted_for': 'v2'}
+    assert forecasting._CACHE == (2, {'fitted_for': 'v2'}) and calls == ['v1', 'v2']
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.hyperparameter_search import search_models, rung_rows, sample_configs, build_model, choose_refit
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+
+
+def _splits(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((n, 5)) * 100, columns=[f'f{i}' for i in range(5)])
+    y = pd.Series(X['f0'] * 0.4 + X['f1'] * 0.3 + rng.normal(0, 3, n))
+    cut = int(n * 0.8)
+    return X.iloc[:cut], y.iloc[:cut], X.iloc[cut:], y.iloc[cut:]
+
+
+def test_rungs_and_configs():
+    assert rung_rows(9000) == [1000, 3000, 9000]
+    assert rung_rows(9000, n_configs=9) == [3000, 9000]
+    assert rung_rows(300) == [200, 200, 300]
+    configs = sample_configs(6, seed=1)
+    assert configs == sample_configs(6, seed=1)
+    assert {c['model'] for c in configs} == {'gradient_boosting', 'hist_gradient_boosting', 'random_forest'}
+    for config in configs:
+        build_model(config)     # every sampled config is a valid estimator
+
+
+def test_search_promotes_and_refits():
+    result = search_models(*_splits(), time_budget_s=120, n_configs=9, n_workers=2)
+    search = result['search']
+    assert not search['stopped_by_budget']
+    assert search['rungs'] == [426, 1280] and search['evaluated'] == 9 + 3
+    leaderboard = search['leaderboard']
+    assert [e['rung'] for e in leaderboard] == [1] * 3 + [0] * 9
+    best = search['best_config']
+    assert (best['config_id'], best['val_r2'], best['rows']) == \
+        (leaderboard[0]['config_id'], leaderboard[0]['val_r2'], 1280)
+    # Promoted configs are the best third of rung 0
+    rung0 = sorted((e for e in leaderboard if e['rung'] == 0), key=lambda e: -e['val_r2'])
+    assert {e['config_id'] for e in rung0[:3]} == {e['config_id'] for e in leaderboard[:3]}
+    assert result['best_model_key'] == best['model'] and result['best_metrics']['r2_score'] > 0.8
+
+
+def test_search_stops_at_budget():
+    result = search_models(*_splits(), time_budget_s=0.01, n_configs=9, n_workers=1)
+    search = result['search']
+    assert search['stopped_by_budget'] and search['elapsed_seconds'] < 5
+    assert search['overrun_seconds'] > 0
+    assert search['overrun_seconds'] == pytest.approx(search['total_seconds'] - 0.01, abs=1e-3)
+    assert result['best_model'] is not None and result['best_metrics']['r2_score'] > 0.8
+
+
+def test_refit_choice_respects_remaining_time():
+    scores = {0: 0.9, 1: 0.8, 2: 0.7}
+    leaderboard = [{'config_id': 0, 'rows': 100, 'fit_seconds': 0.5}, {'config_id': 0, 'rows': 1000, 'fit_seconds': 8.0},
+                   {'config_id': 1, 'rows': 1000, 'fit_seconds': 1.0}, {'config_id': 2, 'rows': 1000, 'fit_seconds': 0.5}]
+    # Estimates on 3000 rows: 24s, 3s, 1.5s
+    assert choose_refit(scores, leaderboard, 3000, 30) == (0, 24.0)
+    assert choose_refit(scores, leaderboard, 3000, 10) == (1, 3.0)
+    assert choose_refit(scores, leaderboard, 3000, 1) == (2, 1.5)        # nothing fits: the fastest
+
+
+@pytest.mark.parametrize('body', [{'mode': 'grid'}, {'mode': 'search', 'time_budget_s': 0},
+                                  {'mode': 'search', 'n_configs': 'many'}])
+def test_train_model_rejects_bad_search_requests(body):
+    assert api.app.test_client().post('/api/train-model', json=body).status_code == 400
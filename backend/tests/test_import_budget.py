@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only the training endpoints need; the serving path must not import them
+TRAINING_MODULES = ('sklearn', 'ml.model_training', 'pipeline.model_training', 'pipeline.hyperparameter_search',
+                    'services.training_service')
+# Cumulative `import api` time under -X importtime; override on slow CI hosts
+IMPORT_BUDGET_MS = float(os.environ.get('SKILLGENOME_IMPORT_BUDGET_MS', '1500'))
+
+
+def _run(statement, *flags):
+    """Run a statement in a fresh interpreter with the startup warm-up disabled."""
+    env = {**os.environ, 'SKILLGENOME_WARMUP': 'off'}
+    proc = subprocess.run(
+        [sys.executable, *flags, '-c', statement],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return proc
+
+
+def _import_profile():
+    """{module: cumulative µs} for `import api`, parsed from -X importtime."""
+    profile = {}
+    for line in _run('import api', '-X', 'importtime').stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def test_serving_import_skips_training_modules():
+    modules = _run('import sys, api; print("\\n".join(sys.modules))').stdout.split()
+    loaded = [m for m in modules if m.split('.')[0] == 'sklearn' or m in TRAINING_MODULES]
+    assert loaded == []
+
+
+def test_serving_import_within_budget():
+    elapsed_ms = _import_profile()['api'] / 1000
+    assert elapsed_ms < IMPORT_BUDGET_MS, f"import api took {elapsed_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+
+def test_training_exports_resolve_lazily():
+    import ml
+    import pipeline
+    import services
+    from ml.model_training import train_model
+    from pipeline.hyperparameter_search import search_models
+
+    assert ml.train_model is train_model and 'train_model' in vars(ml)      # cached after the first lookup
+    assert pipeline.search_models is search_models and 'search_models' in dir(pipeline)
+    assert services.TrainingService.__name__ == 'TrainingService'
+    with pytest.raises(AttributeError, match="module 'ml' has no attribute 'not_an_export'"):
+        ml.not_an_export
@@ -0,0 +1,145 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import r2_score
+
+from ml.incremental import feature_profile, drift_report, plan_incremental, warm_start, stage_count
+from ml.model_training import incremental_update
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+
+NAMES = ['a', 'b', 'c']
+
+
+def _data(n, seed=0, shift=0.0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(50, 10, (n, 3))
+    X[:, 2] += shift
+    return X, X[:, 0] * 0.5 - X[:, 1] * 0.2 + rng.normal(0, 1, n)
+
+
+def test_drift_report():
+    X, _ = _data(5000)
+    profile = feature_profile(X, NAMES, base_stages=50)
+    assert profile['base_stages'] == 50 and len(profile['features']['a']['expected']) == 10
+    same = drift_report(profile, _data(3000, seed=1)[0], NAMES)
+    assert same['drifted'] == [] and same['max_psi'] < 0.05
+    shifted = drift_report(profile, _data(3000, seed=1, shift=8)[0], NAMES)
+    assert shifted['drifted'] == ['c'] and shifted['psi']['c'] > 0.2
+    assert drift_report(profile, X, ['a', 'b', 'new'])['drifted'] == ['new']
+
+
+def test_warm_start_keeps_old_stages_and_improves():
+    X, y = _data(2000)
+    model = GradientBoostingRegressor(n_estimators=30, random_state=0).fit(X, y)
+    before = model.predict(X)
+    X2, y2 = _data(2500, seed=3)
+    X_test, y_test = _data(2000, seed=9)
+    updated = warm_start(model, X2, y2, extra_stages=20)
+    assert stage_count(model) == 30 and stage_count(updated) == 50 and not updated.warm_start
+    np.testing.assert_array_equal(model.predict(X), before)     # active model untouched
+    # The first 30 stages of the update are the old model, unchanged
+    np.testing.assert_allclose(list(updated.staged_predict(X))[29], before)
+    assert r2_score(y_test, updated.predict(X_test)) > r2_score(y_test, model.predict(X_test))
+
+
+def test_hist_gradient_boosting_is_not_warm_started():
+    X, y = _data(2000)
+    model = HistGradientBoostingRegressor(max_iter=30, random_state=0).fit(X, y)
+    profile = feature_profile(X, NAMES, stage_count(model))
+    plan = plan_incremental(model, profile, _data(2500, seed=1)[0], NAMES, NAMES)
+    assert plan['mode'] == 'full' and "can't be warm-started" in plan['reason']
+    with pytest.raises(TypeError):
+        warm_start(model, X, y)
+
+
+def test_plan_incremental():
+    X, y = _data(2000)
+    model = GradientBoostingRegressor(n_estimators=30, random_state=0).fit(X, y)
+    profile = feature_profile(X, NAMES, stage_count(model))
+    assert plan_incremental(model, profile, _data(2500, seed=1)[0], NAMES, NAMES)['mode'] == 'incremental'
+    plan = plan_incremental(model, profile, _data(2500, seed=1, shift=8)[0], NAMES, NAMES)
+    assert plan['mode'] == 'full' and 'drift' in plan['reason'] and plan['drift']['drifted'] == ['c']
+    assert plan_incremental(model, None, X, NAMES)['reason'].startswith('no feature profile')
+    assert plan_incremental(model, profile, X, NAMES, ['a', 'b'])['reason'] == 'feature set changed'
+    assert plan_incremental(model, profile, X, NAMES, extra_stages=100)['reason'].startswith('stage cap')
+    forest = RandomForestRegressor(n_estimators=5).fit(X, y)
+    assert plan_incremental(forest, profile, X, NAMES)['mode'] == 'full'
+
+
+def test_incremental_update_result():
+    X, y = _data(2000)
+    X = pd.DataFrame(X, columns=NAMES)
+    model = GradientBoostingRegressor(n_estimators=30, random_state=0).fit(X, y)
+    result = incremental_update(model, X.iloc[:1600], pd.Series(y[:1600]), X.iloc[1600:], pd.Series(y[1600:]),
+                                extra_stages=10, n_workers=1)
+    assert (result['stages_before'], result['stages_after']) == (30, 40)
+    assert result['best_model_key'] == 'gradient_boosting' and result['best_metrics']['r2_score'] > 0.8
+
+
+def _real_csv(path, n, seed=0, shift=0.0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.uniform(10, 90, n) for col in api.FEATURE_COLUMNS})
+    df[api.FEATURE_COLUMNS[0]] += shift
+    df[api.TARGET_COLUMN] = 20 - df[api.FEATURE_COLUMNS[0]] * 0.1 - df[api.FEATURE_COLUMNS[1]] * 0.05 + rng.normal(0, 0.5, n)
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+def test_real_pipeline_incremental_and_fallback(monkeypatch, tmp_path):
+    monkeypatch.setattr(api, 'REAL_MODEL_STATE', dict(api.REAL_MODEL_STATE))
+    for name in ('REAL_GBR_PATH', 'REAL_ISO_PATH', 'REAL_SCALER_PATH', 'REAL_PROFILE_PATH'):
+        monkeypatch.setattr(api, name, str(tmp_path / name.lower()))
+    monkeypatch.setattr(api, 'MODEL_GENERATION_PATHS', {kind: str(tmp_path / f'{kind}_generation.json')
+                                                         for kind in ('skill', 'real')})
+    monkeypatch.setattr(api, 'MODEL_GENERATIONS', dict(api.MODEL_GENERATIONS))
+    monkeypatch.setattr(api, '_model_sensitivity', lambda *args, **kwargs: None)
+
+    api._run_training_pipeline(_real_csv(tmp_path / 'v1.csv', 1500), mode='incremental')
+    assert api.REAL_MODEL_STATE['training_mode']['mode'] == 'full'        # nothing to warm-start yet
+    assert api.REAL_MODEL_STATE['training_mode']['stages'] == 150
+    scaler = api.REAL_MODEL_STATE['scaler']
+
+    # Over HTTP: /api/train-model dispatches {"model": "real"} to the real-data pipeline
+    monkeypatch.setattr(api, 'REAL_DATA_FILE', _real_csv(tmp_path / 'v2.csv', 1800, seed=1))
+    response = api.app.test_client().post('/api/train-model', json={'model': 'real', 'mode': 'incremental'})
+    assert response.get_json()['status'] == 'success' and response.get_json()['dataset_rows'] == 1800
+    state = api.REAL_MODEL_STATE
+    assert state['training_mode']['mode'] == 'incremental' and state['training_mode']['stages'] == 150 + api.WARM_START_STAGES
+    assert state['scaler'] is scaler
+
+    api._run_training_pipeline(_real_csv(tmp_path / 'v3.csv', 1800, seed=2, shift=40), mode='incremental')
+    assert api.REAL_MODEL_STATE['training_mode']['mode'] == 'full'
+    assert 'drift' in api.REAL_MODEL_STATE['training_mode']['reason']
+
+    # Another worker reloads the saved models in one step: model and scaler never mismatch
+    class RecordingState(dict):
+        def __setitem__(self, key, value):
+            writes.append(key)
+            super().__setitem__(key, value)
+
+        def update(self, *args, **kwargs):
+            writes.append('update')
+            super().update(*args, **kwargs)
+
+    writes = []
+    installed = dict(api.REAL_MODEL_STATE)
+    monkeypatch.setattr(api, 'REAL_MODEL_STATE', RecordingState(api.REAL_MODEL_STATE, model=None, scaler=None))
+    api.MODEL_GENERATIONS['real'] = None
+    api.sync_models()
+    state = api.REAL_MODEL_STATE
+    assert writes == ['update'] and state['version'] == installed['version'] + 1
+    assert state['model'] is not None and state['scaler'] is not None
+    assert state['training_mode'] == installed['training_mode'] and state['dataset_rows'] == 1800
+
+
+def test_train_model_route_dispatches_on_model():
+    adapter = api.app.url_map.bind('localhost')
+    assert adapter.match('/api/train-model', method='POST') == ('api_train_model', {})
+    assert len([r for r in api.app.url_map.iter_rules() if r.rule == '/api/train-model']) == 1
+    response = api.app.test_client().post('/api/train-model', json={'model': 'nope'})
+    assert response.status_code == 400
@@ -0,0 +1,141 @@
+import threading
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, IsolationForest
+
+from ml.model_manager import compile_model, compile_anomaly_model
+from services.micro_batching import MicroBatcher
+
+
+def _score_rows(models, X):
+    model, anomaly_model = models
+    return list(zip(model.predict(X).tolist(), (anomaly_model.predict(X) == -1).tolist()))
+
+
+@pytest.fixture(scope='module')
+def models():
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (800, 6))
+    y = X[:, 0] * 0.5 + X[:, 1] * 0.2 + rng.normal(0, 3, 800)
+    gbr = GradientBoostingRegressor(n_estimators=30, random_state=0).fit(X, y)
+    iso = IsolationForest(n_estimators=30, contamination=0.1, random_state=0).fit(X)
+    return gbr, iso, rng.uniform(-20, 120, (64, 6))
+
+
+def _submit_concurrently(batcher, rows, models):
+    results = [None] * len(rows)
+    barrier = threading.Barrier(len(rows))
+
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.submit(rows[i], models)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(rows))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_requests_are_coalesced(models):
+    gbr, iso, rows = models
+    snapshot = (compile_model(gbr), compile_anomaly_model(iso))
+    batcher = MicroBatcher(_score_rows, window_ms=50, max_rows=16, name='test')
+
+    results = _submit_concurrently(batcher, rows[:32], snapshot)
+
+    for row, (score, is_anomaly) in zip(rows[:32], results):
+        assert score == snapshot[0].predict_one(row)
+        assert is_anomaly == snapshot[1].score_one(row)[1]
+    metrics = batcher.metrics()
+    assert metrics['requests'] == 32
+    assert metrics['batches'] < 32 and metrics['mean_batch_size'] > 1
+    assert sum(metrics['batch_size_histogram'].values()) == metrics['batches']
+    assert metrics['queue_delay_ms']['max'] >= 0
+
+
+def test_rows_are_grouped_by_model_snapshot(models):
+    gbr, iso, rows = models
+    compiled = (compile_model(gbr), compile_anomaly_model(iso))
+    calls = []
+
+    def score(snapshot, X):
+        calls.append((snapshot, len(X)))
+        return _score_rows(snapshot, X)
+
+    batcher = MicroBatcher(score, window_ms=50, max_rows=64)
+    snapshots = [compiled if i % 2 else (gbr, iso) for i in range(16)]
+    results = [None] * 16
+    barrier = threading.Barrier(16)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = batcher.submit(rows[i], snapshots[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    expected = gbr.predict(rows[:16])
+    np.testing.assert_allclose([r[0] for r in results], expected, rtol=0, atol=1e-9)
+    assert {s for s, _ in calls} == {compiled, (gbr, iso)}
+
+
+def test_errors_reach_every_waiting_request():
+    def fail(models, X):
+        raise ValueError('bad batch')
+
+    batcher = MicroBatcher(fail, window_ms=20, max_rows=8)
+    errors = []
+
+    def worker():
+        try:
+            batcher.submit(np.zeros(3), 'm')
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == ['bad batch'] * 4
+    assert batcher.metrics()['errors'] >= 1
+
+
+def test_disabled_batcher_scores_directly(models):
+    gbr, iso, rows = models
+    batcher = MicroBatcher(_score_rows, window_ms=0)
+    assert not batcher.enabled
+    assert batcher.submit(rows[0], (gbr, iso))[0] == gbr.predict(rows[:1])[0]
+    assert batcher.metrics()['batches'] == 0
+
+
+def test_scoring_thread_survives_a_broken_batch(models):
+    gbr, iso, rows = models
+    batcher = MicroBatcher(_score_rows, window_ms=5, max_rows=8)
+    with pytest.raises(TypeError):
+        batcher.submit(rows[0], [gbr, iso])                  # unhashable snapshot: grouping fails
+    thread = batcher._thread
+    assert batcher.submit(rows[0], (gbr, iso))[0] == gbr.predict(rows[:1])[0]
+    assert batcher._thread is thread and thread.is_alive() and batcher.metrics()['errors'] == 1
+
+
+def test_stuck_batch_falls_back_to_direct_scoring(models):
+    gbr, iso, rows = models
+    release = threading.Event()
+
+    def score(snapshot, X):
+        if threading.current_thread().name.startswith('microbatch'):
+            release.wait(10)                                 # the scoring thread hangs
+        return _score_rows(snapshot, X)
+
+    batcher = MicroBatcher(score, window_ms=5, max_rows=8, timeout_ms=50)
+    try:
+        assert batcher.submit(rows[0], (gbr, iso))[0] == gbr.predict(rows[:1])[0]
+        assert batcher.metrics()['timeouts'] == 1
+    finally:
+        release.set()
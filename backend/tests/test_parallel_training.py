@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml import model_training as ml_training
+from pipeline import model_training as pipeline_training
+
+
+def _splits(n=1200, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((n, 6)) * 100, columns=[f'f{i}' for i in range(6)])
+    y = pd.Series(X['f0'] * 0.4 + X['f1'] * 0.3 - X['f2'] * 0.1 + rng.normal(0, 3, n))
+    cut = int(n * 0.8)
+    return X.iloc[:cut], y.iloc[:cut], X.iloc[cut:], y.iloc[cut:]
+
+
+def test_worker_budget():
+    assert ml_training.worker_budget(1, 4, 2, 10 ** 6) == (0, 1)
+    assert ml_training.worker_budget(8, 4, 2, 100) == (0, 8)
+    assert ml_training.worker_budget(8, 4, 2, 10 ** 6) == (4, 3)
+    assert ml_training.worker_budget(9, 4, 2, 10 ** 6) == (4, 3)
+    assert ml_training.worker_budget(2, 4, 2, 10 ** 6) == (2, 1)
+
+
+@pytest.mark.parametrize('module', [ml_training, pipeline_training])
+def test_parallel_matches_sequential(module):
+    X_train, y_train, X_test, y_test = _splits()
+    kwargs = dict(n_estimators=20, max_depth=3)
+    sequential = module.compare_models(X_train, y_train, X_test, y_test, n_workers=1, **kwargs)
+    parallel = module.compare_models(X_train, y_train, X_test, y_test, n_workers=3, parallel_min_rows=0, **kwargs)
+
+    assert sequential['parallelism']['processes'] == 0
+    assert parallel['parallelism'] == {**parallel['parallelism'], 'processes': 3, 'threads': 1}
+    assert set(parallel['all_metrics']) == {'linear', 'random_forest', 'gradient_boosting', 'hist_gradient_boosting'}
+    assert parallel['best_model_key'] == sequential['best_model_key']
+    timing = ('fit_seconds', 'cpu_seconds')
+    for key, metrics in sequential['all_metrics'].items():
+        assert all(metrics[t] >= 0 for t in timing)
+        assert {k: v for k, v in metrics.items() if k not in timing} == \
+            {k: v for k, v in parallel['all_metrics'][key].items() if k not in timing}
+        np.testing.assert_array_equal(sequential['trained_models'][key].predict(X_test),
+                                      parallel['trained_models'][key].predict(X_test))
+    assert parallel['trained_models']['random_forest'].n_jobs is None
+
+
+@pytest.mark.parametrize('module', [ml_training, pipeline_training])
+def test_train_model_switches_to_hist_gradient_boosting(module):
+    X_train, y_train, X_test, y_test = _splits()
+    small = module.train_model(X_train, y_train, n_estimators=20, train_anomaly=False, hist_min_rows=len(X_train) + 1)
+    large = module.train_model(X_train, y_train, n_estimators=20, train_anomaly=False, hist_min_rows=len(X_train))
+    assert type(small['skill_model']).__name__ == 'GradientBoostingRegressor'
+    assert type(large['skill_model']).__name__ == 'HistGradientBoostingRegressor'
+    assert module.evaluate_model(large['skill_model'], X_test, y_test)['r2_score'] > 0.8
+    importances = large['feature_importances']
+    assert list(importances) == list(X_train.columns) and sum(importances.values()) == pytest.approx(1, abs=1e-3)
+    assert max(importances, key=importances.get) == 'f0'
@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, IsolationForest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from ml.data_loader import FEATURE_COLUMNS  # noqa: E402
+from ml.feature_spec import compile_feature_spec, ENGINEERED_COLUMNS  # noqa: E402
+from services.prediction_cache import PredictionCache  # noqa: E402
+
+CONTEXT = {'area_type': 'Rural', 'digital_access': 'Limited', 'opportunity_level': 'Low', 'domain': 'Retail & Sales'}
+
+
+def _activate(seed):
+    rng = np.random.default_rng(seed)
+    spec = compile_feature_spec(FEATURE_COLUMNS + ENGINEERED_COLUMNS)
+    X = spec.transform_batch([
+        {f: float(v) for f, v in zip(FEATURE_COLUMNS, row)}
+        for row in rng.integers(0, 101, (400, len(FEATURE_COLUMNS)))
+    ])
+    y = X[:, :8].mean(axis=1) * 1.3 - 5 + rng.normal(0, 3, 400)
+    api._activate_model(
+        GradientBoostingRegressor(n_estimators=20, random_state=seed).fit(X, y),
+        IsolationForest(n_estimators=20, contamination=0.1, random_state=seed).fit(X),
+        spec.feature_names, 90.0
+    )
+
+
+@pytest.fixture
+def cached_api(monkeypatch):
+    monkeypatch.setattr(api, 'MODEL_STATE', dict(api.MODEL_STATE))
+    monkeypatch.setattr(api, 'PREDICT_CACHE', PredictionCache(max_entries=64))
+    _activate(0)
+    return api.app.test_client()
+
+
+def _signals(value=70):
+    return {f: value for f in FEATURE_COLUMNS}
+
+
+def test_repeated_profile_is_served_from_cache(cached_api):
+    record = {'signals': _signals(), 'context': CONTEXT}
+    first = cached_api.post('/api/predict', json=record)
+    second = cached_api.post('/api/predict', json=record)
+    assert second.get_data() == first.get_data()
+    assert api.PREDICT_CACHE.stats()['hits'] == 1
+
+    # Same values sent as floats are echoed differently, so they get their own entry
+    floats = {'signals': {f: float(v) for f, v in _signals().items()}, 'context': CONTEXT}
+    assert cached_api.post('/api/predict', json=floats).get_json()['growth']['learning_momentum'] == 70.0
+    assert api.PREDICT_CACHE.stats()['hits'] == 1
+
+
+def test_model_swap_invalidates(cached_api):
+    record = {'signals': _signals(), 'context': CONTEXT}
+    cached_api.post('/api/predict', json=record)
+    _activate(1)
+    stats = api.PREDICT_CACHE.stats()
+    assert stats['entries'] == 0 and stats['invalidations'] == 1
+
+    fresh = cached_api.post('/api/predict', json=record).get_json()
+    api.PREDICT_CACHE.clear()
+    uncached = cached_api.post('/api/predict', json=record).get_json()
+    assert fresh == uncached
+    assert api.PREDICT_CACHE.stats()['hits'] == 0
+
+
+def test_off_grid_and_non_numeric_signals_bypass():
+    cache = PredictionCache(step=1.0)
+    assert cache.key({'creation_output': 50.5}, {}, 1) is None
+    assert cache.key({'creation_output': '50'}, {}, 1) is None
+    assert cache.key({'creation_output': float('nan')}, {}, 1) is None
+    assert cache.key({'creation_output': 50}, {'domain': ['x']}, 1) is None
+    assert cache.stats()['bypassed'] == 4
+    assert PredictionCache(step=0.5).key({'creation_output': 50.5}, {}, 1) is not None
+    # Missing signals and context fields differ from explicit values
+    assert cache.key({}, {}, 1) != cache.key({'creation_output': 0}, {'domain': 'General'}, 1)
+    assert cache.key({'creation_output': 50}, {}, 1) != cache.key({'creation_output': 50}, {}, 2)
+
+
+def test_lru_eviction_by_entries_and_bytes():
+    cache = PredictionCache(max_entries=3, max_bytes=10 ** 6)
+    keys = [cache.key({'creation_output': i}, {}, 1) for i in range(5)]
+    for k in keys[:3]:
+        cache.put(k, b'x' * 100)
+    cache.get(keys[0])                      # keys[1] is now least recently used
+    cache.put(keys[3], b'x' * 100)
+    assert cache.get(keys[1]) is None and cache.get(keys[0]) is not None
+    assert cache.stats()['evictions'] == 1
+
+    small = PredictionCache(max_entries=100, max_bytes=2000)
+    for k in keys:
+        small.put(k, b'x' * 600)
+    assert small.stats()['bytes'] <= 2000 and small.stats()['entries'] < 5
+    small.put(keys[0], b'x' * 5000)         # larger than the whole budget: not cached
+    assert small.stats()['bytes'] <= 2000
@@ -0,0 +1,93 @@
+import os
+import json
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.preprocessing import MinMaxScaler
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from services.risk_surface import RISK_INPUTS  # noqa: E402
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api, 'REAL_MODEL_STATE', dict(api.REAL_MODEL_STATE))
+    monkeypatch.setattr(api, 'RISK_SURFACE_CACHE', type(api.RISK_SURFACE_CACHE)(8))
+    return api.app.test_client()
+
+
+@pytest.fixture
+def trained(client):
+    rng = np.random.default_rng(0)
+    lo = np.array([r[0] for _, r in RISK_INPUTS.values()])
+    hi = np.array([r[1] for _, r in RISK_INPUTS.values()])
+    raw = lo + rng.random((500, len(RISK_INPUTS))) * (hi - lo)
+    y = 25 - raw[:, 0] * 0.15 - raw[:, 1] * 0.05 + rng.normal(0, 0.5, 500)
+    scaler = MinMaxScaler().fit(raw)
+    api.REAL_MODEL_STATE.update({
+        'trained': True, 'scaler': scaler, 'compiled_anomaly': None, 'explainer': None,
+        'model': GradientBoostingRegressor(n_estimators=30, random_state=0).fit(scaler.transform(raw), y),
+        'anomaly_model': type('Never', (), {'predict': lambda self, X: np.ones(len(X))})(),
+        'version': api.REAL_MODEL_STATE['version'] + 1
+    })
+    return client
+
+
+SPEC = {'x': {'input': 'literacy_rate', 'min': 40, 'max': 100, 'steps': 7},
+        'y': {'input': 'per_capita_income', 'min': 50000, 'max': 250000, 'steps': 5},
+        'fixed': {'internet_penetration': 62}}
+
+
+def _single(client, **inputs):
+    return client.post('/api/predict-skill-risk', json=inputs).get_json()
+
+
+@pytest.mark.parametrize('model', ['trained', 'heuristic'])
+def test_cells_match_single_predictions(request, client, model):
+    if model == 'trained':
+        request.getfixturevalue('trained')
+    body = client.post('/api/skill-risk-surface', json=SPEC).get_json()
+    assert body['shape'] == [5, 7] and len(body['x_values']) == 7
+    for j, income in enumerate(body['y_values']):
+        for i, literacy in enumerate(body['x_values']):
+            single = _single(client, literacy_rate=literacy, per_capita_income=income, internet_penetration=62)
+            assert body['predicted_unemployment'][j][i] == pytest.approx(single['predicted_unemployment'], abs=0.011)
+            assert body['skill_risk_score'][j][i] == pytest.approx(single['skill_risk_score'], abs=0.11)
+
+
+def test_binary_format_and_cache(trained):
+    first = trained.post('/api/skill-risk-surface', json=SPEC)
+    assert first.headers['X-Cache'] == 'MISS'
+    assert trained.post('/api/skill-risk-surface', json=SPEC).headers['X-Cache'] == 'HIT'
+
+    binary = trained.post('/api/skill-risk-surface', json={**SPEC, 'format': 'binary'})
+    assert binary.mimetype == 'application/octet-stream'
+    shape = tuple(int(s) for s in binary.headers['X-Surface-Shape'].split(','))
+    layers = np.frombuffer(binary.data, dtype='<f4').reshape(shape)
+    assert shape == (2, 5, 7)
+    assert json.loads(binary.headers['X-Surface-Meta'])['x']['input'] == 'literacy_rate'
+    np.testing.assert_allclose(layers[0], first.get_json()['predicted_unemployment'], atol=1e-4)
+
+    # A model swap invalidates by version
+    api.REAL_MODEL_STATE['version'] += 1
+    assert trained.post('/api/skill-risk-surface', json=SPEC).headers['X-Cache'] == 'MISS'
+
+
+def test_large_grid(trained):
+    spec = {'x': {'steps': 200}, 'y': {'steps': 200}, 'format': 'binary'}
+    response = trained.post('/api/skill-risk-surface', json=spec)
+    assert response.status_code == 200 and len(response.data) == 2 * 200 * 200 * 4
+
+
+@pytest.mark.parametrize('spec', [
+    {'x': {'steps': 201}},
+    {'x': {'input': 'internet_penetration'}},
+    {'y': {'input': 'rainfall'}},
+    {'x': {'min': 80, 'max': 20}},
+    {'fixed': {'rainfall': 3}},
+    {'format': 'xml'},
+])
+def test_invalid_specs(client, spec):
+    assert client.post('/api/skill-risk-surface', json=spec).status_code == 400
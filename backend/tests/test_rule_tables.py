@@ -0,0 +1,136 @@
+import numpy as np
+import pytest
+
+from services.rule_tables import PROFILE_RULES, SERVICE_RULES, RuleTable, Rule, Lookup
+
+DOMAINS = ["Retail & Sales", "Service Industry", "Logistics & Delivery", "Agriculture & Allied",
+           "Creative & Media", "Entrepreneurship", "Manufacturing & Operations", "General", "Healthcare"]
+RULE_SIGNALS = ['digital_presence', 'economic_activity', 'collaboration_community', 'learning_behavior']
+
+
+def _profile_reference(score, signals, domain):
+    """The if/elif chains /api/predict used before the rule tables."""
+    recommendations = []
+    digital_pres = signals.get('digital_presence', 50)
+    economic_act = signals.get('economic_activity', 50)
+    if score < 50:
+        recommendations.append({"action": "Join a skill training program in your domain", "category": "training", "priority": "high"})
+    if digital_pres < 40:
+        recommendations.append({"action": "Start accepting digital payments (UPI)", "category": "digital", "priority": "high"})
+        recommendations.append({"action": "Create a WhatsApp Business profile", "category": "digital", "priority": "medium"})
+        recommendations.append({"action": "Register on Google Business", "category": "digital", "priority": "medium"})
+    if signals.get('collaboration_community', 50) < 40:
+        recommendations.append({"action": "Join a local trade association or cooperative", "category": "community", "priority": "medium"})
+    if economic_act < 40:
+        recommendations.append({"action": "Explore freelancing or gig work platforms", "category": "income", "priority": "medium"})
+    if score > 70:
+        recommendations.append({"action": "Mentor others and expand your customer reach", "category": "growth", "priority": "low"})
+    if signals.get('learning_behavior', 50) < 40:
+        recommendations.append({"action": "Dedicate 3-5 hours per week to learning new skills", "category": "training", "priority": "medium"})
+    if not recommendations:
+        recommendations.append({"action": "Keep building consistency — you're on track", "category": "growth", "priority": "low"})
+
+    opportunities = {"training": [], "government_schemes": [], "platforms": [], "digital_growth": []}
+    if score < 60:
+        opportunities["training"] += ["NSDC Skill India courses (free)", "State-level skill development programs"]
+    opportunities["training"].append("Industry-specific certification courses")
+    if economic_act < 50:
+        opportunities["government_schemes"] += ["Mudra Loan (up to ₹10 lakh for small business)",
+                                                "PMEGP – Prime Minister's Employment Generation Programme",
+                                                "State skill development mission programs"]
+    platforms = {
+        "Retail & Sales": ["Meesho (reselling)", "Flipkart Seller Hub", "Amazon Easy"],
+        "Service Industry": ["Urban Company", "Housejoy", "Local service apps"],
+        "Logistics & Delivery": ["Swiggy delivery partner", "Zomato delivery", "Porter / Uber"],
+        "Agriculture & Allied": ["DeHaat", "AgroStar", "Kisan Network"],
+        "Creative & Media": ["Fiverr", "99designs", "Instagram Shop"],
+        "Entrepreneurship": ["IndiaMART", "TradeIndia", "GeM Portal"],
+    }
+    opportunities["platforms"] = platforms.get(domain, ["Explore online marketplaces for your trade"])
+    if digital_pres < 50:
+        opportunities["digital_growth"] += ["Set up UPI payments (PhonePe / Google Pay)", "Create WhatsApp Business account"]
+    if digital_pres < 70:
+        opportunities["digital_growth"].append("Register on Google My Business")
+    opportunities["digital_growth"].append("Build a simple online presence for your work")
+    return recommendations, opportunities
+
+
+def _service_reference(score, signals, domain):
+    """PredictionService._build_recommendations / _build_opportunities before the rule tables."""
+    recs = []
+    if score < 50:
+        recs.append({'action': 'Join a skill training program in your domain', 'category': 'training', 'priority': 'high'})
+    if signals.get('digital_presence', 50) < 40:
+        recs.append({'action': 'Start accepting digital payments (UPI)', 'category': 'digital', 'priority': 'high'})
+        recs.append({'action': 'Create a WhatsApp Business profile', 'category': 'digital', 'priority': 'medium'})
+    if signals.get('economic_activity', 50) < 40:
+        recs.append({'action': 'Explore gig work platforms for additional income', 'category': 'income', 'priority': 'medium'})
+    if score > 70:
+        recs.append({'action': 'Mentor others and expand customer reach', 'category': 'growth', 'priority': 'low'})
+    if not recs:
+        recs.append({'action': 'Keep building consistency — you\'re on track', 'category': 'growth', 'priority': 'low'})
+
+    opps = {'training': [], 'government_schemes': [], 'platforms': [], 'digital_growth': []}
+    if score < 60:
+        opps['training'] += ['NSDC Skill India courses (free)', 'State-level skill programs']
+    opps['training'].append('Industry-specific certification courses')
+    if signals.get('economic_activity', 50) < 50:
+        opps['government_schemes'] += ['Mudra Loan (up to ₹10 lakh)', 'PMEGP', 'State skill development missions']
+    opps['platforms'] = {
+        'Retail & Sales': ['Meesho', 'Flipkart Seller Hub', 'Amazon Easy'],
+        'Service Industry': ['Urban Company', 'Housejoy'],
+        'Logistics & Delivery': ['Swiggy', 'Zomato', 'Porter'],
+        'Agriculture & Allied': ['DeHaat', 'AgroStar'],
+        'Creative & Media': ['Fiverr', '99designs'],
+        'Entrepreneurship': ['IndiaMART', 'GeM Portal'],
+    }.get(domain, ['Explore online marketplaces'])
+    if signals.get('digital_presence', 50) < 50:
+        opps['digital_growth'] += ['Set up UPI payments', 'Create WhatsApp Business']
+    opps['digital_growth'].append('Build an online presence for your work')
+    return recs, opps
+
+
+def _profiles(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    # Values around every threshold, including the boundaries themselves
+    grid = [0, 39, 39.5, 40, 41, 49, 50, 51, 59, 60, 61, 69, 70, 71, 75, 100]
+    profiles = []
+    for i in range(n):
+        signals = {name: grid[rng.integers(len(grid))] for name in RULE_SIGNALS if rng.random() > 0.15}
+        score = float(grid[rng.integers(len(grid))]) if i % 3 else float(rng.uniform(0, 100))
+        profiles.append((score, signals, DOMAINS[i % len(DOMAINS)]))
+    return profiles
+
+
+@pytest.mark.parametrize('rules, reference', [(PROFILE_RULES, _profile_reference), (SERVICE_RULES, _service_reference)])
+def test_rule_tables_match_previous_chains(rules, reference):
+    profiles = _profiles()
+    scores = np.array([p[0] for p in profiles])
+    signals = [p[1] for p in profiles]
+    domains = [p[2] for p in profiles]
+    batch_recs = rules.recommend_batch(scores, signals)
+    batch_opps = rules.opportunities_batch(scores, signals, domains)
+
+    for i, (score, sig, domain) in enumerate(profiles):
+        recs, opps = reference(score, sig, domain)
+        assert rules.recommend(score, sig) == recs
+        assert rules.opportunities_for(score, sig, domain) == opps
+        assert batch_recs[i] == recs
+        assert batch_opps[i] == opps
+        assert list(batch_opps[i]) == list(opps)
+
+
+def test_domain_reasoning_lookup():
+    reasoning = PROFILE_RULES.domain_reasoning
+    assert reasoning.get("Retail & Sales").startswith("Retail & Sales domain measures")
+    assert reasoning.get("General") == "General domain analysis based on skill pattern recognition"
+    assert reasoning.get(None) == "None domain analysis based on skill pattern recognition"
+    assert Lookup({'a': 1}, default=0).get(['unhashable']) == 0
+
+
+def test_results_are_independent_lists():
+    table = RuleTable([Rule('x', '>', 1, ['big']), Rule(None, None, None, ['always'])])
+    first, second = table.evaluate_batch(np.zeros(2), [{'x': 5}, {'x': 5}])
+    first.append('extra')
+    assert second == ['big', 'always']
+    assert table.evaluate(0, {'x': 0}) == ['always']
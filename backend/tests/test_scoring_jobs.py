@@ -0,0 +1,136 @@
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, IsolationForest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from ml.data_loader import FEATURE_COLUMNS  # noqa: E402
+from ml.feature_spec import compile_feature_spec, ENGINEERED_COLUMNS  # noqa: E402
+from services.batch_prediction import BatchPredictionService  # noqa: E402
+from services.scoring_jobs import ScoringJobs, ScoringJobsFull, score_frame  # noqa: E402
+
+
+@pytest.fixture
+def model_state(monkeypatch):
+    rng = np.random.default_rng(0)
+    spec = compile_feature_spec(FEATURE_COLUMNS + ENGINEERED_COLUMNS)
+    X = spec.transform_batch([
+        {f: float(v) for f, v in zip(FEATURE_COLUMNS, row)}
+        for row in rng.integers(0, 101, (600, len(FEATURE_COLUMNS)))
+    ])
+    y = X[:, :8].mean(axis=1) * 1.3 - 5 + rng.normal(0, 3, 600)
+    monkeypatch.setattr(api, 'MODEL_STATE', dict(api.MODEL_STATE))
+    api._activate_model(
+        GradientBoostingRegressor(n_estimators=40, random_state=0).fit(X, y),
+        IsolationForest(contamination=0.1, random_state=0).fit(X),
+        spec.feature_names, 90.0
+    )
+    return api.MODEL_STATE
+
+
+def _roster(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.integers(0, 101, (n, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    df.insert(0, 'worker_id', [f'W{i:05d}' for i in range(n)])
+    df['area_type'] = np.array(['Rural', 'Urban', 'Semi-Urban'])[np.arange(n) % 3]
+    df['digital_access'] = np.array(['Limited', 'High'])[np.arange(n) % 2]
+    df['opportunity_level'] = np.array(['Low', 'Moderate', 'High'])[np.arange(n) % 3]
+    df.loc[::9, 'learning_behavior'] = np.nan
+    return df
+
+
+def _models(state):
+    return state['skill_model'], state['anomaly_model'], state['feature_names']
+
+
+def test_scores_match_batch_endpoint(model_state):
+    df = _roster()
+    scored = score_frame(_models(model_state), df)
+    records = []
+    for row in df.to_dict(orient='records'):
+        signals = {f: row[f] for f in FEATURE_COLUMNS if not pd.isna(row[f])}
+        records.append({'signals': signals, 'context': {k: row[k] for k in ('area_type', 'digital_access', 'opportunity_level')}})
+    results = BatchPredictionService.predict(model_state, records)['results']
+    for (_, row), result in zip(scored.iterrows(), results):
+        assert row['skill_score'] == result['core']['score']
+        assert row['level'] == result['core']['level']
+        assert row['confidence'] == result['core']['confidence']
+        assert row['is_anomaly'] == result['intelligence']['is_anomaly']
+        assert row['hidden_talent_flag'] == result['intelligence']['hidden_talent_flag']
+        assert row['migration_risk'] == result['intelligence']['migration_risk']
+        assert row['work_capacity'] == result['workforce_assessment']['work_capacity']
+        assert row['risk_level'] == result['workforce_assessment']['risk_level']
+
+
+def _wait(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f'/api/score-jobs/{job_id}').get_json()
+        if status['status'] in ('done', 'failed'):
+            return status
+        time.sleep(0.05)
+    raise AssertionError('job did not finish')
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_job_end_to_end(model_state, monkeypatch, tmp_path, workers):
+    monkeypatch.setattr(api, 'SCORING_JOBS', ScoringJobs(str(tmp_path), workers=workers, chunk_rows=64))
+    client = api.app.test_client()
+    df = _roster()
+    upload = {'file': (io.BytesIO(df.to_csv(index=False).encode()), 'roster.csv')}
+    submitted = client.post('/api/score-jobs', data=upload, content_type='multipart/form-data')
+    assert submitted.status_code == 202
+    job_id = submitted.get_json()['job_id']
+
+    status = _wait(client, job_id)
+    assert status['status'] == 'done', status['error']
+    assert status['rows_scored'] == len(df) and status['chunks'] == 5 and status['progress'] == 1.0
+
+    download = client.get(f'/api/score-jobs/{job_id}/download')
+    assert download.status_code == 200
+    scored = pd.read_csv(io.BytesIO(download.data))
+    expected = score_frame(_models(model_state), pd.read_csv(io.StringIO(df.to_csv(index=False))))
+    pd.testing.assert_frame_equal(scored, pd.read_csv(io.StringIO(expected.to_csv(index=False))))
+
+
+def test_job_errors(model_state, monkeypatch, tmp_path):
+    monkeypatch.setattr(api, 'SCORING_JOBS', ScoringJobs(str(tmp_path), workers=1))
+    client = api.app.test_client()
+    assert client.get('/api/score-jobs/0123abcd').status_code == 404
+    assert client.get('/api/score-jobs/not-a-job').status_code == 404
+    bad = {'file': (io.BytesIO(b'x'), 'roster.txt')}
+    assert client.post('/api/score-jobs', data=bad, content_type='multipart/form-data').status_code == 400
+
+    broken = {'file': (io.BytesIO(b'a,b\n1,2,3,4\n"'), 'broken.csv')}
+    job_id = client.post('/api/score-jobs', data=broken, content_type='multipart/form-data').get_json()['job_id']
+    assert _wait(client, job_id)['status'] == 'failed'
+    assert client.get(f'/api/score-jobs/{job_id}/download').status_code == 409
+
+
+def test_concurrency_limit_and_cleanup(model_state, monkeypatch, tmp_path):
+    jobs = ScoringJobs(str(tmp_path), workers=1, max_concurrent=1, ttl_s=3600)
+    monkeypatch.setattr(api, 'SCORING_JOBS', jobs)
+    client = api.app.test_client()
+    held, _ = jobs.create()                                    # upload in progress
+    upload = {'file': (io.BytesIO(_roster(20).to_csv(index=False).encode()), 'roster.csv')}
+    busy = client.post('/api/score-jobs', data=upload, content_type='multipart/form-data')
+    assert busy.status_code == 429 and busy.get_json()['max_concurrent'] == 1
+    jobs.discard(held)
+    assert not os.path.exists(jobs._dir(held))
+
+    upload = {'file': (io.BytesIO(_roster(20).to_csv(index=False).encode()), 'roster.csv')}
+    job_id = client.post('/api/score-jobs', data=upload, content_type='multipart/form-data').get_json()['job_id']
+    assert _wait(client, job_id)['status'] == 'done'
+    running, _ = jobs.create()                                 # the finished job freed its slot
+    with pytest.raises(ScoringJobsFull):
+        jobs.create()
+
+    assert jobs.cleanup() == 0
+    assert jobs.cleanup(now=time.time() + 7200) == 1           # only the finished job expires
+    assert client.get(f'/api/score-jobs/{job_id}').status_code == 404
+    assert os.listdir(str(tmp_path)) == [running]
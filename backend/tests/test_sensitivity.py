@@ -0,0 +1,90 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, IsolationForest, RandomForestRegressor
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+import ml.model_manager as model_manager  # noqa: E402
+from ml.sensitivity import compute_sensitivity, model_key  # noqa: E402
+
+
+def _data(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 100, (n, 4))
+    y = X[:, 0] * 0.5 - X[:, 1] * 0.2 + np.where(X[:, 2] > 50, 10, 0) + rng.normal(0, 1, n)
+    return X, y
+
+
+def test_curves_match_brute_force():
+    X, y = _data()
+    model = GradientBoostingRegressor(n_estimators=30, random_state=0).fit(X, y)
+    curves = compute_sensitivity(model, X, ['a', 'b', 'c', 'd'], grid_points=8, background_rows=50, ice_rows=50)
+    background = X[np.sort(np.random.default_rng(0).choice(len(X), 50, replace=False))]
+    for j, name in enumerate(['a', 'b', 'c', 'd']):
+        feature = curves['features'][name]
+        assert len(feature['grid']) == 8 and len(feature['ice']) == 50
+        for g, (value, pd_value) in enumerate(zip(feature['grid'], feature['pd'])):
+            rows = background.copy()
+            rows[:, j] = value
+            predictions = model.predict(rows)
+            assert pd_value == pytest.approx(predictions.mean(), abs=2e-3)
+            assert [curve[g] for curve in feature['ice']] == pytest.approx(predictions, abs=1e-3)
+    assert curves['features']['a']['range'] > curves['features']['d']['range']
+
+
+def test_transform_reports_original_units():
+    X, y = _data()
+    scale = np.array([2.0, 1.0, 1.0, 1.0])
+    model = GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X / scale, y)
+    curves = compute_sensitivity(model, X, list('abcd'), transform=lambda rows: rows / scale)
+    assert max(curves['features']['a']['grid']) > 90
+    assert curves['features']['a']['pd'][-1] > curves['features']['a']['pd'][0]
+
+
+def test_model_key_survives_reload(tmp_path):
+    X, y = _data()
+    model = RandomForestRegressor(n_estimators=5, random_state=0).fit(pd.DataFrame(X, columns=list('abcd')), y)
+    joblib.dump(model, tmp_path / 'm.joblib')
+    assert model_key(joblib.load(tmp_path / 'm.joblib')) == model_key(model)
+    other = RandomForestRegressor(n_estimators=5, random_state=1).fit(X, y)
+    assert model_key(other) != model_key(model)
+
+
+def test_saved_curves_are_reused_per_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_manager, 'MODEL_DIR', str(tmp_path))
+    X, y = _data()
+    model = GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X, y)
+    first = api._model_sensitivity(model, X, list('abcd'), 'unit')
+    assert (tmp_path / 'sensitivity_unit.json').exists()
+    # Same model: served from disk without data; another model: nothing to serve
+    assert api._model_sensitivity(model, None, list('abcd'), 'unit') == first
+    other = GradientBoostingRegressor(n_estimators=11, random_state=0).fit(X, y)
+    assert api._model_sensitivity(other, None, list('abcd'), 'unit') is None
+
+
+def test_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(model_manager, 'MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(api, 'MODEL_STATE', dict(api.MODEL_STATE))
+    client = api.app.test_client()
+    X, y = _data()
+    api._activate_model(GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X, y),
+                        IsolationForest(random_state=0).fit(X), None, 90.0)
+    assert client.get('/api/model-sensitivity').status_code == 404
+    assert client.get('/api/model-sensitivity?model=other').status_code == 400
+
+    curves = api._model_sensitivity(api.MODEL_STATE['skill_model'], X, list('abcd'), 'latest')
+    api.MODEL_STATE['sensitivity'] = curves
+    body = client.get('/api/model-sensitivity?features=a,c&ice=0').get_json()
+    assert body['available'] and body['model_version'] == api.MODEL_STATE['version']
+    assert set(body['features']) == {'a', 'c'} and 'ice' not in body['features']['a']
+    assert body['ranking'][0] == 'a'
+    assert len(client.get('/api/model-sensitivity').get_json()['features']['b']['ice']) == curves['ice_rows']
+
+    # The real-data model reports its own version
+    monkeypatch.setattr(api, 'REAL_MODEL_STATE', {**api.REAL_MODEL_STATE, 'sensitivity': curves, 'version': 7})
+    body = client.get('/api/model-sensitivity?model=real').get_json()
+    assert body['model'] == 'real' and body['model_version'] == 7
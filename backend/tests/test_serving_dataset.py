@@ -0,0 +1,75 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from ml.data_loader import FEATURE_COLUMNS, validate_columns  # noqa: E402
+from ml.preprocessing import handle_missing_values, feature_engineering, compact_dtypes  # noqa: E402
+
+STATES = ['Punjab', 'Bihar', 'Kerala', 'Jharkhand', 'Maharashtra']
+DOMAINS = ['Retail & Sales', 'Agriculture & Allied', 'Service Industry', 'Creative & Media', 'Technology']
+
+
+def talent_frame(n=2000, seed=0):
+    """Preprocessed profiles shaped like data/synthetic_talent_data.csv."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.uniform(5, 98, (n, len(FEATURE_COLUMNS))).round(1), columns=FEATURE_COLUMNS)
+    df['state'] = rng.choice(STATES, n)
+    df['domain'] = rng.choice(DOMAINS, n)
+    df['area_type'] = rng.choice(['Rural', 'Urban', 'Semi-Urban'], n, p=[0.65, 0.2, 0.15])
+    df['digital_access'] = rng.choice(['Limited', 'Regular', 'Occasional'], n)
+    df['opportunity_level'] = rng.choice(['Low', 'Moderate', 'High'], n)
+    df['infrastructure_score'] = rng.integers(10, 95, n)
+    df['skill_score'] = (df[FEATURE_COLUMNS[:6]].mean(axis=1) + rng.normal(0, 4, n)).clip(0, 100).round(2)
+    df['skill_history'] = [json.dumps(np.round(s - 12 + np.arange(24) * rng.uniform(0, 1), 1).tolist())
+                           for s in df['skill_score']]
+    return feature_engineering(handle_missing_values(validate_columns(df, auto_heal=True)))
+
+
+@pytest.fixture
+def serving_dataset(monkeypatch):
+    for name in ('DF', 'STATE_AGGREGATES', 'SKILL_HISTORY', 'DATASET_VERSION', 'DATASET_FILE'):
+        monkeypatch.setattr(api, name, getattr(api, name))
+    api._set_dataset(talent_frame())
+    return api.DF
+
+
+def test_compact_dtypes_shrinks_and_keeps_values():
+    df = talent_frame(500)
+    original = df.copy()
+    compact = compact_dtypes(df.copy())
+    for col in ('state', 'domain', 'area_type'):
+        assert isinstance(compact[col].dtype, pd.CategoricalDtype)
+        assert (compact[col].astype(str) == original[col]).all()
+    assert compact['infrastructure_score'].dtype == np.int8
+    assert compact['skill_score'].dtype == np.float32
+    np.testing.assert_allclose(compact['skill_score'], original['skill_score'], rtol=1e-6)
+    assert compact.memory_usage(deep=True).sum() < original.memory_usage(deep=True).sum() / 2
+
+
+@pytest.mark.parametrize('method, path, body', [
+    ('get', '/api/alerts', None), ('get', '/api/ai-status', None), ('get', '/api/regional-analysis', None),
+    ('get', '/api/data-foundation', None), ('get', '/api/risk-analysis', None), ('get', '/api/skill-trends', None),
+    ('get', '/api/forecast', None), ('get', '/api/forecast?level=state_domain', None),
+    ('get', '/api/state-specialization', None), ('get', '/api/market-intelligence', None),
+    ('get', '/api/national-distribution', None), ('get', '/api/economic-impact', None),
+    ('get', '/api/system-status', None), ('post', '/api/policy', {}), ('post', '/api/policy', {'state': 'Bihar'}),
+    ('post', '/api/policy-simulate', {'state': 'Bihar', 'policy_type': 'Hubs'}),
+])
+def test_endpoints_serve_compacted_dataset(serving_dataset, method, path, body):
+    assert serving_dataset['skill_score'].dtype == np.float32          # the compacted serving copy
+    response = getattr(api.app.test_client(), method)(path, json=body)
+    data = response.get_json()
+    assert response.status_code == 200 and data
+    assert not (isinstance(data, dict) and data.get('fallback')), data
+
+
+def test_market_intelligence_reads_supply(serving_dataset):
+    data = api.app.test_client().get('/api/market-intelligence').get_json()
+    expected = serving_dataset.loc[serving_dataset['domain'] == 'Retail & Sales', 'skill_score'].astype(float).mean()
+    assert data['Retail & Sales']['supply_index'] == round(expected, 1)
+    assert data['Entrepreneurship']['supply_index'] == 50                # no profiles in that domain
@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from ml import snapshot  # noqa: E402
+from ml.snapshot import snapshot_key, save_snapshot, load_snapshot, HISTORY_PARTS  # noqa: E402
+from tests.test_serving_dataset import talent_frame  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def snapshot_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(snapshot, 'SNAPSHOT_DIR', str(tmp_path / 'snapshots'))
+    return tmp_path / 'snapshots'
+
+
+def _serving(n=300, seed=0):
+    return api._prepare_serving_frame(talent_frame(n, seed=seed))
+
+
+def test_round_trip_keeps_values_and_dtypes():
+    df, history = _serving()
+    save_snapshot(df, history, 'k1', source='talent.csv')
+    loaded, loaded_history = load_snapshot('k1')
+    pd.testing.assert_frame_equal(loaded, df)
+    assert isinstance(loaded['domain'].dtype, pd.CategoricalDtype)
+    for part in HISTORY_PARTS:
+        np.testing.assert_array_equal(loaded_history[part], history[part])
+        assert isinstance(loaded_history[part], np.memmap)
+    # Eager load gives the same frame
+    pd.testing.assert_frame_equal(load_snapshot('k1', mmap=False)[0], df)
+    assert load_snapshot('missing') is None
+
+
+def test_existing_snapshot_is_not_rewritten(snapshot_dir):
+    df, history = _serving()
+    target = save_snapshot(df, history, 'k1')
+    mtime = os.path.getmtime(os.path.join(target, 'manifest.json'))
+    assert save_snapshot(df.iloc[:10], history, 'k1') == target
+    assert os.path.getmtime(os.path.join(target, 'manifest.json')) == mtime
+    assert len(load_snapshot('k1')[0]) == len(df)
+    assert sorted(os.listdir(snapshot_dir)) == ['k1']          # no leftover temporary directory
+
+
+def test_key_tracks_csv_content_and_preprocessing_code(monkeypatch, tmp_path):
+    csv = tmp_path / 'talent.csv'
+    csv.write_text('a,b\n1,2\n')
+    key = snapshot_key(str(csv))
+    assert snapshot_key(str(csv)) == key
+    csv.write_text('a,b\n1,3\n')
+    changed_data = snapshot_key(str(csv))
+    assert changed_data != key
+
+    source = tmp_path / 'preprocessing.py'
+    source.write_text('STEP = 1\n')
+    monkeypatch.setattr(snapshot, 'PREPROCESSING_SOURCES', [str(source)])
+    before = snapshot_key(str(csv))
+    source.write_text('STEP = 2\n')
+    assert snapshot_key(str(csv)) not in (before, changed_data)
+
+
+def test_prune_removes_older_snapshots_of_the_same_source(snapshot_dir):
+    df, history = _serving(50)
+    save_snapshot(df, history, 'old', source='a.csv')
+    save_snapshot(df, history, 'other', source='b.csv')
+    save_snapshot(df, history, 'unsourced')
+    os.makedirs(snapshot_dir / 'partial.tmp-1')                   # another worker still writing
+    save_snapshot(df, history, 'new', source='a.csv')
+    assert sorted(os.listdir(snapshot_dir)) == ['new', 'other', 'partial.tmp-1', 'unsourced']
+
+
+def test_second_boot_loads_the_snapshot(monkeypatch, tmp_path, snapshot_dir):
+    for name in ('DF', 'STATE_AGGREGATES', 'SKILL_HISTORY', 'DATASET_VERSION', 'DATASET_FILE'):
+        monkeypatch.setattr(api, name, getattr(api, name))
+    csv = str(tmp_path / 'talent.csv')
+    talent_frame(400).to_csv(csv, index=False)
+
+    api._load_dataset(csv)
+    first, first_states = api.DF, api.STATE_AGGREGATES['states']
+    assert os.listdir(snapshot_dir) == [snapshot_key(csv)]
+
+    def no_csv(path):
+        raise AssertionError('CSV parsed although a snapshot exists')
+
+    parse_csv = api.load_csv
+    monkeypatch.setattr(api, 'load_csv', no_csv)
+    api._load_dataset(csv)
+    assert api.DF is not first and api.DATASET_FILE == csv
+    pd.testing.assert_frame_equal(api.DF, first)
+    pd.testing.assert_frame_equal(api.STATE_AGGREGATES['states'], first_states)
+
+    # A changed CSV misses the snapshot and is parsed again
+    monkeypatch.setattr(api, 'load_csv', parse_csv)
+    talent_frame(300, seed=1).to_csv(csv, index=False)
+    api._load_dataset(csv)
+    assert len(api.DF) == 300 and os.listdir(snapshot_dir) == [snapshot_key(csv)]
@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import subprocess
+
+import numpy as np
+import pandas as pd
+import pytest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+from ml.data_loader import FEATURE_COLUMNS  # noqa: E402
+from services.training_jobs import TrainingJobs, train_skill_models, job_key  # noqa: E402
+
+
+def _skill_csv(path, n=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.uniform(10, 95, (n, len(FEATURE_COLUMNS))), columns=FEATURE_COLUMNS)
+    df['state'] = np.array(['Punjab', 'Bihar', 'Kerala'])[np.arange(n) % 3]
+    df['domain'] = np.array(['Agriculture', 'Manufacturing'])[np.arange(n) % 2]
+    df['area_type'] = np.array(['Rural', 'Urban', 'Semi-Urban'])[np.arange(n) % 3]
+    df['digital_access'] = np.array(['Limited', 'High'])[np.arange(n) % 2]
+    df['opportunity_level'] = np.array(['Low', 'Moderate', 'High'])[np.arange(n) % 3]
+    df['infrastructure_score'] = rng.integers(20, 90, n)
+    df['skill_score'] = df[FEATURE_COLUMNS[:6]].mean(axis=1) + rng.normal(0, 3, n)
+    df.to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def jobs(monkeypatch, tmp_path):
+    for name in ('MODEL_STATE', 'REAL_MODEL_STATE'):
+        monkeypatch.setattr(api, name, dict(getattr(api, name)))
+    for name in ('DF', 'STATE_AGGREGATES', 'SKILL_HISTORY', 'DATASET_VERSION', 'DATASET_FILE'):
+        monkeypatch.setattr(api, name, getattr(api, name))
+    monkeypatch.setattr(api, 'MODEL_GENERATION_PATHS', {kind: str(tmp_path / f'{kind}_generation.json')
+                                                         for kind in ('skill', 'real')})
+    monkeypatch.setattr(api, 'MODEL_GENERATIONS', dict(api.MODEL_GENERATIONS))
+    monkeypatch.setattr(api, 'save_model', lambda *args, **kwargs: {'tag': 'latest'})
+    monkeypatch.setattr(api, '_model_sensitivity', lambda *args, **kwargs: None)
+    monkeypatch.setattr(api, 'TRAIN_WORKERS', 1)
+    monkeypatch.setattr(api, 'TRAINING_JOBS', TrainingJobs(str(tmp_path / 'jobs'), max_concurrent=1))
+    return api.TRAINING_JOBS
+
+
+def _wait(client, job_id, until=('done', 'failed', 'cancelled'), timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f'/api/train-jobs/{job_id}').get_json()
+        if status['status'] in until or status['stage'] in until:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f'job {job_id} stuck at {status}')
+
+
+def _group_alive(pgid, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            os.killpg(pgid, 0)
+        except ProcessLookupError:
+            return False
+        time.sleep(0.1)
+    return True
+
+
+def test_skill_pipeline_reports_stages(tmp_path):
+    stages = []
+    params = {**api._skill_training_params({})[0], 'data_file': _skill_csv(tmp_path / 'skill.csv'), 'n_workers': 1}
+    result = train_skill_models(params, progress=lambda stage, percent, detail=None: stages.append((stage, percent)))
+    names = [stage for stage, _ in stages]
+    assert names[:6] == ['load', 'validate', 'preprocess', 'engineer', 'split', 'fit']
+    assert sorted(names[6:10]) == ['fit:gradient_boosting', 'fit:hist_gradient_boosting', 'fit:linear',
+                                   'fit:random_forest']
+    assert names[10:] == ['anomaly']
+    assert [p for _, p in stages] == sorted(p for _, p in stages) and stages[9][1] == 85
+    assert result['summary']['data_info']['samples'] == 1500 and result['metadata']['training_mode'] == 'full'
+
+
+def test_job_dedupes_and_swaps_model(jobs, tmp_path, monkeypatch):
+    client = api.app.test_client()
+    body = {'async': True, 'data_file': _skill_csv(tmp_path / 'skill.csv')}
+    version = api.MODEL_STATE['version']
+    first = client.post('/api/train-model', json=body)
+    second = client.post('/api/train-jobs', json={**body, 'model': 'skill'})
+    assert first.status_code == second.status_code == 202
+    assert second.get_json()['job_id'] == first.get_json()['job_id'] and second.get_json()['deduplicated']
+
+    status = _wait(client, first.get_json()['job_id'])
+    assert (status['status'], status['stage'], status['percent']) == ('done', 'done', 100.0), status['error']
+    assert status['result']['best_model'] == api.MODEL_STATE['training_metadata']['best_model']
+    assert api.MODEL_STATE['version'] == version + 1 and api.MODEL_STATE['active']
+    # Finished jobs no longer absorb new submissions
+    again = client.post('/api/train-model', json=body).get_json()
+    assert again['job_id'] != status['job_id'] and not again['deduplicated']
+    client.delete(f"/api/train-jobs/{again['job_id']}")
+    assert _wait(client, again['job_id'])['status'] == 'cancelled'
+
+    # Another web worker picks the installed model up from the generation marker
+    with open(api.MODEL_GENERATION_PATHS['skill']) as f:
+        marker = json.load(f)
+    assert marker['generation'] == api.MODEL_GENERATIONS['skill'] and marker['state']['data_file'] == body['data_file']
+    api.sync_models()
+    assert api.MODEL_STATE['version'] == version + 1           # the installing worker doesn't reload
+    saved = {'skill_model': api.MODEL_STATE['skill_model'], 'anomaly_model': api.MODEL_STATE['anomaly_model'],
+             'metadata': {'features': api.MODEL_STATE['feature_names'], 'accuracy_pct': 87.5}}
+    api.MODEL_GENERATIONS['skill'] = None
+    monkeypatch.setattr(api, 'load_model', lambda tag: saved)
+    api.sync_models()
+    assert api.MODEL_STATE['version'] == version + 2 and api.MODEL_STATE['training_score'] == 87.5
+    assert api.MODEL_STATE['training_metadata'] == marker['state']['training_metadata']
+    assert api.MODEL_GENERATIONS['skill'] == marker['generation']
+
+
+def test_cancel_running_and_queued_jobs(jobs, tmp_path, monkeypatch):
+    monkeypatch.setattr(api, 'TRAIN_WORKERS', 2)
+    client = api.app.test_client()
+    data_file = _skill_csv(tmp_path / 'skill.csv', n=4000)
+    version = api.MODEL_STATE['version']
+    running = client.post('/api/train-jobs', json={'data_file': data_file, 'mode': 'search',
+                                                   'time_budget_s': 120}).get_json()
+    _wait(client, running['job_id'], until=('running',))
+    queued = client.post('/api/train-jobs', json={'data_file': data_file}).get_json()
+    assert not queued['deduplicated'] and queued['job_id'] != running['job_id']
+
+    assert client.delete(f"/api/train-jobs/{queued['job_id']}").get_json()['cancel_requested']
+    status = _wait(client, queued['job_id'])
+    assert status['status'] == 'cancelled' and status['started_at'] is None
+
+    child = _wait(client, running['job_id'], until=('fit:rung 1/3',))['child_pid']
+    client.delete(f"/api/train-jobs/{running['job_id']}")
+    status = _wait(client, running['job_id'], timeout=30)
+    assert status['status'] == 'cancelled' and status['stage'].startswith('fit')
+    # The search pool's workers went down with the training process
+    assert not _group_alive(child)
+    assert api.MODEL_STATE['version'] == version
+    assert not os.path.exists(os.path.join(jobs.root, running['job_id'], 'result.joblib'))
+
+
+def test_job_key_and_bad_requests(jobs, tmp_path):
+    data_file = _skill_csv(tmp_path / 'skill.csv', n=50)
+    key = job_key('skill', {'mode': 'compare'}, data_file, 3)
+    assert key == job_key('skill', {'mode': 'compare'}, data_file, 3)
+    assert key != job_key('skill', {'mode': 'compare'}, data_file, 4)
+    os.utime(data_file, ns=(0, 0))
+    assert key != job_key('skill', {'mode': 'compare'}, data_file, 3)
+
+    client = api.app.test_client()
+    assert client.post('/api/train-jobs', json={'model': 'nope'}).status_code == 400
+    assert client.post('/api/train-jobs', json={'mode': 'grid'}).status_code == 400
+    assert client.post('/api/train-jobs', json={'data_file': str(tmp_path / 'missing.csv')}).status_code == 404
+    assert client.get('/api/train-jobs/0123abcd').status_code == 404
+    assert client.delete('/api/train-jobs/not-a-job').status_code == 404
+
+
+def test_claims_dedupe_across_workers(tmp_path):
+    root = str(tmp_path / 'jobs')
+    worker_a, worker_b = TrainingJobs(root), TrainingJobs(root)
+    params = {'data_file': _skill_csv(tmp_path / 'skill.csv', n=300), 'n_workers': 1}
+    first, deduplicated = worker_a.submit('skill', params, install=lambda result: {}, key='k')
+    assert not deduplicated
+    second, deduplicated = worker_b.submit('skill', params, install=lambda result: {}, key='k')
+    assert deduplicated and second['job_id'] == first['job_id']
+    assert len(os.listdir(root)) == 2                          # claims/ + one job directory
+
+    worker_b.cancel(first['job_id'])
+    deadline = time.time() + 30
+    while worker_b.status(first['job_id'])['status'] not in ('done', 'cancelled', 'failed'):
+        assert time.time() < deadline
+        time.sleep(0.05)
+    third, deduplicated = worker_b.submit('skill', params, install=lambda result: {}, key='k')
+    assert not deduplicated and third['job_id'] != first['job_id']
+    worker_b.cancel(third['job_id'])
+
+
+def test_job_of_dead_worker_is_failed(tmp_path):
+    jobs = TrainingJobs(str(tmp_path / 'jobs'))
+    child = subprocess.Popen(['sleep', '60'], start_new_session=True)
+    job_id = '0123456789abcdef'
+    os.makedirs(jobs._dir(job_id))
+    with open(os.path.join(jobs._dir(job_id), 'status.json'), 'w') as f:
+        json.dump({'job_id': job_id, 'status': 'running', 'job_key': 'k', 'owner_pid': 1, 'child_pid': child.pid,
+                   'heartbeat_at': time.time() - 60}, f)
+    assert jobs._claim('k', job_id) is None
+
+    status = jobs.status(job_id)
+    assert status['status'] == 'failed' and 'stopped responding' in status['error']
+    assert child.wait(timeout=5) != 0                          # orphaned training process killed
+    assert TrainingJobs(jobs.root).status(job_id)['status'] == 'failed'
+    assert not os.path.exists(jobs._claim_path('k'))
@@ -0,0 +1,138 @@
+import itertools
+import math
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+from ml import tree_shap
+from ml.fast_trees import CompiledTreeEnsemble, tree_arrays
+from ml.tree_shap import TreeExplainer
+
+
+def _expected(tree, x, S, node=0):
+    """E[tree(x) | x_S] with cover-weighted averaging over the other features."""
+    left, right = tree.children_left[node], tree.children_right[node]
+    if left == -1:
+        return tree.value[node, 0, 0]
+    f = tree.feature[node]
+    if f in S:
+        xf = np.float32(x[f])
+        goes_left = bool(tree.missing_go_to_left[node]) if np.isnan(xf) else xf <= tree.threshold[node]
+        return _expected(tree, x, S, left if goes_left else right)
+    w = tree.weighted_n_node_samples
+    return (w[left] * _expected(tree, x, S, left) + w[right] * _expected(tree, x, S, right)) / w[node]
+
+
+def _brute_force(model, x):
+    """Shapley values by enumerating every coalition of features."""
+    if isinstance(model, GradientBoostingRegressor):
+        trees = [(est.tree_, model.learning_rate) for est in model.estimators_[:, 0]]
+    else:
+        trees = [(est.tree_, 1 / len(model.estimators_)) for est in model.estimators_]
+    value = lambda S: sum(w * _expected(t, x, S) for t, w in trees)
+    F = len(x)
+    phi = np.zeros(F)
+    for i in range(F):
+        others = [j for j in range(F) if j != i]
+        for k in range(F):
+            weight = math.factorial(k) * math.factorial(F - k - 1) / math.factorial(F)
+            for S in itertools.combinations(others, k):
+                phi[i] += weight * (value(set(S) | {i}) - value(set(S)))
+    return phi
+
+
+def _data(n=400, d=5, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 100, (n, d))
+    y = X[:, 0] * 0.5 + np.sin(X[:, 1] / 10) * 10 + X[:, 2] * X[:, 3] / 100 + rng.normal(0, 2, n)
+    return X, y, rng.uniform(-10, 110, (5, d))
+
+
+@pytest.mark.parametrize('model', [
+    GradientBoostingRegressor(n_estimators=8, max_depth=3, random_state=0),
+    GradientBoostingRegressor(n_estimators=6, max_depth=5, learning_rate=0.3, random_state=0),
+    RandomForestRegressor(n_estimators=4, max_depth=6, random_state=0),
+])
+def test_matches_brute_force_shapley(model):
+    X, y, X_test = _data()
+    model.fit(X, y)
+    explainer = TreeExplainer(CompiledTreeEnsemble.from_sklearn(model))
+    values = explainer.shap_values(X_test)
+    for x, phi in zip(X_test, values):
+        np.testing.assert_allclose(phi, _brute_force(model, x), rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize('table', [True, False])
+def test_local_accuracy_and_batch_consistency(monkeypatch, table):
+    if not table:
+        monkeypatch.setattr(tree_shap, 'TABLE_MAX_ENTRIES', 0)
+    X, y, _ = _data(n=1500, d=9, seed=1)
+    model = GradientBoostingRegressor(n_estimators=50, max_depth=4, random_state=0).fit(X, y)
+    explainer = TreeExplainer(CompiledTreeEnsemble.from_sklearn(model), [f'f{i}' for i in range(9)])
+    assert (explainer._table is not None) == table
+
+    X_test = np.random.default_rng(2).uniform(-10, 110, (300, 9))
+    values = explainer.shap_values(X_test)
+    np.testing.assert_allclose(explainer.expected_value + values.sum(axis=1), model.predict(X_test), atol=1e-9)
+    # Row-by-row and batched results are bit-identical
+    for i in range(0, 300, 37):
+        np.testing.assert_array_equal(explainer.explain_one(X_test[i]), values[i])
+    assert explainer.attribution(X_test[0]) == explainer.attributions(X_test[:3])[0]
+
+
+def test_missing_values_follow_tree_routing():
+    X, y, X_test = _data(seed=3)
+    X[::6, 1] = np.nan
+    model = RandomForestRegressor(n_estimators=4, max_depth=4, random_state=0).fit(X, y)
+    X_test[:, 1] = np.nan
+    explainer = TreeExplainer(CompiledTreeEnsemble.from_sklearn(model))
+    for x, phi in zip(X_test[:3], explainer.shap_values(X_test[:3])):
+        np.testing.assert_allclose(phi, _brute_force(model, x), rtol=0, atol=1e-9)
+
+
+def test_unused_features_get_zero():
+    X, y, X_test = _data(d=6)
+    model = GradientBoostingRegressor(n_estimators=5, max_depth=2, random_state=0).fit(X[:, :3], y)
+    # Same trees evaluated on a wider input: columns 3-5 are never split on
+    trees = [tree_arrays(est.tree_) for est in model.estimators_[:, 0]]
+    compiled = CompiledTreeEnsemble(trees, 6, aggregate='sum', init=float(model.init_.constant_[0, 0]),
+                                    scale=model.learning_rate)
+    values = TreeExplainer(compiled).shap_values(X_test)
+    assert np.all(values[:, 3:] == 0)
+    np.testing.assert_allclose(values[:, :3], TreeExplainer(CompiledTreeEnsemble.from_sklearn(model))
+                               .shap_values(X_test[:, :3]), atol=1e-12)
+
+
+def test_deep_forest_skips_explainer_within_latency_budget(monkeypatch):
+    import os
+    import time
+    os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+    import api
+    from ml.model_manager import compile_explainer
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 100, (3000, 17))
+    y = X[:, :5].sum(axis=1) + rng.normal(0, 5, 3000)
+    deep = RandomForestRegressor(n_estimators=30, max_depth=16, random_state=0).fit(X, y)
+    start = time.perf_counter()
+    assert tree_shap.explain_cost(CompiledTreeEnsemble.from_sklearn(deep)) > tree_shap.MAX_EXPLAIN_COST
+    assert compile_explainer(CompiledTreeEnsemble.from_sklearn(deep)) is None
+    assert time.perf_counter() - start < 2
+
+    # At the cap one row stays well inside the serving budget
+    shallow = RandomForestRegressor(n_estimators=100, max_depth=8, random_state=0).fit(X, y)
+    explainer = compile_explainer(CompiledTreeEnsemble.from_sklearn(shallow))
+    assert explainer is not None
+    start = time.perf_counter()
+    explainer.explain_one(X[0])
+    assert time.perf_counter() - start < 0.25
+
+    monkeypatch.setattr(api, 'MODEL_STATE', dict(api.MODEL_STATE))
+    from sklearn.ensemble import IsolationForest
+    from ml.feature_spec import ENGINEERED_COLUMNS
+    api._activate_model(deep, IsolationForest(random_state=0).fit(X), api.BASE_FEATURE_COLUMNS + ENGINEERED_COLUMNS, 90.0)
+    start = time.perf_counter()
+    score, _, explanations = api.predict_skill({'creation_output': 80, 'learning_behavior': 60})
+    assert time.perf_counter() - start < 0.5
+    assert 'feature_attributions' not in explanations and explanations['top_positive_factors']
@@ -0,0 +1,130 @@
+import os
+import fcntl
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+os.environ.setdefault('SKILLGENOME_WARMUP', 'off')
+import api  # noqa: E402
+
+
+@pytest.fixture
+def warm_up(monkeypatch, tmp_path):
+    """Fresh warm-up and model state; training and loading are recorded, not run."""
+    monkeypatch.setattr(api, 'WARMUP_STATE', {**api.WARMUP_STATE, 'phase': 'pending', 'needs_training': False,
+                                              'started_at': None, 'finished_at': None, 'errors': []})
+    monkeypatch.setattr(api, 'MODEL_STATE', {**api.MODEL_STATE, 'active': False, 'skill_model': None,
+                                             'anomaly_model': None})
+    monkeypatch.setattr(api, 'REAL_MODEL_STATE', dict(api.REAL_MODEL_STATE))
+    monkeypatch.setattr(api, 'DF', pd.DataFrame())
+    monkeypatch.setattr(api, 'MODEL_GENERATION_PATHS', {kind: str(tmp_path / f'{kind}_generation.json')
+                                                         for kind in ('skill', 'real')})
+    monkeypatch.setattr(api, 'MODEL_GENERATIONS', {'skill': None, 'real': None})
+    monkeypatch.setattr(api, 'STARTUP_TRAINING_LOCK', str(tmp_path / 'startup_training.lock'))
+    calls = []
+
+    def train_models(refresh_dataset=True):
+        calls.append('train')
+        _activate()
+        api._publish_model_generation('skill', {})
+
+    monkeypatch.setattr(api, 'train_models', train_models)
+    monkeypatch.setattr(api, '_reload_skill_model', lambda state: (calls.append('reload'), _activate()))
+    return calls
+
+
+def _activate():
+    api.MODEL_STATE.update(active=True, skill_model=object(), anomaly_model=object())
+    api.DF = pd.DataFrame({'skill_score': [50.0]})
+
+
+def _ready():
+    response = api.app.test_client().get('/api/ready')
+    return response.status_code, response.get_json()
+
+
+def test_ready_reports_each_artifact(warm_up):
+    status, body = _ready()
+    assert status == 503 and not body['ready'] and body['phase'] == 'pending'
+    assert body['artifacts'] == {'dataset': 'loading', 'skill_model': 'loading', 'anomaly_model': 'loading',
+                                 'real_model': 'loading'}
+    api.WARMUP_STATE.update(phase='failed', errors=['boom'])
+    status, body = _ready()
+    assert status == 503 and body['artifacts']['skill_model'] == 'unavailable' and body['errors'] == ['boom']
+    _activate()
+    status, body = _ready()
+    assert status == 200 and body['ready'] and body['census_size'] == 1
+    assert body['artifacts']['real_model'] == 'unavailable'       # not required
+
+
+def test_off_mode_does_nothing(warm_up):
+    assert api.start_warm_up('off') is None
+    assert api.WARMUP_STATE['phase'] == 'pending' and warm_up == []
+
+
+def test_sync_mode_trains_before_returning(warm_up, monkeypatch):
+    monkeypatch.setattr(api, '_load_artifacts', lambda: True)
+    assert api.start_warm_up('sync') is None
+    assert warm_up == ['train'] and api.WARMUP_STATE['phase'] == 'done'
+    assert not api.WARMUP_STATE['needs_training'] and _ready()[0] == 200
+
+
+def test_preload_defers_training_to_resume(warm_up, monkeypatch):
+    monkeypatch.setattr(api, '_load_artifacts', lambda: True)
+    api.start_warm_up('preload')
+    assert warm_up == [] and api.WARMUP_STATE['phase'] == 'loading' and api.WARMUP_STATE['needs_training']
+    assert _ready()[1]['artifacts']['skill_model'] == 'loading'
+    api.resume_warm_up().join(5)
+    assert warm_up == ['train'] and api.WARMUP_STATE['phase'] == 'done'
+    assert api.resume_warm_up() is None                              # nothing left to train
+
+
+def test_preload_with_saved_models_needs_no_worker_thread(warm_up, monkeypatch):
+    monkeypatch.setattr(api, '_load_artifacts', lambda: (_activate(), False)[1])
+    api.start_warm_up('preload')
+    assert api.WARMUP_STATE['phase'] == 'done' and api.resume_warm_up() is None and warm_up == []
+
+
+def test_background_mode_runs_in_a_thread(warm_up, monkeypatch):
+    monkeypatch.setattr(api, '_load_artifacts', lambda: True)
+    thread = api.start_warm_up('background')
+    thread.join(5)
+    assert thread.name == 'skillgenome-warmup' and warm_up == ['train'] and _ready()[0] == 200
+
+
+def test_only_one_worker_trains_at_startup(warm_up):
+    # Another worker holds the startup lock while it trains
+    with open(api.STARTUP_TRAINING_LOCK, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        api.WARMUP_STATE['needs_training'] = True
+        thread = api.resume_warm_up()
+        time.sleep(0.2)
+        assert thread.is_alive() and api.WARMUP_STATE['phase'] == 'training' and warm_up == []
+        api._publish_model_generation('skill', {})
+        api.MODEL_GENERATIONS['skill'] = None                   # published by the other worker
+        fcntl.flock(lock, fcntl.LOCK_UN)
+    thread.join(5)
+    assert warm_up == ['reload'] and api.WARMUP_STATE['phase'] == 'done' and _ready()[0] == 200
+
+
+def test_worker_trains_when_the_lock_holder_published_nothing(warm_up):
+    with open(api.STARTUP_TRAINING_LOCK, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        api.WARMUP_STATE['needs_training'] = True
+        thread = api.resume_warm_up()
+        time.sleep(0.2)
+        fcntl.flock(lock, fcntl.LOCK_UN)                        # e.g. that worker died
+    thread.join(5)
+    assert warm_up == ['train'] and api.MODEL_GENERATIONS['skill'] is not None
+
+
+def test_concurrent_workers_train_once(warm_up):
+    api.WARMUP_STATE['needs_training'] = True
+    threads = [threading.Thread(target=api._train_once) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert warm_up == ['train']
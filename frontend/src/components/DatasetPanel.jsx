@@ -47,7 +47,7 @@ const DatasetPanel = () => {
         setError(null);
         setTrainResult(null);
         try {
-            const res = await axios.post('/api/train-model', { use_uploaded: useUploaded });
+            const res = await axios.post('/api/train-model', { model: 'real', use_uploaded: useUploaded });
             const data = res.data;
 
             if (data.status === 'success') {